@@ -0,0 +1,72 @@
+"""
+Benchmark the per-file overhead of building boto3 clients.
+
+Compares constructing a new S3 client for every file (the previous behavior of
+``create_s3_client_session``) against reusing the pooled client from
+``sdc_aws_utils.aws.get_client``. Runs against moto's in-process S3 mock so only
+client construction and request overhead is measured.
+
+Usage::
+
+    SWXSOC_MISSION=hermes python benchmarks/bench_client_registry.py --files 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import boto3
+from moto import mock_aws
+
+from sdc_aws_utils.aws import clear_client_registry, create_s3_client_session, object_exists
+
+BUCKET = "bench-bucket"
+
+
+def _time_per_file(get_s3_client, file_keys: list) -> list:
+    timings = []
+    for file_key in file_keys:
+        start = time.perf_counter()
+        s3_client = get_s3_client()
+        object_exists(s3_client, BUCKET, file_key)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summary(label: str, timings: list) -> None:
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(
+        f"{label:<12} mean={statistics.mean(timings_ms):8.3f} ms  p50={statistics.median(timings_ms):8.3f} ms "
+        f" p95={p95:8.3f} ms"
+    )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--files", type=int, default=200, help="Number of files to check")
+    args = arg_parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    with mock_aws():
+        s3_client = boto3.client("s3")
+        s3_client.create_bucket(Bucket=BUCKET)
+        file_keys = [f"l0/2024/01/01/file_{i}.bin" for i in range(args.files)]
+        for file_key in file_keys:
+            s3_client.put_object(Bucket=BUCKET, Key=file_key, Body=b"x")
+
+        before = _time_per_file(lambda: boto3.client("s3"), file_keys)
+
+        clear_client_registry()
+        after = _time_per_file(create_s3_client_session, file_keys)
+
+    print(f"Per-file overhead over {args.files} files:")
+    _summary("per-call", before)
+    _summary("pooled", after)
+    print(f"speedup: {statistics.mean(before) / statistics.mean(after):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
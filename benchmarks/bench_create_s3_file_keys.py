@@ -0,0 +1,79 @@
+"""
+Benchmark S3 key generation for large batches of science filenames.
+
+Compares calling ``create_s3_file_key`` once per filename against the batch
+``create_s3_file_keys`` API. By default filenames are parsed with a precomputed lookup
+so only the key-generation overhead is measured; pass ``--real-parser`` to include
+swxsoc's ``parse_science_filename`` (much slower, use a smaller ``--files``).
+
+Usage::
+
+    SWXSOC_MISSION=hermes python benchmarks/bench_create_s3_file_keys.py --files 1000000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from sdc_aws_utils.aws import create_s3_file_key, create_s3_file_keys
+
+LEVELS = ("l0", "ql", "l1")
+DESCRIPTORS = ("spec", "eventlist", "hk")
+
+
+class _Time:
+    """Minimal stand-in for the astropy Time returned by the parser."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+
+def _make_filenames(count: int) -> dict:
+    start = datetime(2020, 1, 1)
+    parsed = {}
+    for i in range(count):
+        timestamp = start + timedelta(seconds=37 * i)
+        level = LEVELS[i % len(LEVELS)]
+        descriptor = DESCRIPTORS[i % len(DESCRIPTORS)]
+        filename = f"hermes_eea_{level}_{descriptor}_{timestamp:%Y%m%dT%H%M%S}_v1.0.{i}.cdf"
+        parsed[filename] = {
+            "level": level,
+            "descriptor": descriptor,
+            "time": _Time(timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]),
+        }
+    return parsed
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--files", type=int, default=1_000_000, help="Number of filenames")
+    arg_parser.add_argument("--real-parser", action="store_true", help="Use swxsoc's filename parser")
+    args = arg_parser.parse_args()
+
+    parsed = _make_filenames(args.files)
+    filenames = list(parsed)
+    if args.real_parser:
+        from swxsoc.util.util import parse_science_filename as parser
+    else:
+        parser = parsed.__getitem__
+
+    start = time.perf_counter()
+    single_keys = [create_s3_file_key(parser, filename) for filename in filenames]
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_keys, errors = create_s3_file_keys(parser, filenames)
+    batch = time.perf_counter() - start
+
+    assert batch_keys == single_keys and not errors
+
+    print(f"Key generation for {args.files} filenames:")
+    print(f"create_s3_file_key   {single:8.3f} s  ({args.files / single:12,.0f} keys/s)")
+    print(f"create_s3_file_keys  {batch:8.3f} s  ({args.files / batch:12,.0f} keys/s)")
+    print(f"speedup: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Benchmark the S3 and Timestream hot paths against moto's in-process server.
+
+Seeds a bucket with keys in the ``level/descriptor/YYYY/MM/DD`` layout produced by
+``create_s3_file_key``, then times ``list_files_in_bucket``, ``object_exists``,
+``copy_file_in_s3``, ``download_file_from_s3``, ``create_s3_file_key`` and
+``log_to_timestream``. Each operation reports its throughput, latency percentiles and
+peak traced memory (from a second, traced pass, which includes the in-process server).
+
+The report is written as JSON. Given a baseline report from an earlier run, operations
+whose p50 latency or throughput got worse by more than ``--tolerance`` are listed and the
+command exits with status 1, so it can gate a CI job.
+
+Requires moto's server extras, part of the dev dependencies (``pip install "moto[server]"``). Seeding goes through the
+S3 API, so large key counts take a while; reuse a report as the baseline only when it was
+produced with the same ``--keys``.
+
+Usage::
+
+    SWXSOC_MISSION=hermes python benchmarks/bench_suite.py --keys 10000 --output bench.json
+    SWXSOC_MISSION=hermes python benchmarks/bench_suite.py --keys 10000 --baseline bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import moto
+from moto.server import ThreadedMotoServer
+
+from sdc_aws_utils.aws import (
+    copy_file_in_s3,
+    create_s3_file_key,
+    create_s3_file_keys,
+    download_file_from_s3,
+    get_timestream_target,
+    list_files_in_bucket,
+    log_to_timestream,
+    object_exists,
+)
+
+BUCKET = "bench-hermes-eea"
+DEST_BUCKET = "bench-hermes-eea-copy"
+LEVELS = ("l1", "ql", "l2")
+DESCRIPTORS = ("spec", "eventlist", "hk")
+
+# Report fields compared against a baseline, and whether larger values are better
+COMPARED_FIELDS = {"p50_ms": False, "throughput_per_s": True}
+
+
+class _Time:
+    """Minimal stand-in for the astropy Time returned by the parser."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+
+def make_keys(count: int) -> tuple:
+    """
+    Build ``count`` science filenames spread over days and their S3 keys.
+    :return: The filenames, their keys and a parser returning their precomputed metadata
+    :rtype: tuple
+    """
+    start = datetime(2020, 1, 1)
+    parsed = {}
+    for i in range(count):
+        timestamp = start + timedelta(seconds=613 * i)
+        level = LEVELS[i % len(LEVELS)]
+        descriptor = DESCRIPTORS[i % len(DESCRIPTORS)]
+        filename = f"hermes_eea_{level}_{descriptor}_{timestamp:%Y%m%dT%H%M%S}_v1.0.{i % 100:02d}.cdf"
+        parsed[filename] = {
+            "level": level,
+            "descriptor": descriptor,
+            "time": _Time(timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]),
+        }
+
+    filenames = list(parsed)
+    keys, errors = create_s3_file_keys(parsed.__getitem__, filenames)
+    assert not errors
+    return filenames, keys, parsed.__getitem__
+
+
+def seed_bucket(s3_client, keys: list, body: bytes, workers: int) -> None:
+    """
+    Create the benchmark buckets and put every key with the given body.
+    """
+    s3_client.create_bucket(Bucket=BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(lambda key: s3_client.put_object(Bucket=BUCKET, Key=key, Body=body), keys):
+            pass
+
+
+def _percentile(sorted_values: list, quantile: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_operation(func, items: list, trace_memory: bool = True, memory_sample: int = 50) -> dict:
+    """
+    Time ``func`` over every item, then measure its peak memory over a sample of them.
+
+    ``func`` returns the number of units it processed (keys listed, files copied, ...),
+    which the throughput is expressed in.
+    """
+    latencies = []
+    units = 0
+    started = time.perf_counter()
+    for item in items:
+        start = time.perf_counter()
+        units += func(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+    total = time.perf_counter() - started
+
+    peak_memory = None
+    if trace_memory:
+        tracemalloc.start()
+        for item in items[:memory_sample]:
+            func(item)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(items),
+        "units": units,
+        "total_s": round(total, 6),
+        "throughput_per_s": round(units / total, 3) if total > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p90_ms": round(_percentile(latencies, 0.90), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_benchmarks(args: argparse.Namespace, endpoint_url: str) -> dict:
+    """
+    Seed the stand-in services and benchmark every operation.
+    :return: The report
+    :rtype: dict
+    """
+    s3_client = boto3.client("s3", endpoint_url=endpoint_url)
+    timestream_client = boto3.client("timestream-write", endpoint_url=endpoint_url)
+
+    filenames, keys, parser = make_keys(args.keys)
+    started = time.perf_counter()
+    seed_bucket(s3_client, keys, b"x" * args.object_size, args.seed_workers)
+    seed_seconds = time.perf_counter() - started
+    print(f"Seeded {len(keys)} keys in {seed_seconds:.1f} s", file=sys.stderr)
+
+    database_name, table_name = get_timestream_target("DEVELOPMENT")
+    timestream_client.create_database(DatabaseName=database_name)
+    timestream_client.create_table(DatabaseName=database_name, TableName=table_name)
+
+    step = max(1, len(keys) // args.samples)
+    sample_keys = keys[::step][: args.samples]
+    day_prefixes = sorted({key.rsplit("/", 1)[0] + "/" for key in sample_keys})
+    trace = not args.no_memory
+
+    def list_all(prefix: str) -> int:
+        return len(list_files_in_bucket(s3_client, BUCKET, prefix))
+
+    def exists(key: str) -> int:
+        object_exists(s3_client, BUCKET, key)
+        object_exists(s3_client, BUCKET, key + ".missing")
+        return 2
+
+    def copy(key: str) -> int:
+        copy_file_in_s3(s3_client, BUCKET, DEST_BUCKET, key, key, delete_source_file=False)
+        return 1
+
+    def download(key: str) -> int:
+        path = download_file_from_s3(s3_client, BUCKET, key, "bench_suite_download.cdf")
+        path.unlink()
+        return 1
+
+    def make_key(filename: str) -> int:
+        create_s3_file_key(parser, filename)
+        return 1
+
+    def log_event(key: str) -> int:
+        log_to_timestream(timestream_client, "COPY", key, key, BUCKET, DEST_BUCKET, "DEVELOPMENT")
+        return 1
+
+    operations = {
+        "list_files_in_bucket": (list_all, [""] * args.list_runs),
+        "list_files_in_bucket_day_prefix": (list_all, day_prefixes),
+        "object_exists": (exists, sample_keys),
+        "copy_file_in_s3": (copy, sample_keys),
+        "download_file_from_s3": (download, sample_keys),
+        "create_s3_file_key": (make_key, filenames),
+        "log_to_timestream": (log_event, sample_keys),
+    }
+
+    results = {}
+    for name, (func, items) in operations.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_operation(func, items, trace_memory=trace and name != "create_s3_file_key")
+        print(
+            f"{name:<34} {results[name]['throughput_per_s']:>14,.1f}/s  p50={results[name]['p50_ms']:.3f} ms",
+            file=sys.stderr,
+        )
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "keys": len(keys),
+            "samples": len(sample_keys),
+            "object_size": args.object_size,
+            "seed_seconds": round(seed_seconds, 3),
+            "python": platform.python_version(),
+            "boto3": boto3.__version__,
+            "moto": moto.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    List the operations that regressed by more than ``tolerance`` against a baseline.
+    :return: One (operation, field, baseline value, new value) tuple per regression
+    :rtype: list
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for field, higher_is_better in COMPARED_FIELDS.items():
+            old, new = previous.get(field), result.get(field)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > tolerance:
+                regressions.append((name, field, old, new))
+    return regressions
+
+
+def main(argv: list | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--keys", type=int, default=10_000, help="Number of keys to seed")
+    arg_parser.add_argument("--samples", type=int, default=200, help="Keys sampled for per-object operations")
+    arg_parser.add_argument("--list-runs", type=int, default=3, help="Full-bucket listings to time")
+    arg_parser.add_argument("--object-size", type=int, default=1024, help="Size of each seeded object in bytes")
+    arg_parser.add_argument("--seed-workers", type=int, default=16, help="Concurrent puts while seeding")
+    arg_parser.add_argument("--only", nargs="*", help="Only run these operations")
+    arg_parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak memory pass")
+    arg_parser.add_argument("--port", type=int, default=0, help="Port of the moto server, 0 for any free port")
+    arg_parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    arg_parser.add_argument("--baseline", help="Compare against this earlier JSON report")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction")
+    args = arg_parser.parse_args(argv)
+
+    for variable, value in (
+        ("AWS_DEFAULT_REGION", "us-east-1"),
+        ("AWS_ACCESS_KEY_ID", "testing"),
+        ("AWS_SECRET_ACCESS_KEY", "testing"),
+    ):
+        os.environ.setdefault(variable, value)
+
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=args.port, verbose=False)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        report = run_benchmarks(args, f"http://{host}:{port}")
+    finally:
+        server.stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("keys") != report["meta"]["keys"]:
+        print("Warning: the baseline was seeded with a different number of keys", file=sys.stderr)
+
+    regressions = compare_reports(report, baseline, args.tolerance)
+    for name, field, old, new in regressions:
+        print(f"REGRESSION {name} {field}: {old} -> {new}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Asyncio counterparts of the blocking file pipeline functions.
+
+``get_science_file_async``, ``push_science_file_async``, ``copy_file_in_s3_async`` and
+``log_to_timestream_async`` run their blocking counterparts from ``sdc_aws_utils.aws`` on
+the worker threads of an ``AsyncPool``, so a single event loop can overlap the network
+I/O of many files::
+
+    paths = await asyncio.gather(*(get_science_file_async(bucket, key, key) for key in keys))
+
+A pool admits at most ``max_concurrency`` calls at a time; the others wait on a
+semaphore. Cancelling a task that is still waiting means its call never starts. A call
+that has already started on a worker thread runs to completion, since boto3 requests
+cannot be interrupted, and its result is discarded.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from sdc_aws_utils.aws import copy_file_in_s3, get_science_file, log_to_timestream, push_science_file
+
+__all__ = [
+    "AsyncPool",
+    "copy_file_in_s3_async",
+    "get_async_pool",
+    "get_science_file_async",
+    "log_to_timestream_async",
+    "push_science_file_async",
+    "set_async_pool",
+]
+
+# Maximum number of blocking calls the default pool runs at once
+DEFAULT_ASYNC_CONCURRENCY = int(os.getenv("SDC_AWS_ASYNC_CONCURRENCY", "16"))
+
+
+class AsyncPool:
+    """
+    Bounded thread pool that runs blocking calls for coroutines.
+
+    The pool can be shared between event loops; each loop gets its own semaphore.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_ASYNC_CONCURRENCY, executor: ThreadPoolExecutor | None = None):
+        """
+        :param max_concurrency: The maximum number of calls running at once
+        :type max_concurrency: int
+        :param executor: The executor to run calls on, defaults to a pool owned by this object
+        :type executor: ThreadPoolExecutor
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="sdc-aws-async")
+        self._semaphores: dict = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Drop the semaphores of loops that have been closed
+            for closed in [other for other in self._semaphores if other.is_closed()]:
+                del self._semaphores[closed]
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a blocking function on the pool and return its result.
+        :param func: The function to call
+        :type func: Callable
+        :return: The result of the function
+        """
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the executor if this pool created it.
+        :param wait: Whether to wait for running calls to finish
+        :type wait: bool
+        :return: None
+        :rtype: None
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self) -> "AsyncPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+
+# Pool used by the *_async functions when no pool is passed explicitly
+_ASYNC_POOL: AsyncPool | None = None
+_ASYNC_POOL_LOCK = threading.Lock()
+
+
+def set_async_pool(pool: AsyncPool | None) -> AsyncPool | None:
+    """
+    Install the pool used by the *_async functions, or restore the default pool with None.
+    :param pool: The pool to use
+    :type pool: AsyncPool
+    :return: The previously installed pool
+    :rtype: AsyncPool or None
+    """
+    global _ASYNC_POOL
+
+    with _ASYNC_POOL_LOCK:
+        previous = _ASYNC_POOL
+        _ASYNC_POOL = pool
+    return previous
+
+
+def get_async_pool() -> AsyncPool:
+    """
+    Return the installed pool, creating one of DEFAULT_ASYNC_CONCURRENCY workers if needed.
+    :return: The pool
+    :rtype: AsyncPool
+    """
+    global _ASYNC_POOL
+
+    with _ASYNC_POOL_LOCK:
+        if _ASYNC_POOL is None:
+            _ASYNC_POOL = AsyncPool()
+        return _ASYNC_POOL
+
+
+async def get_science_file_async(*args, pool: AsyncPool | None = None, **kwargs):
+    """
+    Async version of ``sdc_aws_utils.aws.get_science_file``, taking the same arguments.
+    :param pool: The pool to run on, defaults to get_async_pool()
+    :type pool: AsyncPool
+    :return: The downloaded file in the requested mode or None if in a dry run.
+    :rtype: Path, memoryview, mmap.mmap or None
+    """
+    return await (pool or get_async_pool()).run(get_science_file, *args, **kwargs)
+
+
+async def push_science_file_async(*args, pool: AsyncPool | None = None, **kwargs) -> str:
+    """
+    Async version of ``sdc_aws_utils.aws.push_science_file``, taking the same arguments.
+    :param pool: The pool to run on, defaults to get_async_pool()
+    :type pool: AsyncPool
+    :return: The key of the newly uploaded file.
+    :rtype: str
+    """
+    return await (pool or get_async_pool()).run(push_science_file, *args, **kwargs)
+
+
+async def copy_file_in_s3_async(*args, pool: AsyncPool | None = None, **kwargs) -> dict:
+    """
+    Async version of ``sdc_aws_utils.aws.copy_file_in_s3``, taking the same arguments.
+    :param pool: The pool to run on, defaults to get_async_pool()
+    :type pool: AsyncPool
+    :return: The status, verification, ETag and checksum of the copy
+    :rtype: dict
+    """
+    return await (pool or get_async_pool()).run(copy_file_in_s3, *args, **kwargs)
+
+
+async def log_to_timestream_async(*args, pool: AsyncPool | None = None, **kwargs) -> None:
+    """
+    Async version of ``sdc_aws_utils.aws.log_to_timestream``, taking the same arguments.
+    :param pool: The pool to run on, defaults to get_async_pool()
+    :type pool: AsyncPool
+    :return: None
+    :rtype: None
+    """
+    return await (pool or get_async_pool()).run(log_to_timestream, *args, **kwargs)
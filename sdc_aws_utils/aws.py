@@ -1,25 +1,136 @@
+import atexit
+import base64
+import functools
+import hashlib
+import io
+import itertools
 import json
+import mmap
 import os
+import queue
+import random
+import shutil
+import threading
 import time
-from collections.abc import Callable
+import zlib
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO
 
 import boto3
 import botocore
+import botocore.compat
+import botocore.config
+import numpy as np
+from boto3.s3.transfer import TransferConfig
 
 from sdc_aws_utils.logging import config, log
+from sdc_aws_utils.metrics import measure
+from sdc_aws_utils.parsing import parse_science_file
+
+# Default client configuration used by the pooled client registry. Connection pools are
+# sized for the thread pools used by the bulk helpers, and TCP keep-alive lets a warm
+# Lambda container reuse its connections between invocations. botocore's adaptive retry
+# mode adds client-side rate limiting once a service starts throttling. botocore retries
+# each request only once, since RetryPolicy retries on top of it: a call makes at most
+# (1 + 1) * RetryPolicy.max_attempts requests instead of the two layers multiplying out.
+# Every request the helpers send goes through call_with_retry, listing pages included
+# (see _list_object_pages), so none is left with only botocore's single retry.
+DEFAULT_CLIENT_CONFIG = botocore.config.Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"max_attempts": 1, "mode": "adaptive"},
+)
+
+# Default size of the thread pools used by the concurrent helpers
+DEFAULT_MAX_WORKERS = 8
+
+# Process-wide registry of boto3 clients keyed by (service, region, config)
+_CLIENT_REGISTRY: dict = {}
+_CLIENT_REGISTRY_LOCK = threading.Lock()
+
+
+def _client_config_key(client_config: botocore.config.Config | None) -> str | None:
+    """
+    Build a hashable fingerprint of a botocore Config so equal configs share a client.
+    :param client_config: The botocore client configuration
+    :type client_config: botocore.config.Config
+    :return: A string fingerprint of the user provided options
+    :rtype: str or None
+    """
+    if client_config is None:
+        return None
+    options = getattr(client_config, "_user_provided_options", None) or vars(client_config)
+    return repr(sorted(options.items()))
+
+
+def get_client(
+    service_name: str, region: str | None = None, client_config: botocore.config.Config | None = None
+) -> type:
+    """
+    Return a pooled boto3 client for the given service, region and config.
+
+    Clients are created once per (service, region, config) and reused for the lifetime of
+    the process, so a warm Lambda container pays for client construction, endpoint
+    resolution and its connection pool only once. boto3 clients are thread-safe, so the
+    same client may be shared between worker threads.
+
+    :param service_name: The AWS service name (e.g. "s3", "timestream-write", "lambda")
+    :type service_name: str
+    :param region: The AWS region, defaults to the boto3 default region resolution
+    :type region: str
+    :param client_config: The botocore client configuration, defaults to DEFAULT_CLIENT_CONFIG
+    :type client_config: botocore.config.Config
+    :return: The boto3 client
+    :rtype: type
+    """
+    client_config = client_config or DEFAULT_CLIENT_CONFIG
+    key = (service_name, region, _client_config_key(client_config))
+
+    client = _CLIENT_REGISTRY.get(key)
+    if client is not None:
+        return client
+
+    # boto3's default session is not thread-safe, so client creation is serialized
+    with _CLIENT_REGISTRY_LOCK:
+        client = _CLIENT_REGISTRY.get(key)
+        if client is None:
+            kwargs = {"config": client_config}
+            if region:
+                kwargs["region_name"] = region
+            client = boto3.client(service_name, **kwargs)
+            _CLIENT_REGISTRY[key] = client
+            log.debug(f"Created pooled {service_name} client for region {region}")
+
+    return client
+
+
+def clear_client_registry() -> None:
+    """
+    Drop all pooled clients, forcing the next call to create fresh ones.
+    :return: None
+    :rtype: None
+    """
+    with _CLIENT_REGISTRY_LOCK:
+        _CLIENT_REGISTRY.clear()
 
 
 # Function to create boto3 s3 client session with credentials with try and except
-def create_s3_client_session() -> type:
+def create_s3_client_session(region: str | None = None, client_config: botocore.config.Config | None = None) -> type:
     """
-    Create a boto3 s3 client session.
+    Create a boto3 s3 client session, reusing the pooled client when one exists.
+    :param region: The AWS region
+    :type region: str
+    :param client_config: The botocore client configuration
+    :type client_config: botocore.config.Config
     :return: The boto3 s3 client session
     :rtype: type
     """
     try:
-        s3_client = boto3.client("s3")
+        s3_client = get_client("s3", region=region, client_config=client_config)
         return s3_client
     except Exception as e:
         log.error({"status": "ERROR", "message": e})
@@ -27,20 +138,242 @@ def create_s3_client_session() -> type:
 
 
 # Function to create boto3 timestream client session with credentials with try and except
-def create_timestream_client_session(region: str = "us-east-1") -> type:
+def create_timestream_client_session(
+    region: str = "us-east-1", client_config: botocore.config.Config | None = None
+) -> type:
     """
-    Create a boto3 timestream client session.
+    Create a boto3 timestream client session, reusing the pooled client when one exists.
+    :param region: The AWS region
+    :type region: str
+    :param client_config: The botocore client configuration
+    :type client_config: botocore.config.Config
     :return: The boto3 timestream client session
     :rtype: type
     """
     try:
-        timestream_client = boto3.client("timestream-write", region_name=region)
+        timestream_client = get_client("timestream-write", region=region, client_config=client_config)
         return timestream_client
     except Exception as e:
         log.error({"status": "ERROR", "message": e})
         raise e
 
 
+# Error codes returned when S3, Timestream or Lambda throttle a request
+THROTTLE_ERROR_CODES = frozenset(
+    {
+        "SlowDown",
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestLimitExceeded",
+        "TooManyRequestsException",
+        "EC2ThrottledException",
+        "ProvisionedThroughputExceededException",
+    }
+)
+
+# Error codes of transient failures that are safe to retry
+TRANSIENT_ERROR_CODES = frozenset(
+    {
+        "InternalError",
+        "InternalServerException",
+        "ServiceUnavailable",
+        "ServiceUnavailableException",
+        "RequestTimeout",
+        "RequestTimeoutException",
+    }
+)
+
+# Process-wide retry counters, see retry_stats()
+_RETRY_STATS = {"calls": 0, "retries": 0, "throttles": 0, "exhausted": 0, "sdk_retries": 0}
+_RETRY_STATS_LOCK = threading.Lock()
+
+
+def _count_retry_stat(name: str, amount: int = 1) -> None:
+    with _RETRY_STATS_LOCK:
+        _RETRY_STATS[name] += amount
+
+
+def retry_stats() -> dict:
+    """
+    Return the process-wide retry counters.
+
+    ``calls`` counts calls made through the retry policy, ``retries`` the retries it made
+    and ``throttles`` the throttling errors it saw. ``exhausted`` counts calls that gave up
+    because their attempts or retry budget ran out, and ``sdk_retries`` the retries botocore
+    made within single requests.
+
+    :return: A copy of the counters
+    :rtype: dict
+    """
+    with _RETRY_STATS_LOCK:
+        return dict(_RETRY_STATS)
+
+
+def reset_retry_stats() -> None:
+    """
+    Reset the process-wide retry counters to zero.
+    :return: None
+    :rtype: None
+    """
+    with _RETRY_STATS_LOCK:
+        for name in _RETRY_STATS:
+            _RETRY_STATS[name] = 0
+
+
+def _error_code(error: Exception) -> str | None:
+    """
+    Return the AWS error code of an exception, or None when it is not an AWS error.
+    """
+    if isinstance(error, botocore.exceptions.ClientError):
+        return error.response.get("Error", {}).get("Code")
+    # boto3 wraps upload failures, raising them while handling the original error
+    if isinstance(error, boto3.exceptions.S3UploadFailedError) and error.__context__ is not None:
+        return _error_code(error.__context__)
+    return None
+
+
+class RetryBudget:
+    """
+    Thread-safe number of retries shared by all calls of one invocation.
+
+    A bulk operation (or a whole Lambda invocation) draws its retries from one budget, so
+    a throttling storm ends in fast failures once the budget is spent instead of every
+    call backing off to its maximum number of attempts.
+    """
+
+    def __init__(self, max_retries: int | None) -> None:
+        self.remaining = max_retries
+        self._lock = threading.Lock()
+
+    def consume(self) -> bool:
+        """
+        Take one retry from the budget, returning False when it is spent.
+        """
+        if self.remaining is None:
+            return True
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for throttled and transient AWS errors.
+
+    Each retry sleeps a random time between zero and ``min(max_delay, base_delay *
+    2**attempt)``, which spreads retrying clients out instead of letting them retry in
+    lockstep. Calls are retried at most ``max_attempts - 1`` times and never beyond their
+    retry budget. The policy sits on top of botocore's own retries: pooled clients are
+    configured with botocore's adaptive mode and a single retry (see DEFAULT_CLIENT_CONFIG),
+    which rate limits requests client side once throttling starts, and this policy covers
+    throttling that outlasts botocore's quick in-request retry.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        retry_budget: int | None = 50,
+        retryable_codes: Iterable = THROTTLE_ERROR_CODES | TRANSIENT_ERROR_CODES,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.retryable_codes = frozenset(retryable_codes)
+
+    def new_budget(self) -> RetryBudget:
+        """
+        Create a retry budget for one invocation of a bulk operation.
+        """
+        return RetryBudget(self.retry_budget)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Return the jittered delay before retrying after the given (zero based) attempt.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))  # noqa: S311
+
+    def call(self, func: Callable, *args, budget: RetryBudget | None = None, **kwargs):
+        """
+        Call ``func`` with the given arguments, retrying retryable AWS errors.
+
+        :param func: The function to call, usually a boto3 client method
+        :type func: Callable
+        :param budget: The retry budget to draw from, defaults to a new budget for this call
+        :type budget: RetryBudget
+        :return: The return value of ``func``
+        """
+        budget = budget or self.new_budget()
+        _count_retry_stat("calls")
+
+        for attempt in range(self.max_attempts):
+            try:
+                response = func(*args, **kwargs)
+            except Exception as e:
+                code = _error_code(e)
+                if isinstance(e, botocore.exceptions.ClientError):
+                    _count_retry_stat("sdk_retries", e.response.get("ResponseMetadata", {}).get("RetryAttempts", 0))
+                if code in THROTTLE_ERROR_CODES:
+                    _count_retry_stat("throttles")
+                if code not in self.retryable_codes:
+                    raise
+                if attempt == self.max_attempts - 1 or not budget.consume():
+                    _count_retry_stat("exhausted")
+                    raise
+
+                delay = self.delay(attempt)
+                _count_retry_stat("retries")
+                log.warning(f"{getattr(func, '__name__', 'AWS call')} failed with {code}, retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            if isinstance(response, dict):
+                _count_retry_stat("sdk_retries", response.get("ResponseMetadata", {}).get("RetryAttempts", 0))
+            return response
+
+
+# Retry policy used by the S3, Timestream and Lambda helpers, see set_retry_policy()
+_RETRY_POLICY = RetryPolicy()
+
+
+def set_retry_policy(policy: RetryPolicy | None) -> None:
+    """
+    Install the retry policy used by the S3, Timestream and Lambda helpers.
+    :param policy: The retry policy, or None to restore the default policy
+    :type policy: RetryPolicy
+    :return: None
+    :rtype: None
+    """
+    global _RETRY_POLICY
+    _RETRY_POLICY = policy or RetryPolicy()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """
+    Return the retry policy used by the S3, Timestream and Lambda helpers.
+    :return: The installed retry policy
+    :rtype: RetryPolicy
+    """
+    return _RETRY_POLICY
+
+
+def call_with_retry(func: Callable, *args, budget: RetryBudget | None = None, **kwargs):
+    """
+    Call ``func`` under the installed retry policy.
+    :param func: The function to call, usually a boto3 client method
+    :type func: Callable
+    :param budget: The retry budget to draw from, defaults to a new budget for this call
+    :type budget: RetryBudget
+    :return: The return value of ``func``
+    """
+    return _RETRY_POLICY.call(func, *args, budget=budget, **kwargs)
+
+
 def parse_file_key(file_path: str) -> str:
     """
     Parse the file key from the file path.
@@ -58,357 +391,3416 @@ def parse_file_key(file_path: str) -> str:
         raise e
 
 
-def create_s3_file_key(science_file_parser: Callable, old_file_key: str) -> str:
-    """
-    Generate an S3 key based on the file's metadata and expected path structure.
+# Short names to long names mapping for descriptors
+DESCRIPTOR_MAPPING = {
+    "spec": "spectrum",
+    "eventlist": "eventlist",
+    "hk": "housekeeping",
+}
+
+
+def create_s3_file_key(science_file_parser: Callable, old_file_key: str) -> str:
+    """
+    Generate an S3 key based on the file's metadata and expected path structure.
+
+    Expected output formats:
+    - raw: Padre/meddea/raw/{year}/{month}/{day}/
+    - l0:  Padre/meddea/l0/{descriptor}/{year}/{month}/
+    - l1:  Padre/meddea/l1/{descriptor}/{year}/{month}/
+
+    The descriptor (e.g., spectrum, eventlist, housekeeping) is extracted from the parsed metadata.
+
+    :param science_file_parser: A callable that returns metadata from the file key.
+    :param old_file_key: The original file name/key.
+    :return: The formatted S3 file key.
+    """
+    try:
+        science_file = parse_science_file(old_file_key, science_file_parser)
+        time_value = science_file["time"].value
+
+        if isinstance(time_value, datetime):
+            timestamp = time_value
+        else:
+            timestamp = datetime.strptime(time_value, "%Y-%m-%dT%H:%M:%S.%f")
+
+        year = timestamp.year
+        month = f"{timestamp.month:02d}"
+        day = f"{timestamp.day:02d}"
+        level = science_file["level"]
+        descriptor = science_file.get("descriptor")
+
+        if not descriptor:
+            descriptor = "unknown"
+
+        descriptor = DESCRIPTOR_MAPPING.get(descriptor, descriptor)
+
+        # Get first valid_data_level from config
+        valid_data_levels = config.get("mission").get("valid_data_levels", ["l0", "l1", "ql"])
+
+        if level == valid_data_levels[0]:
+            new_file_key = f"{level}/{year}/{month}/{day}/{old_file_key}"
+        else:
+            new_file_key = f"{level}/{descriptor}/{year}/{month}/{day}/{old_file_key}"
+
+        return new_file_key
+
+    except Exception as e:
+        log.error({"status": "ERROR", "message": str(e), "file_key": old_file_key})
+        raise
+
+
+def _dates_from_time_values(time_values: list) -> tuple:
+    """
+    Convert parsed time values to (year, month, day) columns in one vectorized pass.
+
+    ISO-format strings are parsed together as a NumPy datetime64 array. If any value can
+    not be parsed the values are converted one by one so a bad value only fails its own item.
+
+    :param time_values: datetime objects or ISO-format strings
+    :type time_values: list
+    :return: Year, month and day arrays and a dict of index -> error message
+    :rtype: tuple
+    """
+    errors = {}
+    normalized = [value.isoformat() if isinstance(value, datetime) else value for value in time_values]
+
+    try:
+        days = np.array(normalized, dtype="datetime64[D]")
+    except (ValueError, TypeError):
+        days = np.empty(len(normalized), dtype="datetime64[D]")
+        for index, value in enumerate(normalized):
+            try:
+                days[index] = np.datetime64(value, "D")
+            except (ValueError, TypeError) as e:
+                days[index] = np.datetime64("NaT")
+                errors[index] = f"Invalid time value {value!r}: {e}"
+
+    months = days.astype("datetime64[M]")
+    years = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    month_numbers = months.astype(np.int64) % 12 + 1
+    day_numbers = (days - months).astype(np.int64) + 1
+
+    return years, month_numbers, day_numbers, errors
+
+
+def create_s3_file_keys(science_file_parser: Callable, old_file_keys: Iterable) -> tuple:
+    """
+    Generate S3 keys for many files at once, collecting per-item errors instead of raising.
+
+    Produces the same keys as ``create_s3_file_key``, but the config and descriptor
+    lookups are done once for the whole batch and timestamps are converted with a single
+    vectorized NumPy pass.
+
+    :param science_file_parser: A callable that returns metadata from the file key.
+    :param old_file_keys: The original file names/keys.
+    :return: A list of new keys aligned with the input (None where generation failed) and
+        a dict mapping each failed file key to its error message.
+    :rtype: tuple
+    """
+    old_file_keys = list(old_file_keys)
+    first_level = config.get("mission").get("valid_data_levels", ["l0", "l1", "ql"])[0]
+
+    new_file_keys = [None] * len(old_file_keys)
+    errors = {}
+
+    # Parse every file name, keeping only the fields needed for the key
+    parsed = []
+    for index, old_file_key in enumerate(old_file_keys):
+        try:
+            science_file = parse_science_file(old_file_key, science_file_parser)
+            parsed.append((index, science_file["level"], science_file.get("descriptor"), science_file["time"].value))
+        except Exception as e:
+            errors[old_file_key] = str(e)
+
+    if parsed:
+        years, months, days, time_errors = _dates_from_time_values([item[3] for item in parsed])
+
+        for position, (index, level, descriptor, _) in enumerate(parsed):
+            old_file_key = old_file_keys[index]
+            if position in time_errors:
+                errors[old_file_key] = time_errors[position]
+                continue
+
+            date_path = f"{years[position]}/{months[position]:02d}/{days[position]:02d}"
+            if level == first_level:
+                new_file_keys[index] = f"{level}/{date_path}/{old_file_key}"
+            else:
+                descriptor = DESCRIPTOR_MAPPING.get(descriptor, descriptor) if descriptor else "unknown"
+                new_file_keys[index] = f"{level}/{descriptor}/{date_path}/{old_file_key}"
+
+    if errors:
+        log.warning(f"Could not generate S3 keys for {len(errors)} of {len(old_file_keys)} files")
+
+    return new_file_keys, errors
+
+
+def _format_listed_object(obj: dict, include_metadata: bool) -> str | dict:
+    """
+    Reduce a ListObjectsV2 entry to its key, or to its key plus size, ETag and LastModified.
+    """
+    if not include_metadata:
+        return obj["Key"]
+    return {
+        "Key": obj["Key"],
+        "Size": obj.get("Size"),
+        "ETag": obj.get("ETag"),
+        "LastModified": obj.get("LastModified"),
+    }
+
+
+def _list_object_pages(s3_client, budget: RetryBudget | None = None, **list_kwargs) -> Iterator:
+    """
+    Yield the pages of a ListObjectsV2 listing, fetching each page under the retry policy.
+
+    Works like the ``list_objects_v2`` paginator, except that a page that is throttled is
+    retried on its own instead of failing the whole listing.
+
+    :param s3_client: The AWS S3 client
+    :param budget: The retry budget shared by the page requests, defaults to a new budget per page
+    :type budget: RetryBudget
+    :return: An iterator of ListObjectsV2 responses
+    :rtype: Iterator
+    """
+    while True:
+        page = call_with_retry(s3_client.list_objects_v2, budget=budget, **list_kwargs)
+        yield page
+        if not page.get("IsTruncated") or not page.get("NextContinuationToken"):
+            return
+        list_kwargs["ContinuationToken"] = page["NextContinuationToken"]
+
+
+def iter_files_in_bucket(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "",
+    start_after: str | None = None,
+    include_metadata: bool = False,
+    page_size: int = 1000,
+) -> Iterator:
+    """
+    Stream the keys in a bucket page by page, without building the full list in memory.
+    :param s3_client: The AWS S3 client
+    :param bucket_name: The name of the bucket
+    :type bucket_name: str
+    :param prefix: Only list keys starting with this prefix
+    :type prefix: str
+    :param start_after: Only list keys that sort after this key
+    :type start_after: str
+    :param include_metadata: Yield dicts with Key, Size, ETag and LastModified instead of keys
+    :type include_metadata: bool
+    :param page_size: The number of keys requested per page
+    :type page_size: int
+    :return: An iterator of keys (or object metadata dicts) in lexicographic order
+    :rtype: Iterator
+    """
+    list_kwargs = {"Bucket": bucket_name, "Prefix": prefix, "MaxKeys": page_size}
+    if start_after:
+        list_kwargs["StartAfter"] = start_after
+
+    for page in _list_object_pages(s3_client, **list_kwargs):
+        for obj in page.get("Contents", []):
+            yield _format_listed_object(obj, include_metadata)
+
+
+def list_files_in_bucket(s3_client, bucket_name: str, prefix: str = "", start_after: str | None = None) -> list:
+    """
+    List the keys in a bucket.
+    :param s3_client: The AWS S3 client
+    :param bucket_name: The name of the bucket
+    :type bucket_name: str
+    :param prefix: Only list keys starting with this prefix
+    :type prefix: str
+    :param start_after: Only list keys that sort after this key
+    :type start_after: str
+    :return: The keys in the bucket
+    :rtype: list
+    """
+    return list(iter_files_in_bucket(s3_client, bucket_name, prefix=prefix, start_after=start_after))
+
+
+# Number of key segments below the level for each shard granularity in the layout
+# produced by create_s3_file_key: {level}/{year}/{month}/{day}/{file} for the first valid
+# data level and {level}/{descriptor}/{year}/{month}/{day}/{file} for the others.
+_SHARD_DEPTHS = {"level": 0, "year": 1, "month": 2, "day": 3}
+
+
+def _list_prefix_level(s3_client, bucket_name: str, prefix: str) -> tuple:
+    """
+    List one level of the keyspace under a prefix using the "/" delimiter.
+    :return: The child prefixes and the objects stored directly under the prefix
+    :rtype: tuple
+    """
+    child_prefixes = []
+    objects = []
+    for page in _list_object_pages(s3_client, Bucket=bucket_name, Prefix=prefix, Delimiter="/"):
+        child_prefixes.extend(common_prefix["Prefix"] for common_prefix in page.get("CommonPrefixes", []))
+        objects.extend(page.get("Contents", []))
+    return child_prefixes, objects
+
+
+def discover_key_shards(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "",
+    shard_by: str = "month",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> tuple:
+    """
+    Split a bucket's keyspace into prefixes following the level/descriptor/year/month/day layout.
+
+    The keyspace is walked with delimiter listings (run concurrently per depth) until every
+    prefix reaches the requested granularity. Objects that sit above that depth, such as
+    files stored at the bucket root, are returned separately so no key is missed.
+
+    :param s3_client: The AWS S3 client
+    :param bucket_name: The name of the bucket
+    :type bucket_name: str
+    :param prefix: Only shard keys under this prefix (must end at a "/" boundary)
+    :type prefix: str
+    :param shard_by: The shard granularity, one of "level", "year", "month" or "day"
+    :type shard_by: str
+    :param max_workers: The maximum number of concurrent listings
+    :type max_workers: int
+    :return: The shard prefixes and the objects found above the shard depth
+    :rtype: tuple
+    """
+    if shard_by not in _SHARD_DEPTHS:
+        raise ValueError(f"shard_by must be one of {list(_SHARD_DEPTHS)}")
+
+    first_level = config.get("mission").get("valid_data_levels", ["l0", "l1", "ql"])[0]
+    base_depth = prefix.count("/")
+
+    def target_depth(key_prefix: str) -> int:
+        # Depth (number of "/"-terminated segments) at which a prefix becomes a shard
+        level = key_prefix.split("/", 1)[0]
+        extra = _SHARD_DEPTHS[shard_by]
+        if extra and level != first_level:
+            extra += 1
+        return max(1 + extra, base_depth)
+
+    shards = []
+    loose_objects = []
+    pending = [prefix]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending:
+            to_expand = []
+            for key_prefix in pending:
+                if key_prefix and key_prefix.count("/") >= target_depth(key_prefix):
+                    shards.append(key_prefix)
+                else:
+                    to_expand.append(key_prefix)
+
+            pending = []
+            for child_prefixes, objects in executor.map(
+                lambda key_prefix: _list_prefix_level(s3_client, bucket_name, key_prefix), to_expand
+            ):
+                pending.extend(child_prefixes)
+                loose_objects.extend(objects)
+
+    return sorted(shards), loose_objects
+
+
+def iter_files_in_bucket_parallel(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "",
+    include_metadata: bool = False,
+    shard_by: str = "month",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_buffered_pages: int = 32,
+) -> Iterator:
+    """
+    Stream the keys in a bucket by listing prefix shards concurrently.
+
+    The keyspace is split with ``discover_key_shards`` and each shard is listed on its own
+    worker thread. Pages are handed over through a bounded queue, so memory stays bounded
+    by ``max_buffered_pages`` pages no matter how large the bucket is. Keys are yielded in
+    lexicographic order within a shard, but shards are interleaved as they complete.
+
+    :param s3_client: The AWS S3 client
+    :param bucket_name: The name of the bucket
+    :type bucket_name: str
+    :param prefix: Only list keys under this prefix (must end at a "/" boundary)
+    :type prefix: str
+    :param include_metadata: Yield dicts with Key, Size, ETag and LastModified instead of keys
+    :type include_metadata: bool
+    :param shard_by: The shard granularity, one of "level", "year", "month" or "day"
+    :type shard_by: str
+    :param max_workers: The maximum number of concurrent listings
+    :type max_workers: int
+    :param max_buffered_pages: The maximum number of listed pages waiting to be consumed
+    :type max_buffered_pages: int
+    :return: An iterator of keys (or object metadata dicts)
+    :rtype: Iterator
+    """
+    shards, loose_objects = discover_key_shards(
+        s3_client, bucket_name, prefix=prefix, shard_by=shard_by, max_workers=max_workers
+    )
+
+    for obj in loose_objects:
+        yield _format_listed_object(obj, include_metadata)
+
+    if not shards:
+        return
+
+    pages: queue.Queue = queue.Queue(maxsize=max_buffered_pages)
+    stop = threading.Event()
+    done_marker = object()
+
+    def hand_over(item) -> bool:
+        # Block on the bounded queue, giving up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def list_shard(shard_prefix: str) -> None:
+        try:
+            for page in _list_object_pages(s3_client, Bucket=bucket_name, Prefix=shard_prefix):
+                if not hand_over(page.get("Contents", [])):
+                    return
+        except Exception as e:
+            hand_over(e)
+        finally:
+            hand_over(done_marker)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(shards)))
+    try:
+        for shard_prefix in shards:
+            executor.submit(list_shard, shard_prefix)
+
+        remaining = len(shards)
+        while remaining:
+            item = pages.get()
+            if item is done_marker:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                log.error({"status": "ERROR", "message": item, "bucket": bucket_name})
+                raise item
+            else:
+                for obj in item:
+                    yield _format_listed_object(obj, include_metadata)
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class S3KeyIndex:
+    """
+    Local index of the keys in a bucket, used to answer existence checks without HEAD requests.
+
+    The index is built from a single listing and refreshed incrementally: keys produced by
+    ``create_s3_file_key`` sort by date within each ``level/`` or ``level/descriptor/``
+    group, so newly arrived files are found by listing each group with ``StartAfter`` set
+    to the last key already indexed. Each refresh also discovers groups created since the
+    last listing with delimiter listings of the top prefixes. Deletions and out-of-order
+    writes are only picked up by a full ``build``.
+
+    Lookups return None, which tells callers such as ``object_exists`` to fall back to a
+    HEAD request, whenever the index can not vouch for the answer: once the index is older
+    than ``max_staleness`` seconds (or ``max_full_staleness`` seconds since the last full
+    build), and for missing keys whose group has not been listed or that sort before the
+    last listed key of their group, where an out-of-order write could hide.
+
+    The index can be persisted to ``path`` as JSON and reloaded across warm invocations.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name: str,
+        prefix: str = "",
+        max_staleness: float = 300.0,
+        max_full_staleness: float = 3600.0,
+        path: str | Path | None = None,
+    ) -> None:
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.max_staleness = max_staleness
+        self.max_full_staleness = max_full_staleness
+        self.path = Path(path) if path else None
+
+        self.built_at: float | None = None
+        self.refreshed_at: float | None = None
+        self._keys: set = set()
+        # Group prefix -> greatest key indexed in that group
+        self._group_max_keys: dict = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, file_key: str) -> bool:
+        return file_key in self._keys
+
+    @staticmethod
+    def _key_group(file_key: str, first_level: str) -> str:
+        segments = file_key.split("/")
+        if len(segments) == 1:
+            return ""
+        if segments[0] == first_level or len(segments) == 2:
+            return f"{segments[0]}/"
+        return f"{segments[0]}/{segments[1]}/"
+
+    @staticmethod
+    def _first_level() -> str:
+        return config.get("mission").get("valid_data_levels", ["l0", "l1", "ql"])[0]
+
+    def _add_keys(self, file_keys: Iterable, listed: bool = True) -> int:
+        # Only listed keys advance a group's StartAfter marker, so keys recorded with add()
+        # can not hide the keys written before them from the next refresh
+        first_level = self._first_level()
+        added = 0
+        for file_key in file_keys:
+            if file_key not in self._keys:
+                self._keys.add(file_key)
+                added += 1
+            if listed:
+                group = self._key_group(file_key, first_level)
+                if file_key > self._group_max_keys.get(group, ""):
+                    self._group_max_keys[group] = file_key
+        return added
+
+    def _covers_group(self, group: str) -> bool:
+        if not group:
+            return "/" not in self.prefix
+        return group.startswith(self.prefix) or self.prefix.startswith(group)
+
+    def _discover_groups(self) -> list:
+        """
+        List the groups currently in the bucket with delimiter listings of the top prefixes.
+        """
+        first_level = self._first_level()
+        top_prefixes, root_objects = _list_prefix_level(self.s3_client, self.bucket_name, "")
+        groups = [""] if root_objects and self._covers_group("") else []
+        for top_prefix in top_prefixes:
+            if not self._covers_group(top_prefix):
+                continue
+            if top_prefix == f"{first_level}/":
+                groups.append(top_prefix)
+                continue
+            child_prefixes, objects = _list_prefix_level(self.s3_client, self.bucket_name, top_prefix)
+            if objects:
+                groups.append(top_prefix)
+            groups.extend(child_prefix for child_prefix in child_prefixes if self._covers_group(child_prefix))
+        return groups
+
+    def _iter_group(self, group: str, start_after: str | None) -> Iterator:
+        """
+        Yield the keys of a group that sort after ``start_after``.
+        """
+        group_prefix = group if group.startswith(self.prefix) else self.prefix
+        list_kwargs = {"Bucket": self.bucket_name, "Prefix": group_prefix}
+        # The root and level/ groups of levels with descriptors hold their keys directly,
+        # so the delimiter keeps the keys of deeper groups out of their listing
+        if not group or (group.count("/") == 1 and group != f"{self._first_level()}/"):
+            list_kwargs["Delimiter"] = "/"
+        if start_after:
+            list_kwargs["StartAfter"] = start_after
+
+        for page in _list_object_pages(self.s3_client, **list_kwargs):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    def build(self) -> "S3KeyIndex":
+        """
+        Rebuild the index from a full listing of the bucket (or prefix).
+        :return: The index
+        :rtype: S3KeyIndex
+        """
+        with self._lock:
+            self._keys = set()
+            self._group_max_keys = {}
+            self._add_keys(iter_files_in_bucket(self.s3_client, self.bucket_name, prefix=self.prefix))
+            self.built_at = self.refreshed_at = time.time()
+
+        log.debug(f"Built key index for {self.bucket_name} with {len(self._keys)} keys")
+        return self
+
+    def refresh(self) -> int:
+        """
+        Incrementally add keys written after the last indexed key of each group.
+        :return: The number of new keys found
+        :rtype: int
+        """
+        if self.built_at is None:
+            self.build()
+            return len(self._keys)
+
+        with self._lock:
+            started = time.time()
+            added = 0
+            groups = dict.fromkeys([*self._group_max_keys, *self._discover_groups()])
+            for group in groups:
+                added += self._add_keys(self._iter_group(group, self._group_max_keys.get(group)))
+            self.refreshed_at = started
+
+        log.debug(f"Refreshed key index for {self.bucket_name}: {added} new keys")
+        return added
+
+    def add(self, file_key: str) -> None:
+        """
+        Record a key written by this process so the index does not need a refresh to see it.
+        :param file_key: The name of the file
+        :type file_key: str
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._add_keys([file_key], listed=False)
+
+    def discard(self, file_key: str) -> None:
+        """
+        Forget a key deleted by this process.
+        :param file_key: The name of the file
+        :type file_key: str
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._keys.discard(file_key)
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the index is too old to answer lookups."""
+        if self.built_at is None or self.refreshed_at is None:
+            return True
+        now = time.time()
+        return now - self.refreshed_at > self.max_staleness or now - self.built_at > self.max_full_staleness
+
+    def lookup(self, file_key: str) -> bool | None:
+        """
+        Check a key against the index.
+        :param file_key: The name of the file
+        :type file_key: str
+        :return: True or False if the index can answer, None if it can not vouch for the key
+        :rtype: bool or None
+        """
+        if self.is_stale or not file_key.startswith(self.prefix):
+            return None
+        if file_key in self._keys:
+            return True
+
+        # Only keys after the last listed key of a listed group are known to be missing
+        max_key = self._group_max_keys.get(self._key_group(file_key, self._first_level()))
+        if max_key is None or file_key < max_key:
+            return None
+        return False
+
+    def save(self, path: str | Path | None = None) -> Path:
+        """
+        Persist the index to disk as JSON.
+        :param path: The file to write, defaults to the index path
+        :type path: str or Path
+        :return: The path written
+        :rtype: Path
+        """
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("No path given to save the key index")
+
+        with self._lock:
+            data = {
+                "bucket_name": self.bucket_name,
+                "prefix": self.prefix,
+                "built_at": self.built_at,
+                "refreshed_at": self.refreshed_at,
+                "keys": sorted(self._keys),
+                "group_max_keys": self._group_max_keys,
+            }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data))
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, s3_client, path: str | Path, **kwargs) -> "S3KeyIndex":
+        """
+        Load an index previously written with ``save``.
+        :param s3_client: The AWS S3 client used for refreshes
+        :param path: The file to read
+        :type path: str or Path
+        :return: The index
+        :rtype: S3KeyIndex
+        """
+        data = json.loads(Path(path).read_text())
+        index = cls(s3_client, data["bucket_name"], prefix=data["prefix"], path=path, **kwargs)
+        group_max_keys = data.get("group_max_keys")
+        index._add_keys(data["keys"], listed=group_max_keys is None)
+        if group_max_keys is not None:
+            index._group_max_keys = dict(group_max_keys)
+        index.built_at = data["built_at"]
+        index.refreshed_at = data["refreshed_at"]
+        return index
+
+
+def find_file_in_target_buckets(
+    s3_client,
+    file_key: str,
+    target_buckets: list,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    key_indexes: dict | None = None,
+) -> str | None:
+    """
+    Concurrently check which target bucket holds a file, returning on the first hit.
+
+    Buckets with a fresh ``S3KeyIndex`` in ``key_indexes`` are answered locally first.
+    HEAD requests for the remaining buckets are sent in parallel on a bounded thread pool.
+    As soon as one bucket reports the file, requests that have not started yet are
+    cancelled and the function returns without waiting for the ones still in flight.
+
+    :param s3_client: The AWS S3 client
+    :param file_key: The name of the file
+    :type file_key: str
+    :param target_buckets: The buckets to check
+    :type target_buckets: list
+    :param max_workers: The maximum number of concurrent HEAD requests
+    :type max_workers: int
+    :param key_indexes: Key indexes by bucket name to check before sending HEAD requests
+    :type key_indexes: dict
+    :return: The name of the first bucket found to hold the file, or None
+    :rtype: str or None
+    """
+    if key_indexes:
+        unresolved = []
+        for target_bucket in target_buckets:
+            key_index = key_indexes.get(target_bucket)
+            found = key_index.lookup(file_key) if key_index else None
+            if found:
+                return target_bucket
+            if found is None:
+                unresolved.append(target_bucket)
+        target_buckets = unresolved
+
+    if not target_buckets:
+        return None
+
+    if len(target_buckets) == 1:
+        return target_buckets[0] if object_exists(s3_client, target_buckets[0], file_key) else None
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(target_buckets)))
+    try:
+        futures = {
+            executor.submit(object_exists, s3_client, target_bucket, file_key): target_bucket
+            for target_bucket in target_buckets
+        }
+        for future in as_completed(futures):
+            if future.result():
+                return futures[future]
+        return None
+    finally:
+        # Abandon remaining work on a hit rather than waiting for it
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def check_file_existence_in_target_buckets(
+    s3_client,
+    file_key: str,
+    source_bucket: str,
+    target_buckets: list,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    key_indexes: dict | None = None,
+) -> bool:
+    """
+    Check if a file from the source bucket exists in any of the target buckets.
+    :param s3_client: The AWS S3 client
+    :param file_key: The name of the file
+    :type file_key: str
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param target_buckets: The buckets to check
+    :type target_buckets: list
+    :param max_workers: The maximum number of concurrent HEAD requests
+    :type max_workers: int
+    :param key_indexes: Key indexes by bucket name to check before sending HEAD requests
+    :type key_indexes: dict
+    :return: True if the file exists in any target bucket, False otherwise
+    :rtype: bool
+    """
+    matched_bucket = find_file_in_target_buckets(
+        s3_client, file_key, target_buckets, max_workers=max_workers, key_indexes=key_indexes
+    )
+
+    if matched_bucket:
+        log.debug(f"File {file_key} from {source_bucket} exists in {matched_bucket}")
+        return True
+
+    log.debug(f"File {file_key} from {source_bucket} does not exist in {target_buckets}")
+    return False
+
+
+def object_exists(
+    s3_client,
+    bucket: str,
+    file_key: str,
+    key_index: S3KeyIndex | None = None,
+    retry_budget: RetryBudget | None = None,
+    strict: bool = False,
+) -> bool:
+    """
+    Check if a file exists in the specified bucket.
+
+    If a fresh ``S3KeyIndex`` for the bucket is given it answers the check locally,
+    otherwise a HEAD request is sent under the retry policy. Once the retries are spent,
+    any error is reported as a missing file, like a 403 that S3 returns for a missing key
+    when the caller may not list the bucket. With ``strict`` only a 404 means the file does
+    not exist and other errors are raised.
+
+    :param s3_client: The AWS S3 client
+    :param bucket: The name of the bucket
+    :param file_key: The name of the file
+    :param key_index: An optional key index for the bucket
+    :param retry_budget: The retry budget to draw from, defaults to a new budget for this call
+    :param strict: Raise errors other than a 404 instead of returning False
+    :return: True if the file exists, False otherwise.
+    """
+    if key_index is not None and key_index.bucket_name == bucket:
+        found = key_index.lookup(file_key)
+        if found is not None:
+            return found
+
+    # A missing object is an answer, not an error, so it is timed as a successful call
+    with measure("object_exists", bucket):
+        try:
+            call_with_retry(s3_client.head_object, budget=retry_budget, Bucket=bucket, Key=file_key)
+            return True
+        except botocore.exceptions.ClientError as e:
+            if strict and _error_code(e) not in ("404", "NoSuchKey", "NotFound"):
+                raise
+            return False
+
+
+# Size classes for get_transfer_config. Housekeeping files are transferred with a single
+# request on the calling thread, while multi-GB raw telemetry is split into large parts
+# transferred concurrently to saturate the Lambda network link.
+SMALL_TRANSFER_SIZE = 8 * 1024 * 1024
+LARGE_TRANSFER_SIZE = 512 * 1024 * 1024
+
+DEFAULT_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+)
+
+
+def get_transfer_config(file_size: int | None = None, **overrides) -> TransferConfig:
+    """
+    Return a TransferConfig tuned for the size of the file being transferred.
+
+    Small files are sent as a single request without worker threads, medium files use
+    16 MiB parts on a few threads, and large files use 64 MiB parts on more threads.
+    Any TransferConfig argument can be overridden with keyword arguments.
+
+    :param file_size: The size of the file in bytes, or None if unknown
+    :type file_size: int
+    :return: The transfer configuration
+    :rtype: TransferConfig
+    """
+    if file_size is None:
+        settings = {
+            "multipart_threshold": DEFAULT_TRANSFER_CONFIG.multipart_threshold,
+            "multipart_chunksize": DEFAULT_TRANSFER_CONFIG.multipart_chunksize,
+            "max_concurrency": DEFAULT_TRANSFER_CONFIG.max_concurrency,
+        }
+    elif file_size < SMALL_TRANSFER_SIZE:
+        settings = {"multipart_threshold": SMALL_TRANSFER_SIZE, "max_concurrency": 1, "use_threads": False}
+    elif file_size < LARGE_TRANSFER_SIZE:
+        settings = {
+            "multipart_threshold": SMALL_TRANSFER_SIZE,
+            "multipart_chunksize": 16 * 1024 * 1024,
+            "max_concurrency": 4,
+        }
+    else:
+        settings = {
+            "multipart_threshold": SMALL_TRANSFER_SIZE,
+            "multipart_chunksize": 64 * 1024 * 1024,
+            "max_concurrency": 16,
+        }
+
+    settings.update(overrides)
+    return TransferConfig(**settings)
+
+
+class TransferProgress:
+    """
+    Progress callback for S3 transfers that tracks bytes transferred and throughput.
+
+    Pass an instance as the ``progress_callback`` of ``download_file_from_s3`` or
+    ``upload_file_to_s3``. The transfer manager calls it from its worker threads with the
+    number of bytes moved since the last call. If ``callback`` is given it is called with
+    ``(bytes_transferred, total_bytes, bytes_per_second)`` at most every ``interval``
+    seconds and once more when the transfer finishes.
+    """
+
+    def __init__(self, total_bytes: int | None = None, callback: Callable | None = None, interval: float = 1.0) -> None:
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.interval = interval
+        self.bytes_transferred = 0
+        self.started = time.monotonic()
+        self.finished: float | None = None
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_amount: int) -> None:
+        with self._lock:
+            self.bytes_transferred += bytes_amount
+            now = time.monotonic()
+            if self.callback is None or now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            report = (self.bytes_transferred, self.total_bytes, self.bytes_per_second)
+        self.callback(*report)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the transfer started, or its total duration once finished."""
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Average throughput of the transfer so far."""
+        elapsed = self.elapsed
+        return self.bytes_transferred / elapsed if elapsed > 0 else 0.0
+
+    def finish(self) -> None:
+        """
+        Mark the transfer as finished and send a final progress report.
+        :return: None
+        :rtype: None
+        """
+        self.finished = time.monotonic()
+        log.debug(
+            f"Transferred {self.bytes_transferred} bytes in {self.elapsed:.3f}s ({self.bytes_per_second:.0f} bytes/s)"
+        )
+        if self.callback is not None:
+            self.callback(self.bytes_transferred, self.total_bytes, self.bytes_per_second)
+
+
+# Checksum algorithm used to verify transfers. CRC32C is computed with the AWS CRT
+# (``pip install botocore[crt]``), so SHA256 is used when it is not installed.
+DEFAULT_CHECKSUM_ALGORITHM = os.getenv("SDC_AWS_CHECKSUM_ALGORITHM") or (
+    "CRC32C" if botocore.compat.HAS_CRT else "SHA256"
+)
+
+# S3 flexible checksum algorithms
+CHECKSUM_ALGORITHMS = ("CRC32", "CRC32C", "CRC64NVME", "SHA1", "SHA256")
+
+# Digest size in bytes of the CRC algorithms
+_CRC_DIGEST_SIZES = {"CRC32": 4, "CRC32C": 4, "CRC64NVME": 8}
+
+
+class TransferChecksum:
+    """
+    Checksum of the bytes of a transfer, computed as they stream through it.
+
+    Pass an instance as the ``checksum`` of ``download_file_from_s3``,
+    ``download_file_to_memory``, ``upload_file_to_s3`` or ``upload_fileobj_to_s3``. The
+    checksum is updated in the same pass as the transfer, so the data is never read twice.
+    Downloads compare it with the checksum S3 stores for the object. Uploads send the
+    algorithm to S3, which rejects any request whose body does not match, and compare the
+    checksum with the one S3 stores for the new object. A mismatch raises
+    OSError. Afterwards ``value`` holds the base64 checksum in S3's format, ``expected``
+    the one reported by S3 and ``verified`` whether the two were compared.
+
+    Objects uploaded in parts may store a checksum of the part checksums (``"...-N"``),
+    which can only be compared with a checksum of the same number of parts, such as the one
+    S3 computes for a multipart copy with the same part size. Against a whole-object
+    checksum it is not verified.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM) -> None:
+        algorithm = algorithm.upper()
+        if algorithm not in CHECKSUM_ALGORITHMS:
+            raise ValueError(f"algorithm must be one of {CHECKSUM_ALGORITHMS}")
+
+        self.algorithm = algorithm
+        self.bytes = 0
+        self.value: str | None = None
+        self.expected: str | None = None
+        self.verified = False
+        self._hash = hashlib.new(algorithm.lower()) if algorithm.startswith("SHA") else None
+        self._crc = 0
+
+    @property
+    def response_key(self) -> str:
+        """The name of this checksum in S3 requests and responses, e.g. ``ChecksumSHA256``."""
+        return f"Checksum{self.algorithm}"
+
+    def update(self, data: bytes | memoryview) -> None:
+        """
+        Add the next bytes of the transfer.
+        :param data: The bytes
+        :type data: bytes or memoryview
+        :return: None
+        :rtype: None
+        """
+        self.bytes += len(data)
+        if self._hash is not None:
+            self._hash.update(data)
+        elif self.algorithm == "CRC32":
+            self._crc = zlib.crc32(data, self._crc)
+        else:
+            from awscrt import checksums
+
+            self._crc = getattr(checksums, self.algorithm.lower())(data, self._crc)
+
+    def finish(self) -> str:
+        """
+        Finalize the checksum of the bytes seen so far.
+        :return: The base64 checksum
+        :rtype: str
+        """
+        if self._hash is not None:
+            digest = self._hash.digest()
+        else:
+            digest = self._crc.to_bytes(_CRC_DIGEST_SIZES[self.algorithm], "big")
+        self.value = base64.b64encode(digest).decode()
+        return self.value
+
+    def verify(self, expected: str | None, file_key: str) -> bool:
+        """
+        Compare the checksum with the one S3 reports for the object.
+        :param expected: The checksum reported by S3, if any
+        :type expected: str
+        :param file_key: The key of the object, for the error message
+        :type file_key: str
+        :return: Whether the checksums could be compared
+        :rtype: bool
+        """
+        self.expected = expected
+        if self.value is None:
+            self.finish()
+        if not expected:
+            return False
+        # Composite checksums end in their part count and only compare with one of as many parts
+        if _checksum_parts(expected) != _checksum_parts(self.value):
+            return False
+        if expected != self.value:
+            raise OSError(f"{self.algorithm} checksum mismatch for {file_key}: expected {expected}, got {self.value}")
+        self.verified = True
+        return True
+
+
+def _checksum_parts(value: str) -> str | None:
+    return value.rpartition("-")[2] if "-" in value else None
+
+
+def _stored_checksum_algorithm(head: dict) -> str | None:
+    """
+    The algorithm of the checksum S3 stores for an object, from a HEAD with ChecksumMode enabled.
+    """
+    for algorithm in CHECKSUM_ALGORITHMS:
+        if head.get(f"Checksum{algorithm}"):
+            return algorithm
+    return None
+
+
+class _UploadReader(io.RawIOBase):
+    """
+    File object handed to upload_fileobj, optionally feeding the bytes read to a TransferChecksum.
+
+    Bytes are checksummed once in stream order, so re-reads after a seek back (upload
+    retries) do not change the checksum. s3transfer closes the file object it uploads, but
+    the wrapped file belongs to the caller and is read again when the upload is retried, so
+    closing the reader leaves it open.
+    """
+
+    def __init__(self, fileobj, checksum: TransferChecksum | None = None) -> None:
+        super().__init__()
+        self._fileobj = fileobj
+        self._checksum = checksum
+        self._seekable = fileobj.seekable() if hasattr(fileobj, "seekable") else False
+        self._position = fileobj.tell() if self._seekable else 0
+        self._hashed = self._position
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._seekable
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if not self._seekable:
+            raise io.UnsupportedOperation("seek")
+        self._fileobj.seek(offset, whence)
+        self._position = self._fileobj.tell()
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        end = self._position + len(data)
+        if self._checksum is not None and self._position <= self._hashed < end:
+            self._checksum.update(memoryview(data)[self._hashed - self._position :])
+            self._hashed = end
+        self._position = end
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        memoryview(buffer).cast("B")[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        # Leave the caller's file open and the reader usable for a retry
+        pass
+
+
+def download_file_from_s3(
+    s3_client: type,
+    source_bucket: str,
+    file_key: str,
+    parsed_file_key: str,
+    transfer_config: TransferConfig | None = None,
+    file_size: int | None = None,
+    progress_callback: TransferProgress | Callable | None = None,
+    checksum: TransferChecksum | None = None,
+    conditional: bool = False,
+    retry_budget: RetryBudget | None = None,
+) -> Path:
+    """
+    Download a file from an S3 bucket.
+
+    With a ``checksum`` the object is streamed with a single GET and checksummed as it is
+    written, then compared with the checksum S3 stores for it.
+
+    With ``conditional`` a local copy left by an earlier download is reused when the object
+    has not changed, see ``download_file_if_changed``.
+
+    :param s3_client: The AWS session
+    :type s3_client: str
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param parsed_file_key: The parsed name of the file
+    :type parsed_file_key: str
+    :param transfer_config: The transfer configuration, defaults to one sized by get_transfer_config
+    :type transfer_config: TransferConfig
+    :param file_size: The size of the object if already known (e.g. from a listing), used to size the transfer
+    :type file_size: int
+    :param progress_callback: Called with the number of bytes moved as the transfer progresses
+    :type progress_callback: TransferProgress or Callable
+    :param checksum: The checksum to compute and verify during the download
+    :type checksum: TransferChecksum
+    :param conditional: Whether to skip the download when the local copy is up to date
+    :type conditional: bool
+    :param retry_budget: The retry budget to draw from, defaults to a new budget per call
+    :type retry_budget: RetryBudget
+    :return: The path to the downloaded file
+    :rtype: Path
+    """
+    if conditional:
+        file_path, _ = download_file_if_changed(
+            s3_client,
+            source_bucket,
+            file_key,
+            parsed_file_key,
+            transfer_config=transfer_config,
+            progress_callback=progress_callback,
+            checksum=checksum,
+            retry_budget=retry_budget,
+        )
+        return file_path
+
+    try:
+        # Initialize S3 Client
+        log.info(f"Downloading file {parsed_file_key} from {source_bucket}")
+
+        transfer_config = transfer_config or get_transfer_config(file_size)
+
+        # Download file to tmp directory
+        with measure("download", source_bucket) as op:
+            if checksum is not None:
+                response = call_with_retry(
+                    s3_client.get_object,
+                    budget=retry_budget,
+                    Bucket=source_bucket,
+                    Key=file_key,
+                    ChecksumMode="ENABLED",
+                )
+                body = response["Body"]
+                with open(f"/tmp/{parsed_file_key}", "wb") as f:
+                    for chunk in body.iter_chunks(transfer_config.io_chunksize):
+                        checksum.update(chunk)
+                        f.write(chunk)
+                        if progress_callback is not None:
+                            progress_callback(len(chunk))
+                body.close()
+                checksum.verify(response.get(checksum.response_key), file_key)
+            else:
+                call_with_retry(
+                    s3_client.download_file,
+                    source_bucket,
+                    file_key,
+                    f"/tmp/{parsed_file_key}",
+                    budget=retry_budget,
+                    Config=transfer_config,
+                    Callback=progress_callback,
+                )
+            op.bytes = os.path.getsize(f"/tmp/{parsed_file_key}")
+
+        if isinstance(progress_callback, TransferProgress):
+            progress_callback.finish()
+
+        log.debug(f"File {file_key} Successfully Downloaded")
+
+        return Path(f"/tmp/{parsed_file_key}")
+
+    except botocore.exceptions.ClientError as e:
+        log.error({"status": "ERROR", "message": e})
+
+        raise e
+
+
+# Suffix of the sidecar files recording which object version a local download holds
+DOWNLOAD_METADATA_SUFFIX = ".s3meta.json"
+
+
+def _read_download_metadata(file_path: Path, bucket: str, file_key: str) -> dict | None:
+    """
+    Return the sidecar metadata of a local download if it still describes the file on disk.
+    """
+    try:
+        metadata = json.loads(Path(f"{file_path}{DOWNLOAD_METADATA_SUFFIX}").read_text())
+        stat = file_path.stat()
+    except (OSError, ValueError):
+        return None
+
+    # A file changed locally since the download cannot be reused
+    if (
+        metadata.get("bucket") != bucket
+        or metadata.get("key") != file_key
+        or metadata.get("size") != stat.st_size
+        or metadata.get("mtime_ns") != stat.st_mtime_ns
+    ):
+        return None
+    return metadata
+
+
+def _write_download_metadata(file_path: Path, bucket: str, file_key: str, head: dict) -> None:
+    """
+    Record the object version of a local download in its sidecar file.
+    """
+    stat = file_path.stat()
+    metadata = {
+        "bucket": bucket,
+        "key": file_key,
+        "etag": head.get("ETag"),
+        "last_modified": head["LastModified"].isoformat() if head.get("LastModified") else None,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    sidecar = Path(f"{file_path}{DOWNLOAD_METADATA_SUFFIX}")
+    tmp_sidecar = sidecar.with_suffix(".tmp")
+    tmp_sidecar.write_text(json.dumps(metadata))
+    tmp_sidecar.replace(sidecar)
+
+
+def download_file_if_changed(
+    s3_client: type,
+    source_bucket: str,
+    file_key: str,
+    parsed_file_key: str,
+    transfer_config: TransferConfig | None = None,
+    progress_callback: TransferProgress | Callable | None = None,
+    checksum: TransferChecksum | None = None,
+    retry_budget: RetryBudget | None = None,
+) -> tuple:
+    """
+    Download a file from an S3 bucket unless the local copy is already up to date.
+
+    Each download records the object's ETag, LastModified and size in a sidecar file next
+    to ``/tmp/{parsed_file_key}``. When the local file and its sidecar are still there (for
+    example from an earlier warm invocation), a HEAD request is sent with ``If-None-Match``
+    (or ``If-Modified-Since``); a 304 response means the local copy is reused without
+    transferring any bytes. Otherwise the HEAD result sizes the download and is recorded
+    in the new sidecar.
+
+    :param s3_client: The AWS S3 client
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param parsed_file_key: The parsed name of the file
+    :type parsed_file_key: str
+    :param transfer_config: The transfer configuration, defaults to one sized by get_transfer_config
+    :type transfer_config: TransferConfig
+    :param progress_callback: Called with the number of bytes moved as the transfer progresses
+    :type progress_callback: TransferProgress or Callable
+    :param checksum: The checksum to compute and verify if the file is downloaded
+    :type checksum: TransferChecksum
+    :param retry_budget: The retry budget to draw from, defaults to a new budget per call
+    :type retry_budget: RetryBudget
+    :return: The path to the local file and whether it was downloaded
+    :rtype: tuple
+    """
+    file_path = Path(f"/tmp/{parsed_file_key}")
+    metadata = _read_download_metadata(file_path, source_bucket, file_key)
+
+    conditions = {}
+    if metadata is not None:
+        # LastModified has a one second resolution, so it is only used without an ETag
+        if metadata.get("etag"):
+            conditions["IfNoneMatch"] = metadata["etag"]
+        elif metadata.get("last_modified"):
+            conditions["IfModifiedSince"] = datetime.fromisoformat(metadata["last_modified"])
+
+    try:
+        head = call_with_retry(
+            s3_client.head_object, budget=retry_budget, Bucket=source_bucket, Key=file_key, **conditions
+        )
+    except botocore.exceptions.ClientError as e:
+        if conditions and _error_code(e) in ("304", "NotModified"):
+            log.info(f"Local copy of {file_key} from {source_bucket} is up to date, not downloading")
+            return file_path, False
+        log.error({"status": "ERROR", "message": e})
+        raise e
+
+    file_path = download_file_from_s3(
+        s3_client,
+        source_bucket,
+        file_key,
+        parsed_file_key,
+        transfer_config=transfer_config,
+        file_size=head.get("ContentLength"),
+        progress_callback=progress_callback,
+        checksum=checksum,
+        retry_budget=retry_budget,
+    )
+    _write_download_metadata(file_path, source_bucket, file_key, head)
+    return file_path, True
+
+
+def upload_file_to_s3(
+    s3_client: str,
+    filename: str,
+    destination_bucket: str,
+    file_key: str,
+    transfer_config: TransferConfig | None = None,
+    progress_callback: TransferProgress | Callable | None = None,
+    checksum: TransferChecksum | None = None,
+    retry_budget: RetryBudget | None = None,
+) -> Path:
+    """
+    Upload a file to an S3 bucket.
+
+    With a ``checksum`` the file is checksummed as it is read for the upload, S3 verifies
+    every request against the same algorithm and the result is compared with the checksum
+    S3 stores for the new object, see ``upload_fileobj_to_s3``.
+
+    :param session: The AWS session
+    :type session: str
+    :param filename: The name of the file
+    :type filename: str
+    :param destination_bucket: The name of the destination bucket
+    :type destination_bucket: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param transfer_config: The transfer configuration, defaults to one sized for the local file
+    :type transfer_config: TransferConfig
+    :param progress_callback: Called with the number of bytes moved as the transfer progresses
+    :type progress_callback: TransferProgress or Callable
+    :param checksum: The checksum to compute during the upload
+    :type checksum: TransferChecksum
+    :param retry_budget: The retry budget to draw from, defaults to a new budget per call
+    :type retry_budget: RetryBudget
+    :return: The path to the uploaded file
+    :rtype: Path
+    """
+    try:
+        # Initialize S3 Client
+        log.info(f"Uploading file {file_key} to {destination_bucket}")
+
+        file_path = f"/tmp/{filename}"
+
+        file_size = os.path.getsize(file_path)
+        if transfer_config is None:
+            transfer_config = get_transfer_config(file_size)
+
+        if checksum is not None:
+            # Stream the file through the checksum instead of letting the transfer manager open it
+            with open(file_path, "rb") as f:
+                upload_fileobj_to_s3(
+                    s3_client,
+                    f,
+                    destination_bucket,
+                    file_key,
+                    transfer_config=transfer_config,
+                    file_size=file_size,
+                    progress_callback=progress_callback,
+                    checksum=checksum,
+                    retry_budget=retry_budget,
+                )
+            return Path(file_path)
+
+        # Upload file to destination bucket
+        with measure("upload", destination_bucket) as op:
+            call_with_retry(
+                s3_client.upload_file,
+                file_path,
+                destination_bucket,
+                file_key,
+                budget=retry_budget,
+                Config=transfer_config,
+                Callback=progress_callback,
+            )
+            op.bytes = file_size
+
+        if isinstance(progress_callback, TransferProgress):
+            progress_callback.finish()
+
+        log.debug(f"File {file_key} Successfully Uploaded")
+
+        return Path(file_path)
+
+    except boto3.exceptions.S3UploadFailedError as e:
+        log.error({"status": "ERROR", "message": e})
+
+        raise e
+
+
+class _ChunkReader(io.RawIOBase):
+    """
+    Read-only, non-seekable file object over an iterator of byte chunks.
+
+    Only the chunk being consumed is held in memory, so upload_fileobj can stream a
+    generator in parts without the whole object being materialized.
+    """
+
+    def __init__(self, chunks: Iterable) -> None:
+        self._chunks = iter(chunks)
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # Fill the whole buffer, since upload_fileobj sizes multipart parts by what each read returns
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view):
+            if not self._chunk:
+                try:
+                    self._chunk = memoryview(next(self._chunks)).cast("B")
+                except StopIteration:
+                    break
+                continue
+            size = min(len(view) - filled, len(self._chunk))
+            view[filled : filled + size] = self._chunk[:size]
+            self._chunk = self._chunk[size:]
+            filled += size
+        return filled
+
+
+def upload_fileobj_to_s3(
+    s3_client: type,
+    data: bytes | BinaryIO | Iterable,
+    destination_bucket: str,
+    file_key: str,
+    transfer_config: TransferConfig | None = None,
+    file_size: int | None = None,
+    progress_callback: TransferProgress | Callable | None = None,
+    checksum: TransferChecksum | None = None,
+    retry_budget: RetryBudget | None = None,
+) -> int:
+    """
+    Stream bytes, a file-like object or an iterator of byte chunks to an S3 object.
+
+    The data is sent with ``upload_fileobj``, which switches to a multipart upload above
+    the transfer config's threshold and buffers at most a few parts at a time, so nothing
+    is staged on local disk. Seekable sources are retried from their starting position;
+    a non-seekable stream or an iterator can only be read once and is not retried. Like
+    ``upload_file_to_s3``, a failed upload raises ``S3UploadFailedError``.
+
+    With a ``checksum`` the bytes are checksummed as they are sent and, once the upload
+    completes, compared with the checksum S3 stores for the object (one HEAD request); a
+    mismatch raises OSError. Objects uploaded in parts store a composite checksum, which is
+    not comparable, so their ``checksum.verified`` stays False.
+
+    :param s3_client: The AWS S3 client
+    :param data: The object's content
+    :type data: bytes, file-like object or iterator of bytes
+    :param destination_bucket: The name of the destination bucket
+    :type destination_bucket: str
+    :param file_key: The key of the object to write
+    :type file_key: str
+    :param transfer_config: The transfer configuration, defaults to one sized by get_transfer_config
+    :type transfer_config: TransferConfig
+    :param file_size: The size of the data if known, used to size the transfer
+    :type file_size: int
+    :param progress_callback: Called with the number of bytes moved as the transfer progresses
+    :type progress_callback: TransferProgress or Callable
+    :param checksum: The checksum to compute during the upload, whose algorithm S3 also verifies
+    :type checksum: TransferChecksum
+    :param retry_budget: The retry budget to draw from, defaults to a new budget per call
+    :type retry_budget: RetryBudget
+    :return: The number of bytes uploaded
+    :rtype: int
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        file_size = len(data) if file_size is None else file_size
+        fileobj = io.BytesIO(data)
+    elif hasattr(data, "read"):
+        fileobj = data
+    else:
+        fileobj = _ChunkReader(data)
+
+    fileobj = _UploadReader(fileobj, checksum)
+    extra_args = {"ChecksumAlgorithm": checksum.algorithm} if checksum is not None else None
+
+    transfer_config = transfer_config or get_transfer_config(file_size)
+    seekable = fileobj.seekable()
+    start = fileobj.tell() if seekable else 0
+    uploaded = 0
+
+    def upload() -> None:
+        nonlocal uploaded
+
+        uploaded = 0
+        if seekable:
+            fileobj.seek(start)
+
+        def count(bytes_amount: int) -> None:
+            nonlocal uploaded
+
+            uploaded += bytes_amount
+            if progress_callback is not None:
+                progress_callback(bytes_amount)
+
+        s3_client.upload_fileobj(
+            fileobj, destination_bucket, file_key, ExtraArgs=extra_args, Config=transfer_config, Callback=count
+        )
+
+    try:
+        log.info(f"Streaming file {file_key} to {destination_bucket}")
+
+        with measure("upload", destination_bucket) as op:
+            if seekable:
+                call_with_retry(upload, budget=retry_budget)
+            else:
+                upload()
+            op.bytes = uploaded
+
+        if isinstance(progress_callback, TransferProgress):
+            progress_callback.finish()
+        if checksum is not None:
+            checksum.finish()
+            head = call_with_retry(
+                s3_client.head_object,
+                budget=retry_budget,
+                Bucket=destination_bucket,
+                Key=file_key,
+                ChecksumMode="ENABLED",
+            )
+            checksum.verify(head.get(checksum.response_key), file_key)
+
+        log.debug(f"File {file_key} Successfully Uploaded")
+
+        return uploaded
+
+    except boto3.exceptions.S3UploadFailedError as e:
+        log.error({"status": "ERROR", "message": e})
+
+        raise e
+
+    except botocore.exceptions.ClientError as e:
+        # upload_fileobj raises client errors as they are, unlike upload_file
+        log.error({"status": "ERROR", "message": e})
+
+        raise boto3.exceptions.S3UploadFailedError(f"Failed to upload {file_key} to {destination_bucket}: {e}") from e
+
+
+# Objects above this size are copied with parallel multipart upload_part_copy calls.
+# A single copy_object call is rejected by S3 above 5 GB.
+DEFAULT_MULTIPART_COPY_THRESHOLD = 1024 * 1024 * 1024
+DEFAULT_MULTIPART_COPY_PART_SIZE = 256 * 1024 * 1024
+MAX_COPY_OBJECT_SIZE = 5 * 1024 * 1024 * 1024
+MAX_MULTIPART_PARTS = 10000
+
+# Object headers carried over to the destination of a multipart copy
+_PRESERVED_OBJECT_HEADERS = (
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "ContentType",
+    "Expires",
+    "Metadata",
+    "StorageClass",
+)
+
+
+def multipart_copy_in_s3(
+    s3_client: type,
+    source_bucket: str,
+    destination_bucket: str,
+    file_key: str,
+    new_file_key: str,
+    source_head: dict | None = None,
+    part_size: int = DEFAULT_MULTIPART_COPY_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    checksum: TransferChecksum | None = None,
+    retry_budget: RetryBudget | None = None,
+    part_sizes: list | None = None,
+) -> str:
+    """
+    Copy an object with a multipart upload whose parts are copied server-side in parallel.
+
+    Content type, user metadata and the other object headers of the source are carried
+    over. Every part is copied with ``CopySourceIfMatch`` set to the source ETag, so a
+    source that changes mid-copy fails the copy instead of producing a mixed object. On
+    any failure the multipart upload is aborted so no orphaned parts are left behind.
+
+    With a ``checksum``, S3 computes a checksum of each part and of the new object, which
+    is stored in ``checksum.value``.
+
+    :param s3_client: The AWS S3 client
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param destination_bucket: The name of the destination bucket
+    :type destination_bucket: str
+    :param file_key: The name of the file in the source bucket
+    :type file_key: str
+    :param new_file_key: The new name of the file in the destination bucket
+    :type new_file_key: str
+    :param source_head: The head_object response for the source, fetched if not given
+    :type source_head: dict
+    :param part_size: The size of each copied part in bytes, raised if needed to stay within 10000 parts
+    :type part_size: int
+    :param max_workers: The maximum number of parts copied concurrently
+    :type max_workers: int
+    :param checksum: Receives the checksum of the new object
+    :type checksum: TransferChecksum
+    :param retry_budget: The retry budget shared by the part copies, defaults to a new budget for this copy
+    :type retry_budget: RetryBudget
+    :param part_sizes: The size of every part, e.g. the source's own parts, used instead of part_size
+    :type part_sizes: list
+    :return: The ETag of the new object
+    :rtype: str
+    """
+    budget = retry_budget or get_retry_policy().new_budget()
+    if source_head is None:
+        source_head = call_with_retry(s3_client.head_object, budget=budget, Bucket=source_bucket, Key=file_key)
+
+    size = source_head["ContentLength"]
+    if part_sizes:
+        ends = list(itertools.accumulate(part_sizes))
+        part_ranges = list(zip([0, *ends[:-1]], ends))
+    else:
+        part_size = max(part_size, -(-size // MAX_MULTIPART_PARTS))
+        part_ranges = [(start, min(start + part_size, size)) for start in range(0, max(size, 1), part_size)]
+    copy_source = {"Bucket": source_bucket, "Key": file_key}
+    if source_head.get("VersionId"):
+        copy_source["VersionId"] = source_head["VersionId"]
+
+    upload_kwargs = {header: source_head[header] for header in _PRESERVED_OBJECT_HEADERS if source_head.get(header)}
+    if checksum is not None:
+        upload_kwargs["ChecksumAlgorithm"] = checksum.algorithm
+    upload = call_with_retry(
+        s3_client.create_multipart_upload, budget=budget, Bucket=destination_bucket, Key=new_file_key, **upload_kwargs
+    )
+    upload_id = upload["UploadId"]
+
+    def copy_part(part_number: int, start: int, end: int) -> dict:
+        response = call_with_retry(
+            s3_client.upload_part_copy,
+            budget=budget,
+            Bucket=destination_bucket,
+            Key=new_file_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource=copy_source,
+            CopySourceRange=f"bytes={start}-{end - 1}",
+            CopySourceIfMatch=source_head["ETag"],
+        )
+        part = {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+        if checksum is not None and response["CopyPartResult"].get(checksum.response_key):
+            part[checksum.response_key] = response["CopyPartResult"][checksum.response_key]
+        return part
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parts = list(
+                executor.map(
+                    lambda part: copy_part(part[0], *part[1]),
+                    enumerate(part_ranges, start=1),
+                )
+            )
+
+        response = call_with_retry(
+            s3_client.complete_multipart_upload,
+            budget=budget,
+            Bucket=destination_bucket,
+            Key=new_file_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        log.debug(f"Source file {file_key} copied to {destination_bucket} in {len(parts)} parts")
+        if checksum is not None:
+            checksum.value = response.get(checksum.response_key)
+        return response.get("ETag")
+
+    except Exception as e:
+        log.error({"status": "ERROR", "message": e, "file_key": file_key, "upload_id": upload_id})
+        try:
+            call_with_retry(
+                s3_client.abort_multipart_upload,
+                budget=budget,
+                Bucket=destination_bucket,
+                Key=new_file_key,
+                UploadId=upload_id,
+            )
+        except botocore.exceptions.ClientError as abort_error:
+            log.error({"status": "ERROR", "message": abort_error, "upload_id": upload_id})
+        raise e
+
+
+def _source_part_sizes(
+    s3_client,
+    bucket: str,
+    file_key: str,
+    parts_count: int,
+    size: int,
+    budget: RetryBudget | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list | None:
+    """
+    Find the size of every part of a multipart object, or None if they can not be found.
+
+    GetObjectAttributes lists the parts of objects uploaded with checksums a thousand at a
+    time. When it does not list them all, every part number is HEADed instead.
+    """
+    sizes = []
+    try:
+        list_kwargs = {}
+        while True:
+            response = call_with_retry(
+                s3_client.get_object_attributes,
+                budget=budget,
+                Bucket=bucket,
+                Key=file_key,
+                ObjectAttributes=["ObjectParts"],
+                MaxParts=1000,
+                **list_kwargs,
+            )
+            object_parts = response.get("ObjectParts", {})
+            sizes.extend(part["Size"] for part in object_parts.get("Parts", []))
+            if not object_parts.get("IsTruncated") or not object_parts.get("Parts"):
+                break
+            list_kwargs["PartNumberMarker"] = object_parts["NextPartNumberMarker"]
+    except botocore.exceptions.ClientError as e:
+        log.debug(f"Parts of {file_key} not listed: {e}")
+
+    if len(sizes) != parts_count:
+
+        def part_size(part_number: int) -> int:
+            return call_with_retry(
+                s3_client.head_object, budget=budget, Bucket=bucket, Key=file_key, PartNumber=part_number
+            )["ContentLength"]
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                sizes = list(executor.map(part_size, range(1, parts_count + 1)))
+        except botocore.exceptions.ClientError as e:
+            log.warning({"status": "ERROR", "message": e, "file_key": file_key})
+            return None
+
+    return sizes if sum(sizes) == size else None
+
+
+def copy_object_in_s3(
+    s3_client: type,
+    source_bucket: str,
+    destination_bucket: str,
+    file_key: str,
+    new_file_key: str,
+    file_size: int | None = None,
+    multipart_threshold: int = DEFAULT_MULTIPART_COPY_THRESHOLD,
+    part_size: int = DEFAULT_MULTIPART_COPY_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    checksum: TransferChecksum | None = None,
+    retry_budget: RetryBudget | None = None,
+    source_head: dict | None = None,
+) -> str | None:
+    """
+    Copy an object server-side, switching to a parallel multipart copy for large objects.
+
+    If neither ``file_size`` nor ``source_head`` is given the source is HEADed to find its
+    size. Objects at or below ``multipart_threshold`` (and never above the 5 GB copy_object
+    limit) are copied with a single ``copy_object`` call; larger ones with
+    ``multipart_copy_in_s3``. With a ``source_head`` the copy is made with
+    ``CopySourceIfMatch`` on its ETag, so it is of the object that was HEADed.
+
+    With a ``checksum``, S3 computes the new object's checksum, which is returned in the
+    copy response and compared with the checksum of the source from the HEAD request, so
+    no extra request is made. A source whose stored checksum is composite (``"...-N"``, a
+    checksum of its part checksums) is copied part for part along the boundaries of its
+    own parts, so that S3 computes a composite checksum that can be compared with it. When
+    the source's part sizes can not be found the copy is not compared.
+
+    :param s3_client: The AWS S3 client
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param destination_bucket: The name of the destination bucket
+    :type destination_bucket: str
+    :param file_key: The name of the file in the source bucket
+    :type file_key: str
+    :param new_file_key: The new name of the file in the destination bucket
+    :type new_file_key: str
+    :param file_size: The size of the source object if already known
+    :type file_size: int
+    :param multipart_threshold: The size above which a multipart copy is used
+    :type multipart_threshold: int
+    :param part_size: The size of each copied part in bytes
+    :type part_size: int
+    :param max_workers: The maximum number of parts copied concurrently
+    :type max_workers: int
+    :param checksum: Receives the checksum of the new object
+    :type checksum: TransferChecksum
+    :param retry_budget: The retry budget to draw from, defaults to a new budget per call
+    :type retry_budget: RetryBudget
+    :param source_head: The head_object response for the source, with ChecksumMode enabled to verify a checksum
+    :type source_head: dict
+    :return: The ETag of the new object
+    :rtype: str
+    """
+    with measure("copy", destination_bucket) as op:
+        if source_head is None and file_size is None:
+            head_args = {"ChecksumMode": "ENABLED"} if checksum is not None else {}
+            source_head = call_with_retry(
+                s3_client.head_object, budget=retry_budget, Bucket=source_bucket, Key=file_key, **head_args
+            )
+        if source_head is not None:
+            file_size = source_head["ContentLength"]
+
+        expected = source_head.get(checksum.response_key) if checksum is not None and source_head else None
+        part_sizes = None
+        if expected and "-" in expected:
+            part_sizes = _source_part_sizes(
+                s3_client, source_bucket, file_key, int(_checksum_parts(expected)), file_size, retry_budget, max_workers
+            )
+            if part_sizes is None:
+                # A composite checksum over other part boundaries could never match
+                log.warning(f"Part sizes of {file_key} not found, its copy is not checksum verified")
+                expected = None
+
+        if part_sizes or file_size > min(multipart_threshold, MAX_COPY_OBJECT_SIZE):
+            etag = multipart_copy_in_s3(
+                s3_client,
+                source_bucket,
+                destination_bucket,
+                file_key,
+                new_file_key,
+                source_head=source_head,
+                part_size=part_size,
+                max_workers=max_workers,
+                checksum=checksum,
+                retry_budget=retry_budget,
+                part_sizes=part_sizes,
+            )
+        else:
+            copy_args = {"ChecksumAlgorithm": checksum.algorithm} if checksum is not None else {}
+            if source_head is not None:
+                copy_args["CopySourceIfMatch"] = source_head["ETag"]
+            response = call_with_retry(
+                s3_client.copy_object,
+                budget=retry_budget,
+                CopySource={"Bucket": source_bucket, "Key": file_key},
+                Bucket=destination_bucket,
+                Key=new_file_key,
+                **copy_args,
+            )
+            etag = response.get("CopyObjectResult", {}).get("ETag")
+            if checksum is not None:
+                checksum.value = response.get("CopyObjectResult", {}).get(checksum.response_key)
+
+        if checksum is not None and checksum.value is not None:
+            checksum.verify(expected, file_key)
+
+        op.bytes = file_size
+    return etag
+
+
+def copy_file_in_s3(
+    s3_client: type,
+    source_bucket: str,
+    destination_bucket: str,
+    file_key: str,
+    new_file_key: str,
+    delete_source_file: bool = True,
+    multipart_threshold: int = DEFAULT_MULTIPART_COPY_THRESHOLD,
+    checksum_algorithm: str | None = DEFAULT_CHECKSUM_ALGORITHM,
+    retry_budget: RetryBudget | None = None,
+) -> dict:
+    """
+    Copy a file from one S3 bucket to another overwriting a file if one already exists. Optionally delete the source file to make it a move operation.
+
+    NOTE: This operates as a move operation by default, with `delete_source_file=True`.
+    If you want this to behave as a true `copy` operation, make sure to set `delete_source_file=False` explicitly.
+
+    Files larger than `multipart_threshold` (or than the 5 GB copy_object limit) are copied
+    with parallel multipart part copies, preserving their metadata and content type.
+
+    The copy is verified before the source is deleted. S3 computes the new object's
+    checksum with the algorithm of the checksum stored for the source (falling back to
+    `checksum_algorithm` when the source has none) and the two are compared; a mismatch
+    raises OSError and the source is kept. When no checksum can be compared, the copy is
+    verified by its ETag matching a single-part source ETag or, for a multipart copy whose
+    parts were all copied with `CopySourceIfMatch`, by its size. A copy that can not be
+    verified keeps the source and is reported as ``"unverified"``.
+
+    Parameters
+    ----------
+    s3_client : type
+        The AWS S3 client session.
+    source_bucket : str
+        The name of the source bucket.
+    destination_bucket : str
+        The name of the destination bucket.
+    file_key : str
+        The name of the file in the source bucket.
+    new_file_key : str
+        The new name of the file in the destination bucket.
+    delete_source_file : bool, optional
+        Whether to delete the source file after copying (move operation), by default True.
+    multipart_threshold : int, optional
+        The size in bytes above which a multipart copy is used, by default 1 GiB.
+    checksum_algorithm : str, optional
+        The checksum algorithm used when the source stores no checksum, or None to verify
+        such copies by ETag or size only, by default DEFAULT_CHECKSUM_ALGORITHM.
+    retry_budget : RetryBudget, optional
+        The retry budget to draw from, e.g. one shared by a whole invocation, by default a
+        new budget per call.
+
+    Returns
+    -------
+    dict
+        ``status`` (``"moved"``, ``"copied"`` or ``"unverified"`` when the source was kept
+        because the copy could not be verified), whether the copy was ``verified``, and the
+        new object's ``etag`` and ``checksum`` (None if S3 did not compute one).
+
+    Raises
+    ------
+    botocore.exceptions.ClientError
+        If there is an error during the S3 copy or delete operation.
+    OSError
+        If the checksum of the copy does not match the source.
+    ValueError
+        If the source and destination are the same object.
+
+    Notes
+    -----
+    This function used to return None and verify a copy only by the destination key
+    existing. Callers upgrading should note that:
+
+    - it returns the dict described above; check its ``status`` rather than the return
+      value being None.
+    - with ``delete_source_file=True`` a copy that can not be verified keeps the source
+      and returns ``"unverified"``, where the source used to be deleted.
+    - the source is HEADed with ``ChecksumMode`` enabled before the copy, in place of the
+      HEAD of the destination made after it; IAM policies need ``s3:GetObject`` on the
+      source, and a KMS-encrypted source needs ``kms:Decrypt`` to read its checksum.
+    - a checksum mismatch raises OSError after the copy is written.
+    """
+    if source_bucket == destination_bucket and file_key == new_file_key:
+        raise ValueError(f"Cannot copy {file_key} onto itself in {source_bucket}")
+
+    try:
+        source_head = call_with_retry(
+            s3_client.head_object, budget=retry_budget, Bucket=source_bucket, Key=file_key, ChecksumMode="ENABLED"
+        )
+        algorithm = _stored_checksum_algorithm(source_head) or checksum_algorithm
+        checksum = TransferChecksum(algorithm) if algorithm else None
+
+        # Copy file from source bucket to destination bucket
+        etag = copy_object_in_s3(
+            s3_client,
+            source_bucket,
+            destination_bucket,
+            file_key,
+            new_file_key,
+            multipart_threshold=multipart_threshold,
+            checksum=checksum,
+            retry_budget=retry_budget,
+            source_head=source_head,
+        )
+        log.debug(f"Source file {file_key} copied from {source_bucket} to {destination_bucket}")
+
+        verified = checksum is not None and checksum.verified
+        if not verified:
+            verified = _copy_matches_source(source_head, {"ETag": etag})
+        if not verified and etag and "-" in etag:
+            # Every part was copied with CopySourceIfMatch, so the size confirms the copy
+            copied = call_with_retry(
+                s3_client.head_object, budget=retry_budget, Bucket=destination_bucket, Key=new_file_key
+            )
+            verified = copied["ContentLength"] == source_head["ContentLength"]
+        log.debug(f"File copy of {new_file_key} in {destination_bucket} verified: {verified}")
+
+        result = {
+            "status": "copied",
+            "verified": verified,
+            "etag": etag,
+            "checksum": checksum.value if checksum is not None else None,
+        }
+
+        # Delete source file if requested (move operation)
+        if delete_source_file:
+            if not verified:
+                # Keep the source when the copy can not be shown to match it
+                log.warning(f"Copy of {file_key} to {destination_bucket} could not be verified, keeping the source")
+                result["status"] = "unverified"
+                return result
+
+            call_with_retry(s3_client.delete_object, budget=retry_budget, Bucket=source_bucket, Key=file_key)
+            log.debug(f"Source file {file_key} deleted from {source_bucket}")
+            result["status"] = "moved"
+
+        return result
+
+    except botocore.exceptions.ClientError as e:
+        log.error({"status": "ERROR", "message": e})
+        raise e
+
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+MAX_DELETE_BATCH_SIZE = 1000
+
+
+def _delete_source_batch(
+    s3_client, source_bucket: str, file_keys: list, report: dict, budget: RetryBudget | None = None
+) -> None:
+    """
+    Delete a batch of source keys with one DeleteObjects call and record the outcome.
+    """
+    try:
+        response = call_with_retry(
+            s3_client.delete_objects,
+            budget=budget,
+            Bucket=source_bucket,
+            Delete={"Objects": [{"Key": file_key} for file_key in file_keys], "Quiet": True},
+        )
+        errors = {error["Key"]: error for error in response.get("Errors", [])}
+    except botocore.exceptions.ClientError as e:
+        log.error({"status": "ERROR", "message": e, "bucket": source_bucket, "keys": len(file_keys)})
+        errors = {file_key: {"Code": "ClientError", "Message": str(e)} for file_key in file_keys}
+
+    for file_key in file_keys:
+        if file_key in errors:
+            report[file_key]["status"] = "delete_failed"
+            report[file_key]["error"] = errors[file_key].get("Message") or errors[file_key].get("Code")
+        else:
+            report[file_key]["status"] = "moved"
+
+    log.debug(f"Deleted {len(file_keys) - len(errors)} source files from {source_bucket}")
+
+
+def _copy_matches_source(source: dict, copy_result: dict) -> bool:
+    """
+    Whether a CopyObject result shows the new object holds the same bytes as the source.
+    :param source: The source metadata, from a HEAD request or a listing
+    :type source: dict
+    :param copy_result: The CopyObjectResult of the copy
+    :type copy_result: dict
+    :return: Whether the ETags or a stored checksum match
+    :rtype: bool
+    """
+    # ETags of multipart uploads ("...-N") depend on the part sizes, not only on the bytes
+    source_etag = source.get("ETag")
+    if source_etag and "-" not in source_etag and copy_result.get("ETag") == source_etag:
+        return True
+
+    for field, value in source.items():
+        if field.startswith("Checksum") and field != "ChecksumType" and value and "-" not in value:
+            if copy_result.get(field) == value:
+                return True
+    return False
+
+
+def move_files_in_s3(
+    s3_client: type,
+    source_bucket: str,
+    destination_bucket: str,
+    file_keys: Iterable,
+    delete_source_files: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    delete_batch_size: int = MAX_DELETE_BATCH_SIZE,
+    source_metadata: dict | None = None,
+) -> dict:
+    """
+    Copy many files between buckets in parallel, optionally deleting the sources in batches.
+
+    Copies run on a bounded thread pool. Each source is described by its entry in
+    ``source_metadata`` (as yielded by ``iter_files_in_bucket(include_metadata=True)``) or
+    else by a HEAD request, and is copied with ``CopySourceIfMatch`` on its ETag. A copy is
+    verified when the ETag returned by ``copy_object`` equals the source ETag, or when a
+    checksum S3 stores for both objects matches. Multipart copies, whose ETags never match
+    the source, are verified by the checksum S3 stores for the source, as in
+    ``copy_file_in_s3``, or else by the size of the new object. Only verified sources are
+    deleted, with ``delete_objects`` in batches of up to 1000 keys while the remaining
+    copies are still running; the others are reported as ``"unverified"`` and kept. A
+    failure on one key never stops the others.
+
+    Parameters
+    ----------
+    s3_client : type
+        The AWS S3 client session.
+    source_bucket : str
+        The name of the source bucket.
+    destination_bucket : str
+        The name of the destination bucket.
+    file_keys : Iterable
+        ``(file_key, new_file_key)`` pairs, or a dict mapping source keys to new keys.
+    delete_source_files : bool, optional
+        Whether to delete the source files after copying (move operation), by default True.
+    max_workers : int, optional
+        The maximum number of concurrent copies.
+    delete_batch_size : int, optional
+        The number of keys per ``delete_objects`` call, at most 1000.
+    source_metadata : dict, optional
+        Listed metadata (``Size`` and ``ETag``) by source key, saving a HEAD request per file.
+
+    Returns
+    -------
+    dict
+        A report keyed by source key. Each entry holds ``new_file_key``, ``status``
+        (``"moved"``, ``"copied"``, ``"unverified"``, ``"copy_failed"`` or
+        ``"delete_failed"``), the copied object's ``etag`` and an ``error`` message when
+        something failed. A multipart copy whose checksum does not match the source is
+        reported as ``"copy_failed"``.
+    """
+    if not 0 < delete_batch_size <= MAX_DELETE_BATCH_SIZE:
+        raise ValueError(f"delete_batch_size must be between 1 and {MAX_DELETE_BATCH_SIZE}")
+
+    if isinstance(file_keys, dict):
+        file_keys = file_keys.items()
+
+    # All copies and deletes of this move draw their retries from one budget
+    budget = get_retry_policy().new_budget()
+
+    def describe_source(file_key: str) -> dict:
+        listed = (source_metadata or {}).get(file_key)
+        if listed and listed.get("ETag"):
+            return {"ETag": listed["ETag"], "ContentLength": listed.get("Size")}
+        return call_with_retry(
+            s3_client.head_object, budget=budget, Bucket=source_bucket, Key=file_key, ChecksumMode="ENABLED"
+        )
+
+    def copy_one(file_key: str, new_file_key: str) -> tuple:
+        source = describe_source(file_key)
+        try:
+            response = call_with_retry(
+                s3_client.copy_object,
+                budget=budget,
+                CopySource={"Bucket": source_bucket, "Key": file_key},
+                CopySourceIfMatch=source["ETag"],
+                Bucket=destination_bucket,
+                Key=new_file_key,
+            )
+        except botocore.exceptions.ClientError as e:
+            # Objects over the 5 GB copy_object limit are retried as a multipart copy, once
+            # their size confirms that was the reason for the InvalidRequest
+            if _error_code(e) != "InvalidRequest":
+                raise
+            if source.get("ContentLength") is None or _stored_checksum_algorithm(source) is None:
+                # Listed metadata holds no checksum, the HEAD returns the one stored for the source
+                source = call_with_retry(
+                    s3_client.head_object, budget=budget, Bucket=source_bucket, Key=file_key, ChecksumMode="ENABLED"
+                )
+            if source["ContentLength"] <= MAX_COPY_OBJECT_SIZE:
+                raise
+            algorithm = _stored_checksum_algorithm(source) or DEFAULT_CHECKSUM_ALGORITHM
+            checksum = TransferChecksum(algorithm) if algorithm else None
+            etag = copy_object_in_s3(
+                s3_client,
+                source_bucket,
+                destination_bucket,
+                file_key,
+                new_file_key,
+                checksum=checksum,
+                retry_budget=budget,
+                source_head=source,
+            )
+            if checksum is not None and checksum.verified:
+                return etag, True
+            # Every part was copied with CopySourceIfMatch, so the size confirms the copy
+            copied = call_with_retry(s3_client.head_object, budget=budget, Bucket=destination_bucket, Key=new_file_key)
+            return etag, copied["ContentLength"] == source.get("ContentLength")
+
+        copy_result = response.get("CopyObjectResult", {})
+        return copy_result.get("ETag"), _copy_matches_source(source, copy_result)
+
+    report = {}
+    pending_deletes = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for file_key, new_file_key in file_keys:
+            report[file_key] = {"new_file_key": new_file_key, "status": "pending", "etag": None, "error": None}
+            if source_bucket == destination_bucket and file_key == new_file_key:
+                # Moving an object onto itself would delete it
+                report[file_key]["status"] = "copy_failed"
+                report[file_key]["error"] = "the source and destination are the same object"
+                continue
+            futures[executor.submit(copy_one, file_key, new_file_key)] = file_key
+
+        for future in as_completed(futures):
+            file_key = futures[future]
+            result = report[file_key]
+            try:
+                result["etag"], verified = future.result()
+            except (botocore.exceptions.ClientError, OSError) as e:
+                log.error({"status": "ERROR", "message": e, "file_key": file_key})
+                result["status"] = "copy_failed"
+                result["error"] = str(e)
+                continue
+
+            if not result["etag"]:
+                result["status"] = "copy_failed"
+                result["error"] = "copy_object returned no ETag"
+                continue
+
+            if not verified:
+                # Keep the source when the copy can not be shown to match it
+                log.warning(f"Copy of {file_key} to {destination_bucket} could not be verified, keeping the source")
+                result["status"] = "unverified"
+                result["error"] = "the copy could not be verified against the source"
+                continue
+
+            result["status"] = "copied"
+            if delete_source_files:
+                pending_deletes.append(file_key)
+                if len(pending_deletes) >= delete_batch_size:
+                    _delete_source_batch(s3_client, source_bucket, pending_deletes, report, budget)
+                    pending_deletes = []
+
+    if pending_deletes:
+        _delete_source_batch(s3_client, source_bucket, pending_deletes, report, budget)
+
+    statuses = [result["status"] for result in report.values()]
+    log.info(
+        f"Moved files from {source_bucket} to {destination_bucket}: "
+        + ", ".join(f"{status}={statuses.count(status)}" for status in sorted(set(statuses)))
+    )
+
+    return report
+
+
+# Write Timestream file events as MULTI-measure records by default
+TIMESTREAM_MULTI_MEASURE = os.getenv("SDC_AWS_TIMESTREAM_MULTI_MEASURE", "").lower() in ("1", "true", "yes")
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_timestream_target(mission_name: str | None, environment: str) -> tuple:
+    """
+    Build the Timestream database and table names once per (mission, environment).
+    """
+    if not mission_name or mission_name == "hermes":
+        database_name = "sdc_aws_logs"
+        table_name = "sdc_aws_s3_bucket_log_table"
+    else:
+        database_name = f"{mission_name}_sdc_aws_logs"
+        table_name = f"{mission_name}_sdc_aws_s3_bucket_log_table"
+    database_name = f"dev-{database_name}" if environment == "DEVELOPMENT" else database_name
+    table_name = f"dev-{table_name}" if environment == "DEVELOPMENT" else table_name
+
+    return database_name, table_name
+
+
+def get_timestream_target(environment: str = "DEVELOPMENT") -> tuple:
+    """
+    Resolve the Timestream database and table names for the current mission.
+
+    Names are cached per (mission, environment); the cache is cleared by
+    ``clear_timestream_target_cache``, which ``sdc_aws_utils.config._reconfigure_globals``
+    calls when the mission changes.
+
+    :param environment: The environment
+    :type environment: str
+    :return: The database name and table name
+    :rtype: tuple
+    """
+    # Check environment variable for SWXSOC_MISSION
+    return _resolve_timestream_target(os.environ.get("SWXSOC_MISSION"), environment)
+
+
+def clear_timestream_target_cache() -> None:
+    """
+    Drop the cached Timestream database and table names.
+    :return: None
+    :rtype: None
+    """
+    _resolve_timestream_target.cache_clear()
+
+
+def build_timestream_record(
+    action_type: str,
+    file_key: str,
+    new_file_key: str = None,
+    source_bucket: str = None,
+    destination_bucket: str = None,
+    multi_measure: bool = False,
+) -> dict:
+    """
+    Build a single Timestream record for a file event.
+
+    By default the event attributes are written as dimensions of a single "timestamp"
+    measure. With ``multi_measure`` the file keys and the timestamp are folded into the
+    measure values of one MULTI record named "file_event", keeping only the action and the
+    buckets as dimensions, which makes each record smaller to build and to ingest.
+
+    :param action_type: The type of action performed
+    :type action_type: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param new_file_key: The new name of the file
+    :type new_file_key: str
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param destination_bucket: The name of the destination bucket
+    :type destination_bucket: str
+    :param multi_measure: Whether to build a MULTI-measure record
+    :type multi_measure: bool
+    :return: The Timestream record
+    :rtype: dict
+    """
+    now = time.time()
+
+    if multi_measure:
+        return {
+            "Time": str(int(now * 1000)),
+            "Dimensions": [
+                {"Name": "action_type", "Value": action_type},
+                {"Name": "source_bucket", "Value": source_bucket or "N/A"},
+                {"Name": "destination_bucket", "Value": destination_bucket or "N/A"},
+            ],
+            "MeasureName": "file_event",
+            "MeasureValueType": "MULTI",
+            "MeasureValues": [
+                {"Name": "file_key", "Value": file_key, "Type": "VARCHAR"},
+                {"Name": "new_file_key", "Value": new_file_key or "N/A", "Type": "VARCHAR"},
+                {"Name": "timestamp", "Value": str(now), "Type": "DOUBLE"},
+            ],
+        }
+
+    return {
+        "Time": str(int(now * 1000)),
+        "Dimensions": [
+            {"Name": "action_type", "Value": action_type},
+            {
+                "Name": "source_bucket",
+                "Value": source_bucket or "N/A",
+            },
+            {
+                "Name": "destination_bucket",
+                "Value": destination_bucket or "N/A",
+            },
+            {"Name": "file_key", "Value": file_key},
+            {
+                "Name": "new_file_key",
+                "Value": new_file_key or "N/A",
+            },
+        ],
+        "MeasureName": "timestamp",
+        "MeasureValue": str(now),
+        "MeasureValueType": "DOUBLE",
+    }
+
+
+class TimestreamBatchWriter:
+    """
+    Buffer Timestream records and write them in batches.
+
+    Records are grouped per (database, table) and flushed with a single ``write_records``
+    call when a group reaches ``max_records`` records or ``max_bytes`` bytes, or when its
+    oldest record is older than ``max_age`` seconds. The age is checked when a record is
+    added, by a background thread (unless ``background_flush`` is False) and whenever
+    ``flush_expired`` is called, e.g. at the end of a Lambda handler. Dimensions shared by
+    every record in a batch are sent once as ``CommonAttributes``. Pending records are
+    flushed when the writer is used as a context manager and exits, and at interpreter
+    shutdown.
+
+    A batch that fails with a throttling or transient error (those the retry policy
+    retries) stays buffered once the retries are spent, so the next flush writes it again.
+    Records that fail for any other reason, because Timestream rejected them or the whole
+    write was invalid (a malformed record, a missing table), would fail again: they are
+    dropped from the buffer, kept in ``rejected_records`` with their reasons and reported by
+    raising the error.
+
+    To route ``log_to_timestream`` through a writer, install it with
+    ``set_timestream_batch_writer``.
+    """
+
+    # Timestream accepts at most 100 records per WriteRecords call
+    MAX_RECORDS_PER_WRITE = 100
+
+    def __init__(
+        self,
+        timestream_client: type,
+        max_records: int = MAX_RECORDS_PER_WRITE,
+        max_bytes: int = 1024 * 1024,
+        max_age: float = 5.0,
+        background_flush: bool = True,
+    ) -> None:
+        if not 0 < max_records <= self.MAX_RECORDS_PER_WRITE:
+            raise ValueError(f"max_records must be between 1 and {self.MAX_RECORDS_PER_WRITE}")
+
+        self.timestream_client = timestream_client
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.records_written = 0
+        self.write_calls = 0
+        # Records Timestream rejected, each with the reason it gave
+        self.rejected_records: list = []
+
+        # (database, table) -> {"records": [...], "sizes": [...], "bytes": int, "started": float}
+        self._buffers: dict = {}
+        self._lock = threading.RLock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._flusher = None
+        if background_flush:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="sdc-aws-timestream-flush", daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "TimestreamBatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(buffer["records"]) for buffer in self._buffers.values())
+
+    def add_record(self, database_name: str, table_name: str, record: dict) -> None:
+        """
+        Buffer a record, flushing its (database, table) group if a limit is reached.
+
+        If a full batch has to be flushed before the record fits and that flush fails, the
+        record is still buffered before the error is raised, so it goes out with the next
+        flush and the caller does not have to add it again.
+
+        :param database_name: The name of the database
+        :type database_name: str
+        :param table_name: The name of the table
+        :type table_name: str
+        :param record: The Timestream record
+        :type record: dict
+        :return: None
+        :rtype: None
+        """
+        if self._closed:
+            raise RuntimeError("TimestreamBatchWriter is closed")
+
+        record_bytes = len(json.dumps(record))
+        target = (database_name, table_name)
+
+        with self._lock:
+            buffer = self._buffers.get(target)
+
+            # Flush first if this record would push the batch over a limit. A batch left
+            # full by a failed write is retried here before the record is buffered.
+            flush_error = None
+            if buffer and (
+                buffer["bytes"] + record_bytes > self.max_bytes or len(buffer["records"]) >= self.max_records
+            ):
+                try:
+                    self._flush_target(target)
+                except Exception as e:
+                    flush_error = e
+                buffer = self._buffers.get(target)
+
+            if buffer is None:
+                buffer = {"records": [], "sizes": [], "bytes": 0, "started": time.monotonic()}
+                self._buffers[target] = buffer
+
+            buffer["records"].append(record)
+            buffer["sizes"].append(record_bytes)
+            buffer["bytes"] += record_bytes
+
+            if flush_error is not None:
+                raise flush_error
+
+            if (
+                len(buffer["records"]) >= self.max_records
+                or buffer["bytes"] >= self.max_bytes
+                or time.monotonic() - buffer["started"] >= self.max_age
+            ):
+                self._flush_target(target)
+
+    def flush(self) -> None:
+        """
+        Write all buffered records to Timestream.
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            for target in list(self._buffers):
+                self._flush_target(target)
+
+    def flush_expired(self) -> None:
+        """
+        Write the buffered groups whose oldest record is older than max_age.
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            now = time.monotonic()
+            for target, buffer in list(self._buffers.items()):
+                if now - buffer["started"] >= self.max_age:
+                    self._flush_target(target)
+
+    def close(self) -> None:
+        """
+        Flush any buffered records and stop accepting new ones.
+        :return: None
+        :rtype: None
+        """
+        if self._closed:
+            return
+        self._stop.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            atexit.unregister(self.close)
+
+    def _flush_periodically(self) -> None:
+        # Wake often enough that no group outlives max_age by more than half of it
+        interval = max(self.max_age / 2, 0.05)
+        while not self._stop.wait(interval):
+            try:
+                self.flush_expired()
+            except Exception:
+                # _flush_target logged the error and kept the batch if a later flush can write it
+                pass
+
+    def _flush_target(self, target: tuple) -> None:
+        # A buffer can hold more than one write when records were added after a failed
+        # flush, so it is written in batches within max_records and max_bytes
+        buffer = self._buffers.get(target)
+        while buffer and buffer["records"]:
+            count = size = 0
+            for record_bytes in buffer["sizes"]:
+                if count and (count >= self.max_records or size + record_bytes > self.max_bytes):
+                    break
+                count += 1
+                size += record_bytes
+
+            try:
+                self._write_batch(target, buffer["records"][:count])
+            except Exception as e:
+                code = _error_code(e)
+                if code is None or code in get_retry_policy().retryable_codes:
+                    # Throttled or transient: keep the batch buffered so the next flush retries it
+                    log.error({"status": "ERROR", "message": e, "records": count})
+                    raise e
+                self._reject_batch(buffer["records"][:count], e)
+                self._drop_batch(target, count, size)
+                raise e
+
+            self._drop_batch(target, count, size)
+
+    def _drop_batch(self, target: tuple, count: int, size: int) -> None:
+        buffer = self._buffers[target]
+        del buffer["records"][:count]
+        del buffer["sizes"][:count]
+        buffer["bytes"] -= size
+        if not buffer["records"]:
+            del self._buffers[target]
+
+    def _write_batch(self, target: tuple, records: list) -> None:
+        database_name, table_name = target
+        common_dimensions = _common_dimensions(records)
+
+        kwargs = {"DatabaseName": database_name, "TableName": table_name}
+        if common_dimensions:
+            kwargs["CommonAttributes"] = {"Dimensions": common_dimensions}
+            records = [
+                {**record, "Dimensions": [d for d in record["Dimensions"] if d not in common_dimensions]}
+                for record in records
+            ]
+        kwargs["Records"] = records
+
+        with measure("write_records", f"{database_name}.{table_name}"):
+            call_with_retry(self.timestream_client.write_records, **kwargs)
+
+        self.records_written += len(records)
+        self.write_calls += 1
+        log.debug(f"Flushed {len(records)} records to Timestream table {database_name}.{table_name}")
+
+    def _reject_batch(self, records: list, error: Exception) -> None:
+        if _error_code(error) == "RejectedRecordsException":
+            # Timestream wrote every record except the rejected ones
+            rejected = error.response.get("RejectedRecords", [])
+            for rejection in rejected:
+                index = rejection.get("RecordIndex")
+                record = records[index] if index is not None and index < len(records) else None
+                self.rejected_records.append({**rejection, "Record": record})
+            self.records_written += len(records) - len(rejected)
+            self.write_calls += 1
+        else:
+            # The whole write was refused, so none of its records was written
+            rejected = [{"Reason": str(error), "ErrorCode": _error_code(error), "Record": r} for r in records]
+            self.rejected_records.extend(rejected)
+
+        log.error({"status": "ERROR", "message": error, "records": len(records), "rejected_records": rejected})
+
+
+def _common_dimensions(records: list) -> list:
+    """
+    Return the dimensions that appear with the same value in every record.
+    :param records: The Timestream records
+    :type records: list
+    :return: The shared dimensions
+    :rtype: list
+    """
+    if len(records) < 2:
+        return []
+
+    common = list(records[0]["Dimensions"])
+    for record in records[1:]:
+        common = [dimension for dimension in common if dimension in record["Dimensions"]]
+        if not common:
+            break
+
+    # Timestream requires at least one dimension on each record
+    if any(len(record["Dimensions"]) == len(common) for record in records):
+        common = common[:-1]
+
+    return common
+
+
+# Writer used by log_to_timestream when batching is enabled
+_TIMESTREAM_BATCH_WRITER: TimestreamBatchWriter | None = None
+
+
+def set_timestream_batch_writer(writer: TimestreamBatchWriter | None) -> TimestreamBatchWriter | None:
+    """
+    Route log_to_timestream through a batch writer, or restore direct writes with None.
+    :param writer: The batch writer to use
+    :type writer: TimestreamBatchWriter
+    :return: The previously installed writer
+    :rtype: TimestreamBatchWriter or None
+    """
+    global _TIMESTREAM_BATCH_WRITER
+
+    previous = _TIMESTREAM_BATCH_WRITER
+    _TIMESTREAM_BATCH_WRITER = writer
+    return previous
+
+
+def log_to_timestream(
+    timestream_client: type,
+    action_type: str,
+    file_key: str,
+    new_file_key: str = None,
+    source_bucket: str = None,
+    destination_bucket: str = None,
+    environment: str = "DEVELOPMENT",
+    multi_measure: bool | None = None,
+) -> None:
+    """
+    Log information to Timestream.
+
+    If a batch writer has been installed with ``set_timestream_batch_writer`` the record is
+    buffered on that writer (and written with its client) instead of being sent right away.
+
+    :param timestream_client: The Timestream Clien
+    :type timestream_client: str
+    :param action_type: The type of action performed
+    :type action_type: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param new_file_key: The new name of the file
+    :type new_file_key: str
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param destination_bucket: The name of the destination bucket
+    :type destination_bucket: str
+    :param environment: The environment
+    :type environment: str
+    :param multi_measure: Whether to write a MULTI-measure record, defaults to TIMESTREAM_MULTI_MEASURE
+    :type multi_measure: bool
+    :return: None
+    :rtype: None
+    """
+    log.debug("Logging to Timestream")
+    try:
+        if not source_bucket and not destination_bucket:
+            raise ValueError("A Source or Destination Buckets is required")
+
+        database_name, table_name = get_timestream_target(environment)
+        if multi_measure is None:
+            multi_measure = TIMESTREAM_MULTI_MEASURE
+        record = build_timestream_record(
+            action_type, file_key, new_file_key, source_bucket, destination_bucket, multi_measure=multi_measure
+        )
+
+        writer = _TIMESTREAM_BATCH_WRITER
+        if writer is not None:
+            writer.add_record(database_name, table_name, record)
+            log.debug(f"File {file_key} Buffered for Timestream")
+            return
+
+        # Write to Timestream
+        with measure("write_records", f"{database_name}.{table_name}"):
+            call_with_retry(
+                timestream_client.write_records,
+                DatabaseName=database_name,
+                TableName=table_name,
+                Records=[record],
+            )
+
+        log.debug(f"File {file_key} Successfully Logged to Timestream")
+
+    except Exception as e:
+        log.error({"status": "ERROR", "message": e})
+
+        raise e
+
+
+def get_reprocessing_function_name(environment: str) -> str:
+    """
+    Return the name of the processing Lambda function for an environment.
+    :param environment: The environment
+    :type environment: str
+    :return: The Lambda function name
+    :rtype: str
+    """
+    return f"{'dev-' if environment == 'DEVELOPMENT' else ''}aws_sdc_processing_lambda_function"
+
+
+def build_reprocessing_payload(objects: list) -> dict:
+    """
+    Build the SNS-shaped event the processing Lambda expects for a list of S3 objects.
+    :param objects: (bucket, key) pairs
+    :type objects: list
+    :return: The Lambda event
+    :rtype: dict
+    """
+    s3_records = [{"s3": {"bucket": {"name": bucket}, "object": {"key": key}}} for bucket, key in objects]
+    return {"Records": [{"Sns": {"Message": json.dumps({"Records": s3_records})}}]}
+
+
+# Invoke Reprocessing Lambda
+def invoke_reprocessing_lambda(bucket: str, key: str, environment: str) -> None:
+    """
+    Invoke the Reprocessing Lambda.
+    :param bucket: The name of the bucket holding the file
+    :type bucket: str
+    :param key: The key of the file to reprocess
+    :type key: str
+    :param environment: The environment
+    :type environment: str
+    :return: The Lambda invoke response
+    :rtype: dict
+    """
+    # Create the JSON structure
+    data = build_reprocessing_payload([(bucket, key)])
+
+    # Reuse the pooled boto3 client for Lambda
+    lambda_client = get_client("lambda")
+
+    # Specify the Lambda function name
+    function_name = get_reprocessing_function_name(environment)
+
+    log.info(f"Invoking Lambda function {function_name} with payload {data}")
+
+    # Invoke the Lambda function
+    response = call_with_retry(
+        lambda_client.invoke, FunctionName=function_name, InvocationType="Event", Payload=json.dumps(data)
+    )
+    return response
+
 
-    Expected output formats:
-    - raw: Padre/meddea/raw/{year}/{month}/{day}/
-    - l0:  Padre/meddea/l0/{descriptor}/{year}/{month}/
-    - l1:  Padre/meddea/l1/{descriptor}/{year}/{month}/
+# Asynchronous Lambda invocations accept payloads of at most 256 KB
+MAX_ASYNC_PAYLOAD_BYTES = 256 * 1024
 
-    The descriptor (e.g., spectrum, eventlist, housekeeping) is extracted from the parsed metadata.
 
-    :param science_file_parser: A callable that returns metadata from the file key.
-    :param old_file_key: The original file name/key.
-    :return: The formatted S3 file key.
+class RateLimiter:
     """
-    try:
-        science_file = science_file_parser(old_file_key)
-        time_value = science_file["time"].value
-
-        if isinstance(time_value, datetime):
-            timestamp = time_value
-        else:
-            timestamp = datetime.strptime(time_value, "%Y-%m-%dT%H:%M:%S.%f")
+    Thread-safe limiter that spaces out calls to at most ``rate`` per second.
 
-        year = timestamp.year
-        month = f"{timestamp.month:02d}"
-        day = f"{timestamp.day:02d}"
-        level = science_file["level"]
-        descriptor = science_file.get("descriptor")
+    Calls to ``acquire`` block until the next slot is free. A ``rate`` of None disables
+    limiting.
+    """
 
-        if not descriptor:
-            descriptor = "unknown"
+    def __init__(self, rate: float | None) -> None:
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
 
-        # Short names to long names mapping for descriptors
-        descriptor_mapping = {
-            "spec": "spectrum",
-            "eventlist": "eventlist",
-            "hk": "housekeeping",
-        }
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
 
-        if descriptor in descriptor_mapping:
-            descriptor = descriptor_mapping[descriptor]
 
-        # Get first valid_data_level from config
-        valid_data_levels = config.get("mission").get("valid_data_levels", ["l0", "l1", "ql"])
+def _pack_reprocessing_batches(objects: Iterable, max_payload_bytes: int, max_records: int) -> Iterator:
+    """
+    Group (bucket, key) pairs into batches whose SNS-shaped payload fits in max_payload_bytes.
+    """
+    # Size of the payload without any S3 records
+    overhead = len(json.dumps(build_reprocessing_payload([])))
+    batch = []
+    batch_bytes = overhead
+
+    for bucket, key in objects:
+        record = {"s3": {"bucket": {"name": bucket}, "object": {"key": key}}}
+        # The S3 event is JSON encoded inside the SNS message, so it is escaped twice
+        record_bytes = len(json.dumps(json.dumps(record))) - 2 + len(", ")
+        if record_bytes + overhead > max_payload_bytes:
+            raise ValueError(f"Key {key} is too long to fit in a reprocessing payload")
+
+        if batch and (batch_bytes + record_bytes > max_payload_bytes or len(batch) >= max_records):
+            yield batch
+            batch = []
+            batch_bytes = overhead
+
+        batch.append((bucket, key))
+        batch_bytes += record_bytes
+
+    if batch:
+        yield batch
+
+
+def invoke_reprocessing_lambdas(
+    objects: Iterable,
+    environment: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_rate: float | RateLimiter | None = 10.0,
+    max_payload_bytes: int = MAX_ASYNC_PAYLOAD_BYTES,
+    max_records_per_payload: int = 500,
+    max_retries: int | None = None,
+    lambda_client: type | None = None,
+) -> dict:
+    """
+    Invoke the processing Lambda for many files with batched, rate-limited async invocations.
+
+    The (bucket, key) pairs are packed into as few SNS-shaped payloads as fit in the 256 KB
+    async payload limit, and the invocations are sent concurrently on one pooled client,
+    at most ``max_rate`` per second. Throttled invocations are retried under the installed
+    retry policy, with all batches sharing one retry budget; other failures mark the
+    batch's keys as failed. ``objects`` is consumed as batches are sent, with at most twice
+    ``max_workers`` batches in flight, so a generator of keys is streamed rather than held
+    in memory.
+
+    :param objects: (bucket, key) pairs of the files to reprocess
+    :type objects: Iterable
+    :param environment: The environment
+    :type environment: str
+    :param max_workers: The maximum number of concurrent invocations
+    :type max_workers: int
+    :param max_rate: The maximum number of invocations per second, None for no limit, or a RateLimiter shared with other callers
+    :type max_rate: float or RateLimiter
+    :param max_payload_bytes: The maximum size of each payload
+    :type max_payload_bytes: int
+    :param max_records_per_payload: The maximum number of files per payload
+    :type max_records_per_payload: int
+    :param max_retries: The maximum number of retries of a throttled invocation, defaults to the retry policy's
+    :type max_retries: int
+    :param lambda_client: The Lambda client, defaults to the pooled client
+    :type lambda_client: type
+    :return: A summary with the accepted keys, the failed keys and their errors, and the number of invocations
+    :rtype: dict
+    """
+    lambda_client = lambda_client or get_client("lambda")
+    function_name = get_reprocessing_function_name(environment)
+    rate_limiter = max_rate if isinstance(max_rate, RateLimiter) else RateLimiter(max_rate)
+    policy = get_retry_policy()
+    if max_retries is not None:
+        policy = RetryPolicy(
+            max_attempts=max_retries + 1,
+            base_delay=policy.base_delay,
+            max_delay=policy.max_delay,
+            retry_budget=policy.retry_budget,
+            retryable_codes=policy.retryable_codes,
+        )
+    budget = policy.new_budget()
 
-        if level == valid_data_levels[0]:
-            new_file_key = f"{level}/{year}/{month}/{day}/{old_file_key}"
-        else:
-            new_file_key = f"{level}/{descriptor}/{year}/{month}/{day}/{old_file_key}"
+    def invoke(payload: str) -> dict:
+        # Retries wait for a rate limiter slot like first attempts
+        rate_limiter.acquire()
+        return lambda_client.invoke(FunctionName=function_name, InvocationType="Event", Payload=payload)
 
-        return new_file_key
+    def invoke_batch(batch: list) -> None:
+        policy.call(invoke, json.dumps(build_reprocessing_payload(batch)), budget=budget)
 
-    except Exception as e:
-        log.error({"status": "ERROR", "message": str(e), "file_key": old_file_key})
-        raise
+    summary = {"accepted": [], "failed": {}, "invocations": 0}
 
+    batches = _pack_reprocessing_batches(objects, max_payload_bytes, max_records_per_payload)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        for batch in itertools.islice(batches, 2 * max_workers):
+            in_flight[executor.submit(invoke_batch, batch)] = batch
 
-def list_files_in_bucket(s3_client, bucket_name: str) -> list:
-    files = []
-    paginator = s3_client.get_paginator("list_objects_v2")
-    for page in paginator.paginate(Bucket=bucket_name):
-        for obj in page.get("Contents", []):
-            files.append(obj["Key"])
-    return files
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    future.result()
+                    summary["invocations"] += 1
+                    summary["accepted"].extend(key for _, key in batch)
+                except Exception as e:
+                    log.error({"status": "ERROR", "message": e, "function_name": function_name, "keys": len(batch)})
+                    summary["failed"].update({key: str(e) for _, key in batch})
 
+                next_batch = next(batches, None)
+                if next_batch is not None:
+                    in_flight[executor.submit(invoke_batch, next_batch)] = next_batch
 
-def check_file_existence_in_target_buckets(s3_client, file_key: str, source_bucket: str, target_buckets: list) -> bool:
-    for target_bucket in target_buckets:
-        if object_exists(s3_client, target_bucket, file_key):
-            print(f"File {file_key} from {source_bucket} exists in {target_bucket}")
-            return True
-        else:
-            print(f"File {file_key} from {source_bucket} does not exist in {target_bucket}")
+    log.info(
+        f"Invoked {function_name} {summary['invocations']} times for {len(summary['accepted'])} files,"
+        f" {len(summary['failed'])} files failed"
+    )
 
-    return False
+    return summary
 
 
-def object_exists(s3_client, bucket: str, file_key: str) -> bool:
+class DownloadCache:
     """
-    Check if a file exists in the specified bucket, and optionally if its content matches a given hash.
+    Persistent, content-addressed cache of downloaded S3 objects with LRU eviction.
 
-    :param s3_client: The AWS S3 client
-    :param bucket: The name of the bucket
-    :param file_key: The name of the file
-    :param file_content: Content of the file to compare its hash with the existing one. Defaults to None.
-    :return: True if the file exists and (optionally) its content matches, False otherwise.
+    Entries are keyed by (bucket, key, ETag or VersionId), so a changed object is never
+    served from the cache. Cached files live under ``directory`` and survive across warm
+    invocations (or across runs when the directory is on persistent storage). When the
+    total size exceeds ``max_bytes`` the least recently used entries are evicted, keeping
+    the cache within Lambda's ephemeral storage.
+
+    Files are hard-linked in and out of the cache where the filesystem allows it, so a
+    cached download should be treated as read-only by the caller.
+
+    Hits, misses and evictions are counted in ``stats``.
     """
-    try:
-        s3_client.head_object(Bucket=bucket, Key=file_key)
-        return True
-    except botocore.exceptions.ClientError:
-        return False
 
+    def __init__(self, directory: str | Path | None = None, max_bytes: int | None = None) -> None:
+        self.directory = Path(directory or os.getenv("SDC_AWS_CACHE_DIR") or "/tmp/sdc_aws_cache")
+        self.max_bytes = int(max_bytes or os.getenv("SDC_AWS_CACHE_MAX_BYTES") or 256 * 1024 * 1024)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.current_bytes = 0
+        # Cache file name -> size, least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Pick up entries left by earlier invocations, oldest first
+        existing = [
+            (entry.stat().st_mtime, entry.name, entry.stat().st_size)
+            for entry in self.directory.iterdir()
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+        for _, name, size in sorted(existing):
+            self._entries[name] = size
+            self.current_bytes += size
+        self._evict()
+
+    @staticmethod
+    def cache_key(bucket: str, file_key: str, version: str) -> str:
+        """
+        Return the cache file name for an object version.
+        :param bucket: The name of the bucket
+        :type bucket: str
+        :param file_key: The name of the file
+        :type file_key: str
+        :param version: The object's ETag or VersionId
+        :type version: str
+        :return: The cache file name
+        :rtype: str
+        """
+        return hashlib.sha256(f"{bucket}\0{file_key}\0{version}".encode()).hexdigest()
+
+    def get(self, bucket: str, file_key: str, version: str) -> Path | None:
+        """
+        Look up a cached object.
+        :param bucket: The name of the bucket
+        :type bucket: str
+        :param file_key: The name of the file
+        :type file_key: str
+        :param version: The object's ETag or VersionId
+        :type version: str
+        :return: The path of the cached file, or None on a miss
+        :rtype: Path or None
+        """
+        name = self.cache_key(bucket, file_key, version)
+        path = self.directory / name
+
+        with self._lock:
+            if name in self._entries and path.exists():
+                self._entries.move_to_end(name)
+                self.stats["hits"] += 1
+                os.utime(path)
+                return path
+
+            if name in self._entries:
+                # Removed from disk behind our back
+                self.current_bytes -= self._entries.pop(name)
+            self.stats["misses"] += 1
+            return None
 
-def download_file_from_s3(s3_client: type, source_bucket: str, file_key: str, parsed_file_key: str) -> Path:
+    def put(self, bucket: str, file_key: str, version: str, file_path: str | Path) -> Path:
+        """
+        Add a downloaded file to the cache, hard-linking it where possible to avoid a copy.
+        :param bucket: The name of the bucket
+        :type bucket: str
+        :param file_key: The name of the file
+        :type file_key: str
+        :param version: The object's ETag or VersionId
+        :type version: str
+        :param file_path: The downloaded file
+        :type file_path: str or Path
+        :return: The path of the cached file
+        :rtype: Path
+        """
+        name = self.cache_key(bucket, file_key, version)
+        path = self.directory / name
+        size = os.path.getsize(file_path)
+
+        if size > self.max_bytes:
+            log.debug(f"File {file_key} ({size} bytes) is larger than the download cache, not caching")
+            return Path(file_path)
+
+        tmp_path = path.with_suffix(".tmp")
+        _link_or_copy(file_path, tmp_path)
+        tmp_path.replace(path)
+
+        with self._lock:
+            if name in self._entries:
+                self.current_bytes -= self._entries.pop(name)
+            self._entries[name] = size
+            self.current_bytes += size
+            self._evict()
+
+        return path
+
+    def clear(self) -> None:
+        """
+        Remove every cached file.
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            for name in self._entries:
+                (self.directory / name).unlink(missing_ok=True)
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _evict(self) -> None:
+        while self.current_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            (self.directory / name).unlink(missing_ok=True)
+            self.current_bytes -= size
+            self.stats["evictions"] += 1
+
+
+def _link_or_copy(source: str | Path, destination: str | Path) -> None:
     """
-    Download a file from an S3 bucket.
-    :param s3_client: The AWS session
-    :type s3_client: str
-    :param source_bucket: The name of the source bucket
-    :type source_bucket: str
-    :param file_key: The name of the file
-    :type file_key: str
-    :param parsed_file_key: The parsed name of the file
-    :type parsed_file_key: str
-    :return: The path to the downloaded file
-    :rtype: Path
+    Hard-link a file to a new path, falling back to a copy across filesystems.
     """
+    Path(destination).unlink(missing_ok=True)
     try:
-        # Initialize S3 Client
-        log.info(f"Downloading file {parsed_file_key} from {source_bucket}")
-
-        # Download file to tmp directory
-        s3_client.download_file(source_bucket, file_key, f"/tmp/{parsed_file_key}")
-
-        log.debug(f"File {file_key} Successfully Downloaded")
-
-        return Path(f"/tmp/{parsed_file_key}")
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
 
-    except botocore.exceptions.ClientError as e:
-        log.error({"status": "ERROR", "message": e})
 
-        raise e
+# Cache used by get_science_file when no cache is passed explicitly
+_DOWNLOAD_CACHE: DownloadCache | None = None
 
 
-def upload_file_to_s3(s3_client: str, filename: str, destination_bucket: str, file_key: str) -> Path:
+def set_download_cache(cache: DownloadCache | None) -> DownloadCache | None:
     """
-    Upload a file to an S3 bucket.
-    :param session: The AWS session
-    :type session: str
-    :param filename: The name of the file
-    :type filename: str
-    :param destination_bucket: The name of the destination bucket
-    :type destination_bucket: str
-    :param file_key: The name of the file
-    :type file_key: str
-    :return: The path to the uploaded file
-    :rtype: Path
+    Install the download cache used by get_science_file, or disable caching with None.
+    :param cache: The download cache to use
+    :type cache: DownloadCache
+    :return: The previously installed cache
+    :rtype: DownloadCache or None
     """
-    try:
-        # Initialize S3 Client
-        log.info(f"Uploading file {file_key} to {destination_bucket}")
+    global _DOWNLOAD_CACHE
 
-        file_path = f"/tmp/{filename}"
+    previous = _DOWNLOAD_CACHE
+    _DOWNLOAD_CACHE = cache
+    return previous
 
-        # Upload file to destination bucket
-        s3_client.upload_file(file_path, destination_bucket, file_key)
 
-        log.debug(f"File {file_key} Successfully Uploaded")
+def get_download_cache() -> DownloadCache | None:
+    """
+    Return the installed download cache, creating one if SDC_AWS_CACHE_DIR is set.
+    :return: The download cache, or None if caching is disabled
+    :rtype: DownloadCache or None
+    """
+    global _DOWNLOAD_CACHE
 
-        return Path(file_path)
+    if _DOWNLOAD_CACHE is None and os.getenv("SDC_AWS_CACHE_DIR"):
+        _DOWNLOAD_CACHE = DownloadCache()
+    return _DOWNLOAD_CACHE
 
-    except boto3.exceptions.S3UploadFailedError as e:
-        log.error({"status": "ERROR", "message": e})
 
-        raise e
+# Return modes for get_science_file
+SCIENCE_FILE_MODES = ("file", "memory", "mmap")
 
 
-def copy_file_in_s3(
+def download_file_to_memory(
     s3_client: type,
     source_bucket: str,
-    destination_bucket: str,
     file_key: str,
-    new_file_key: str,
-    delete_source_file: bool = True,
-) -> None:
+    checksum: TransferChecksum | None = None,
+    retry_budget: RetryBudget | None = None,
+) -> memoryview:
     """
-    Copy a file from one S3 bucket to another overwriting a file if one already exists. Optionally delete the source file to make it a move operation.
+    Download an object straight into a preallocated in-memory buffer.
 
-    NOTE: This operates as a move operation by default, with `delete_source_file=True`.
-    If you want this to behave as a true `copy` operation, make sure to set `delete_source_file=False` explicitly.
-
-    Parameters
-    ----------
-    s3_client : type
-        The AWS S3 client session.
-    source_bucket : str
-        The name of the source bucket.
-    destination_bucket : str
-        The name of the destination bucket.
-    file_key : str
-        The name of the file in the source bucket.
-    new_file_key : str
-        The new name of the file in the destination bucket.
-    delete_source_file : bool, optional
-        Whether to delete the source file after copying (move operation), by default True.
+    The buffer is sized from the response's Content-Length and filled in place with
+    ``readinto``, so the object is neither staged on disk nor copied between buffers.
+    A ``checksum`` is updated as each block arrives and compared with the object's.
 
-    Raises
-    ------
-    botocore.exceptions.ClientError
-        If there is an error during the S3 copy or delete operation.
+    :param s3_client: The AWS S3 client
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param checksum: The checksum to compute and verify during the download
+    :type checksum: TransferChecksum
+    :param retry_budget: The retry budget to draw from, defaults to a new budget per call
+    :type retry_budget: RetryBudget
+    :return: A read-only view of the object's bytes
+    :rtype: memoryview
     """
-
     try:
-        # Create copy source object
-        copy_source = {"Bucket": source_bucket, "Key": file_key}
+        log.info(f"Downloading file {file_key} from {source_bucket} into memory")
 
-        # Copy file from source bucket to destination bucket
-        s3_client.copy_object(
-            CopySource=copy_source,
-            Bucket=destination_bucket,
-            Key=new_file_key,
+        request = {"ChecksumMode": "ENABLED"} if checksum is not None else {}
+        response = call_with_retry(
+            s3_client.get_object, budget=retry_budget, Bucket=source_bucket, Key=file_key, **request
         )
-        log.debug(f"Source file {file_key} copied from {source_bucket} to {destination_bucket}")
-
-        # Verify the file was copied successfully
-        success = object_exists(s3_client, destination_bucket, new_file_key)
-        log.debug(f"File copy verification for {new_file_key} in {destination_bucket}: {success}")
-
-        # Delete source file if requested (move operation)
-        if delete_source_file and success:
-            s3_client.delete_object(Bucket=source_bucket, Key=file_key)
-            log.debug(f"Source file {file_key} deleted from {source_bucket}")
+        size = response["ContentLength"]
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        body = response["Body"]
+
+        offset = 0
+        while offset < size:
+            read = body.readinto(view[offset:])
+            if not read:
+                break
+            if checksum is not None:
+                checksum.update(view[offset : offset + read])
+            offset += read
+        body.close()
+
+        if offset != size:
+            raise OSError(f"Incomplete download of {file_key}: received {offset} of {size} bytes")
+        if checksum is not None:
+            checksum.verify(response.get(checksum.response_key), file_key)
+
+        log.debug(f"File {file_key} Successfully Downloaded into memory")
+
+        return view.toreadonly()
 
     except botocore.exceptions.ClientError as e:
         log.error({"status": "ERROR", "message": e})
+
         raise e
 
 
-def log_to_timestream(
-    timestream_client: type,
-    action_type: str,
-    file_key: str,
-    new_file_key: str = None,
-    source_bucket: str = None,
-    destination_bucket: str = None,
-    environment: str = "DEVELOPMENT",
-) -> None:
+# Requested ranges separated by at most this many bytes are fetched with one GET
+DEFAULT_RANGE_COALESCE_GAP = 64 * 1024
+
+# Maximum number of object sizes kept by the ranged-read size cache
+OBJECT_SIZE_CACHE_SIZE = int(os.getenv("SDC_AWS_OBJECT_SIZE_CACHE_SIZE", "4096"))
+
+# (bucket, key) -> size learned from ranged reads, least recently used first
+_OBJECT_SIZES: OrderedDict = OrderedDict()
+_OBJECT_SIZES_LOCK = threading.Lock()
+
+
+def _cache_object_size(bucket: str, file_key: str, size: int) -> None:
+    with _OBJECT_SIZES_LOCK:
+        _OBJECT_SIZES[(bucket, file_key)] = size
+        _OBJECT_SIZES.move_to_end((bucket, file_key))
+        while len(_OBJECT_SIZES) > OBJECT_SIZE_CACHE_SIZE:
+            _OBJECT_SIZES.popitem(last=False)
+
+
+def get_object_size(s3_client: type, bucket: str, file_key: str) -> int:
     """
-    Log information to Timestream.
-    :param timestream_client: The Timestream Clien
-    :type timestream_client: str
-    :param database_name: The name of the database
-    :type database_name: str
-    :param table_name: The name of the table
-    :type table_name: str
-    :param action_type: The type of action performed
-    :type action_type: str
+    Return the size of an object, from the size cache or with a HEAD request.
+    :param s3_client: The AWS S3 client
+    :param bucket: The name of the bucket
+    :type bucket: str
     :param file_key: The name of the file
     :type file_key: str
-    :param new_file_key: The new name of the file
-    :type new_file_key: str
-    :param source_bucket: The name of the source bucket
-    :type source_bucket: str
-    :param destination_bucket: The name of the destination bucket
-    :type destination_bucket: str
-    :param environment: The environment
-    :type environment: str
+    :return: The size of the object in bytes
+    :rtype: int
+    """
+    with _OBJECT_SIZES_LOCK:
+        size = _OBJECT_SIZES.get((bucket, file_key))
+        if size is not None:
+            _OBJECT_SIZES.move_to_end((bucket, file_key))
+            return size
+
+    size = call_with_retry(s3_client.head_object, Bucket=bucket, Key=file_key)["ContentLength"]
+    _cache_object_size(bucket, file_key, size)
+    return size
+
+
+def clear_object_size_cache() -> None:
+    """
+    Forget every object size learned by read_byte_ranges.
     :return: None
     :rtype: None
     """
-    log.debug("Logging to Timestream")
-    CURRENT_TIME = str(int(time.time() * 1000))
-    try:
-        if not source_bucket and not destination_bucket:
-            raise ValueError("A Source or Destination Buckets is required")
+    with _OBJECT_SIZES_LOCK:
+        _OBJECT_SIZES.clear()
 
-        # Check environment variable for SWXSOC_MISSION
-        mission_name = os.getenv("SWXSOC_MISSION")
-        if not mission_name or mission_name == "hermes":
-            database_name = "sdc_aws_logs"
-            table_name = "sdc_aws_s3_bucket_log_table"
+
+def _coalesce_ranges(ranges: list, max_gap: int) -> list:
+    """
+    Merge sorted (start, end, index) ranges separated by at most max_gap bytes.
+    :return: [start, end, members] groups, members being the ranges each group covers
+    :rtype: list
+    """
+    groups: list = []
+    for start, end, index in sorted(ranges):
+        if groups and start <= groups[-1][1] + max_gap:
+            groups[-1][1] = max(groups[-1][1], end)
+            groups[-1][2].append((start, end, index))
         else:
-            database_name = f"{mission_name}_sdc_aws_logs"
-            table_name = f"{mission_name}_sdc_aws_s3_bucket_log_table"
-        database_name = f"dev-{database_name}" if environment == "DEVELOPMENT" else database_name
-        table_name = f"dev-{table_name}" if environment == "DEVELOPMENT" else table_name
+            groups.append([start, end, [(start, end, index)]])
+    return groups
 
-        # Write to Timestream
-        timestream_client.write_records(
-            DatabaseName=database_name,
-            TableName=table_name,
-            Records=[
-                {
-                    "Time": CURRENT_TIME,
-                    "Dimensions": [
-                        {"Name": "action_type", "Value": action_type},
-                        {
-                            "Name": "source_bucket",
-                            "Value": source_bucket or "N/A",
-                        },
-                        {
-                            "Name": "destination_bucket",
-                            "Value": destination_bucket or "N/A",
-                        },
-                        {"Name": "file_key", "Value": file_key},
-                        {
-                            "Name": "new_file_key",
-                            "Value": new_file_key or "N/A",
-                        },
-                    ],
-                    "MeasureName": "timestamp",
-                    "MeasureValue": str(datetime.utcnow().timestamp()),
-                    "MeasureValueType": "DOUBLE",
-                },
-            ],
-        )
 
-        log.debug(f"File {file_key} Successfully Logged to Timestream")
+def _read_range(s3_client, bucket: str, file_key: str, start: int, end: int) -> tuple:
+    """
+    Read bytes [start, end) of an object into a new buffer.
+    :return: A view of the bytes read (shorter than requested past the end of the object) and the object size
+    :rtype: tuple
+    """
+    with measure("range_read", bucket) as op:
+        try:
+            response = call_with_retry(
+                s3_client.get_object, Bucket=bucket, Key=file_key, Range=f"bytes={start}-{end - 1}"
+            )
+        except botocore.exceptions.ClientError as e:
+            # The range starts past the end of the object
+            if _error_code(e) == "InvalidRange":
+                return memoryview(b""), None
+            raise
+
+        size = response["ContentLength"]
+        view = memoryview(bytearray(size))
+        body = response["Body"]
+        offset = 0
+        while offset < size:
+            read = body.readinto(view[offset:])
+            if not read:
+                break
+            offset += read
+        body.close()
+        op.bytes = offset
+
+    if offset != size:
+        raise OSError(f"Incomplete read of {file_key}: received {offset} of {size} bytes")
+
+    # Content-Range is "bytes start-end/total"
+    total = response.get("ContentRange", "").rpartition("/")[2]
+    return view, int(total) if total.isdigit() else None
+
+
+def read_byte_ranges(
+    s3_client: type,
+    bucket: str,
+    file_key: str,
+    ranges: Iterable,
+    max_gap: int = DEFAULT_RANGE_COALESCE_GAP,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list:
+    """
+    Read several byte ranges of an object without downloading all of it.
 
-    except Exception as e:
-        log.error({"status": "ERROR", "message": e})
+    Useful when only a file's header (FITS or CDF headers, the first packets of a raw
+    binary) is needed. Ranges are given as ``(offset, length)``; a negative offset counts
+    from the end of the object. Ranges that overlap or are at most ``max_gap`` bytes apart
+    are merged into one GET, and the GETs run concurrently. Each result is a read-only
+    ``memoryview`` into the buffer of its GET, so no bytes are copied. Ranges reaching past
+    the end of the object are truncated.
 
-        raise e
+    The object's size, reported by every ranged GET, is cached per (bucket, key) so
+    later reads can resolve negative offsets and clamp ranges without a HEAD request.
+
+    :param s3_client: The AWS S3 client
+    :param bucket: The name of the bucket
+    :type bucket: str
+    :param file_key: The name of the file
+    :type file_key: str
+    :param ranges: The (offset, length) ranges to read
+    :type ranges: Iterable
+    :param max_gap: The largest gap in bytes between two ranges fetched with one GET
+    :type max_gap: int
+    :param max_workers: The maximum number of GETs run concurrently
+    :type max_workers: int
+    :return: A read-only view of each range's bytes, in the order requested
+    :rtype: list
+    """
+    ranges = list(ranges)
+    if any(length < 0 for _, length in ranges):
+        raise ValueError("Range lengths must not be negative")
+
+    with _OBJECT_SIZES_LOCK:
+        size = _OBJECT_SIZES.get((bucket, file_key))
+    if size is None and any(offset < 0 for offset, _ in ranges):
+        size = get_object_size(s3_client, bucket, file_key)
+
+    requested = []
+    for index, (offset, length) in enumerate(ranges):
+        start = max(size + offset, 0) if offset < 0 else offset
+        end = start + length
+        if size is not None:
+            start, end = min(start, size), min(end, size)
+        if end > start:
+            requested.append((start, end, index))
+
+    results = [memoryview(b"")] * len(ranges)
+    groups = _coalesce_ranges(requested, max_gap)
+    log.debug(f"Reading {len(requested)} ranges of {file_key} from {bucket} with {len(groups)} requests")
+
+    def fetch(group: list) -> None:
+        group_start, group_end, members = group
+        view, total = _read_range(s3_client, bucket, file_key, group_start, group_end)
+        if total is not None:
+            _cache_object_size(bucket, file_key, total)
+        for start, end, index in members:
+            results[index] = view[start - group_start : end - group_start].toreadonly()
+
+    if len(groups) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+            for future in as_completed([executor.submit(fetch, group) for group in groups]):
+                future.result()
+    else:
+        for group in groups:
+            fetch(group)
 
+    return results
 
-# Invoke Reprocessing Lambda
-def invoke_reprocessing_lambda(bucket: str, key: str, environment: str) -> None:
+
+def _open_science_file(file_path: Path, mode: str) -> Path | memoryview | mmap.mmap:
     """
-    Invoke the Reprocessing Lambda.
-    :param lambda_client: The AWS Lambda client
-    :type lambda_client: type
-    :param lambda_name: The name of the lambda
-    :type lambda_name: str
-    :param payload: The payload to send to the lambda
-    :type payload: str
-    :return: None
-    :rtype: None
+    Return a local file in the requested get_science_file mode.
+    :param file_path: The path of the local file
+    :type file_path: Path
+    :param mode: One of SCIENCE_FILE_MODES
+    :type mode: str
+    :return: The path, an in-memory view of the file or a read-only memory map of it
+    :rtype: Path or memoryview or mmap.mmap
     """
-    # Create the JSON structure
-    data = {
-        "Records": [
-            {
-                "Sns": {
-                    "Message": json.dumps({"Records": [{"s3": {"bucket": {"name": bucket}, "object": {"key": key}}}]})
-                }
-            }
-        ]
-    }
+    if mode == "file":
+        return file_path
 
-    # Initialize a boto3 client for Lambda
-    lambda_client = boto3.client("lambda")
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if mode == "memory":
+            buffer = bytearray(size)
+            f.readinto(buffer)
+            return memoryview(buffer).toreadonly()
 
-    # Specify the Lambda function name
-    function_name = f"{'dev-' if environment == 'DEVELOPMENT' else ''}aws_sdc_processing_lambda_function"
+        # Empty files can not be memory mapped
+        if size == 0:
+            return memoryview(b"")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-    log.info(f"Invoking Lambda function {function_name} with payload {data}")
 
-    # Invoke the Lambda function
-    response = lambda_client.invoke(FunctionName=function_name, InvocationType="Event", Payload=json.dumps(data))
-    return response
+def _get_cached_science_file(
+    s3_client,
+    cache: DownloadCache,
+    bucket: str,
+    file_key: str,
+    parsed_file_key: str,
+    retry_budget: RetryBudget | None = None,
+) -> Path:
+    """
+    Serve a science file from the download cache, downloading and caching it on a miss.
+
+    The HEAD request that checks the object exists also provides the ETag/VersionId the
+    cache is keyed on, so a hit costs no more round trips than an uncached existence check.
+    It is sent under the retry policy; only a 404 means the file is missing, other errors
+    are raised.
+    """
+    # A missing object is an answer, not an error, so it is timed as a successful call
+    with measure("object_exists", bucket):
+        try:
+            head = call_with_retry(s3_client.head_object, budget=retry_budget, Bucket=bucket, Key=file_key)
+        except botocore.exceptions.ClientError as e:
+            if _error_code(e) not in ("404", "NoSuchKey", "NotFound"):
+                raise
+            head = None
+    if head is None:
+        raise FileNotFoundError(f"File {file_key} does not exist in bucket {bucket}")
+
+    version = head.get("VersionId") or head["ETag"]
+    local_path = Path(f"/tmp/{parsed_file_key}")
+
+    cached_path = cache.get(bucket, file_key, version)
+    if cached_path is not None:
+        log.info(f"Using cached copy of {file_key} from {bucket}")
+        _link_or_copy(cached_path, local_path)
+        return local_path
+
+    file_path = download_file_from_s3(
+        s3_client, bucket, file_key, parsed_file_key, file_size=head.get("ContentLength"), retry_budget=retry_budget
+    )
+    cache.put(bucket, file_key, version, file_path)
+    return file_path
 
 
 def get_science_file(
-    instrument_bucket_name: str, file_key: str, parsed_file_key: str, dry_run: bool = False
-) -> Path | None:
+    instrument_bucket_name: str,
+    file_key: str,
+    parsed_file_key: str,
+    dry_run: bool = False,
+    mode: str = "file",
+    cache: DownloadCache | None = None,
+    retry_budget: RetryBudget | None = None,
+) -> Path | memoryview | mmap.mmap | None:
     """
     Downloads the file from the specified S3 bucket, if not in a dry run.
     If a file path is specified in the environment variables, it uses that instead.
 
+    The ``mode`` controls what is returned:
+
+    - ``"file"``: download to ``/tmp/{parsed_file_key}`` and return its Path.
+    - ``"memory"``: download straight into memory and return a read-only ``memoryview``,
+      without touching the disk. Best for small and medium files.
+    - ``"mmap"``: download to ``/tmp/{parsed_file_key}`` and return a read-only ``mmap``
+      over it, so the file is read through the page cache without a second copy.
+      Best for large files.
+
+    In "file" and "mmap" modes a ``DownloadCache`` (passed in, installed with
+    ``set_download_cache`` or configured through ``SDC_AWS_CACHE_DIR``) is checked
+    before downloading, keyed on the object's ETag.
+
     :param instrument_bucket_name: The instrument bucket name.
     :type instrument_bucket_name: str
     :param file_key: The key of the file in the S3 bucket.
@@ -417,9 +3809,18 @@ def get_science_file(
     :type parsed_file_key: str
     :param dry_run: Indicates whether the operation is a dry run.
     :type dry_run: bool
-    :return: The path to the downloaded file or None if in a dry run.
-    :rtype: Path or None
+    :param mode: One of "file", "memory" or "mmap".
+    :type mode: str
+    :param cache: The download cache to use, defaults to get_download_cache()
+    :type cache: DownloadCache
+    :param retry_budget: The retry budget to draw from, e.g. one shared by a whole invocation.
+    :type retry_budget: RetryBudget
+    :return: The downloaded file in the requested mode or None if in a dry run.
+    :rtype: Path, memoryview, mmap.mmap or None
     """
+    if mode not in SCIENCE_FILE_MODES:
+        raise ValueError(f"mode must be one of {SCIENCE_FILE_MODES}")
+
     # Download file from instrument bucket if not a dry run
     # or use the specified file path
     if not dry_run:
@@ -432,17 +3833,34 @@ def get_science_file(
         if os.getenv("SDC_AWS_FILE_PATH"):
             log.info(f"Using file path specified in environment variables{os.getenv('SDC_AWS_FILE_PATH')}")
             file_path = Path(os.getenv("SDC_AWS_FILE_PATH"))
-            return file_path
+            return _open_science_file(file_path, mode)
 
         # Initialize S3 Client
         s3_client = create_s3_client_session()
 
+        if mode == "memory":
+            # A missing object is reported by the GET itself, so no HEAD request is needed
+            try:
+                return download_file_to_memory(s3_client, instrument_bucket_name, file_key, retry_budget=retry_budget)
+            except botocore.exceptions.ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                    raise FileNotFoundError(f"File {file_key} does not exist in bucket {instrument_bucket_name}") from e
+                raise
+
+        cache = cache or get_download_cache()
+        if cache is not None:
+            file_path = _get_cached_science_file(
+                s3_client, cache, instrument_bucket_name, file_key, parsed_file_key, retry_budget=retry_budget
+            )
+            return _open_science_file(file_path, mode)
+
         # Verify object exists in instrument bucket
         if not (
             object_exists(
                 s3_client=s3_client,
                 bucket=instrument_bucket_name,
                 file_key=file_key,
+                retry_budget=retry_budget,
             )
             or dry_run
         ):
@@ -454,21 +3872,34 @@ def get_science_file(
             instrument_bucket_name,
             file_key,
             parsed_file_key,
+            retry_budget=retry_budget,
         )
 
-        return file_path
+        return _open_science_file(file_path, mode)
     else:
         log.info("Dry Run - File will not be downloaded")
         return None
 
 
 def push_science_file(
-    science_filename_parser: Callable, destination_bucket: str, calibrated_filename: str, dry_run: bool = False
+    science_filename_parser: Callable,
+    destination_bucket: str,
+    calibrated_filename: str,
+    dry_run: bool = False,
+    data: bytes | BinaryIO | Iterable | None = None,
+    retry_budget: RetryBudget | None = None,
 ) -> str:
     """
     Uploads a file to the specified destination bucket in S3, if not in a dry run.
     Generates the file key for the new file using the given parser.
 
+    By default the file is read from ``/tmp/{calibrated_filename}``. If ``data`` is given
+    (bytes, a file-like object or an iterator of byte chunks) it is streamed to S3 with
+    ``upload_fileobj_to_s3`` instead, so the product never has to be written to local disk.
+    When processing locally (``SDC_AWS_FILE_PATH`` is set) nothing is uploaded and the
+    product is expected in the mounted volume, so ``data`` can not be used and raises
+    ValueError rather than being dropped.
+
     :param science_filename_parser: The parser function to generate a file key.
     :type science_filename_parser: function
     :param destination_bucket: The name of the destination S3 bucket.
@@ -477,9 +3908,17 @@ def push_science_file(
     :type calibrated_filename: str
     :param dry_run: Indicates whether the operation is a dry run.
     :type dry_run: bool
+    :param data: The file's content to stream instead of reading the local file.
+    :type data: bytes, file-like object or iterator of bytes
+    :param retry_budget: The retry budget to draw from, e.g. one shared by a whole invocation.
+    :type retry_budget: RetryBudget
     :return: The key of the newly uploaded file.
     :rtype: str
+    :raises ValueError: If ``data`` is given while processing locally.
     """
+    if data is not None and os.getenv("SDC_AWS_FILE_PATH") and not dry_run:
+        raise ValueError("data can not be uploaded when processing locally with SDC_AWS_FILE_PATH set")
+
     # Generate file key for new file
     new_file_key = create_s3_file_key(science_filename_parser, calibrated_filename)
 
@@ -497,12 +3936,22 @@ def push_science_file(
         s3_client = create_s3_client_session()
 
         # Upload file to destination bucket
-        upload_file_to_s3(
-            s3_client=s3_client,
-            destination_bucket=destination_bucket,
-            filename=calibrated_filename,
-            file_key=new_file_key,
-        )
+        if data is not None:
+            upload_fileobj_to_s3(
+                s3_client=s3_client,
+                data=data,
+                destination_bucket=destination_bucket,
+                file_key=new_file_key,
+                retry_budget=retry_budget,
+            )
+        else:
+            upload_file_to_s3(
+                s3_client=s3_client,
+                destination_bucket=destination_bucket,
+                filename=calibrated_filename,
+                file_key=new_file_key,
+                retry_budget=retry_budget,
+            )
 
     else:
         log.info(
@@ -512,3 +3961,100 @@ def push_science_file(
         )
 
     return new_file_key
+
+
+# Number of files downloaded ahead of the one being processed
+DEFAULT_PREFETCH = int(os.getenv("SDC_AWS_PREFETCH", "4"))
+
+
+def prefetch_science_files(
+    objects: Iterable,
+    prefetch: int = DEFAULT_PREFETCH,
+    max_bytes: int | None = None,
+    mode: str = "file",
+    cleanup: bool = False,
+    cache: DownloadCache | None = None,
+) -> Iterator:
+    """
+    Download science files in the background while the previous ones are processed.
+
+    ``objects`` are ``(bucket, key)`` or ``(bucket, key, size)`` tuples. Up to ``prefetch``
+    of the following files are fetched with ``get_science_file`` on worker threads while
+    the caller works on the current one, and the results are yielded in the order given,
+    each as soon as it is ready. With ``max_bytes`` the files being downloaded, waiting or
+    being processed are kept within that many bytes; sizes missing from the tuples are
+    looked up with ``get_object_size``. A file larger than the budget is still fetched,
+    on its own.
+
+    A file counts against the budget until the caller asks for the next one. With
+    ``cleanup`` the local copy of a file (in "file" mode) is deleted at that point too,
+    so disk usage stays within the budget as well. Closing the iterator early cancels the
+    downloads that have not started.
+
+    :param objects: The (bucket, key) or (bucket, key, size) tuples of the files
+    :type objects: Iterable
+    :param prefetch: The maximum number of files downloaded ahead
+    :type prefetch: int
+    :param max_bytes: The maximum number of bytes downloaded ahead, including the file being processed
+    :type max_bytes: int
+    :param mode: One of "file", "memory" or "mmap", passed to get_science_file
+    :type mode: str
+    :param cleanup: Whether to delete each local file once the caller moves on
+    :type cleanup: bool
+    :param cache: The download cache passed to get_science_file
+    :type cache: DownloadCache
+    :return: An iterator of the get_science_file results
+    :rtype: Iterator
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+    if mode not in SCIENCE_FILE_MODES:
+        raise ValueError(f"mode must be one of {SCIENCE_FILE_MODES}")
+
+    source = iter(objects)
+    s3_client = create_s3_client_session() if max_bytes is not None else None
+    pending: deque = deque()
+    held_bytes = 0
+    upcoming = None
+    upcoming_size = 0
+
+    executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="sdc-aws-prefetch")
+    try:
+        while True:
+            # Queue downloads until the look-ahead or the byte budget is full
+            while len(pending) < prefetch:
+                if upcoming is None:
+                    upcoming = next(source, None)
+                    if upcoming is None:
+                        break
+                    upcoming_size = 0
+                    if max_bytes is not None:
+                        if len(upcoming) > 2 and upcoming[2] is not None:
+                            upcoming_size = upcoming[2]
+                        else:
+                            upcoming_size = get_object_size(s3_client, upcoming[0], upcoming[1])
+                if pending and max_bytes is not None and held_bytes + upcoming_size > max_bytes:
+                    break
+
+                bucket, file_key = upcoming[0], upcoming[1]
+                future = executor.submit(
+                    get_science_file, bucket, file_key, parse_file_key(file_key), mode=mode, cache=cache
+                )
+                pending.append((future, upcoming_size))
+                held_bytes += upcoming_size
+                upcoming = None
+
+            if not pending:
+                return
+
+            future, size = pending.popleft()
+            result = future.result()
+            try:
+                yield result
+            finally:
+                held_bytes -= size
+                # Never delete a local file configured through SDC_AWS_FILE_PATH
+                if cleanup and isinstance(result, Path) and not os.getenv("SDC_AWS_FILE_PATH"):
+                    result.unlink(missing_ok=True)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -5,6 +5,9 @@ from swxsoc.util.util import create_science_filename as writer
 from swxsoc.util.util import get_instrument_package
 from swxsoc.util.util import parse_science_filename as parser
 
+from sdc_aws_utils.aws import clear_timestream_target_cache
+from sdc_aws_utils.parsing import clear_parse_cache
+
 __all__ = [
     "get_instrument_package",
     "parser",
@@ -40,7 +43,8 @@ def _reconfigure_globals() -> None:
     """Re-read swxsoc config and update module-level globals.
 
     Call this after ``swxsoc._reconfigure()`` so that bucket names and
-    instrument mappings reflect the newly-active mission.
+    instrument mappings reflect the newly-active mission. Cached filename
+    parses and Timestream targets are dropped as well.
     """
     global MISSION_NAME, INSTR_NAMES, BUCKET_MISSION_NAME, INCOMING_BUCKET
     global INSTR_PKG, INSTR_TO_BUCKET_NAME
@@ -58,6 +62,9 @@ def _reconfigure_globals() -> None:
     INSTR_PKG = [f"{MISSION_NAME}_{this_instr}" for this_instr in INSTR_NAMES]
     INSTR_TO_BUCKET_NAME = {this_instr: f"{BUCKET_MISSION_NAME}-{this_instr}" for this_instr in INSTR_NAMES}
 
+    clear_parse_cache()
+    clear_timestream_target_cache()
+
 
 # Get Incoming Bucket Name
 def get_incoming_bucket(environment: str = "DEVELOPMENT") -> str:
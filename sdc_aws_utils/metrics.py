@@ -0,0 +1,311 @@
+"""
+Latency, byte and error metrics for the S3 and Timestream hot paths.
+
+Calls are timed with ``measure`` and aggregated in process per (operation, bucket) into
+call, error and byte counts and a latency histogram. Aggregates are periodically written
+to stdout as CloudWatch Embedded Metric Format (EMF) JSON lines, which CloudWatch Logs
+turns into metrics without any PutMetricData calls. The lines go through the dedicated
+``sdc_aws_utils.emf`` logger, which does not propagate to the package log: EMF lines must
+be bare JSON, without the level and timestamp prefix of the package log format.
+
+Metrics are disabled by default, in which case ``measure`` returns a shared no-op
+context and nothing is recorded. Enable them with ``SDC_AWS_METRICS=1`` or
+``enable_metrics()``. ``metrics_summary`` reads the in-process totals, for tests and
+benchmarks.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+
+
+__all__ = [
+    "enable_metrics",
+    "flush_metrics",
+    "measure",
+    "metrics_enabled",
+    "metrics_summary",
+    "reset_metrics",
+]
+
+# CloudWatch namespace of the emitted metrics
+METRICS_NAMESPACE = os.getenv("SDC_AWS_METRICS_NAMESPACE", "SDCAWSUtils")
+
+# Seconds between EMF emissions of the aggregated metrics
+METRICS_FLUSH_INTERVAL = float(os.getenv("SDC_AWS_METRICS_FLUSH_INTERVAL", "60"))
+
+# Upper bounds of the latency histogram buckets in milliseconds, with a final overflow bucket
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 300000)
+
+_ENABLED = os.getenv("SDC_AWS_METRICS", "").lower() in ("1", "true", "yes")
+_LOCK = threading.Lock()
+# Totals since the last reset, read by metrics_summary()
+_TOTALS: dict = {}
+# Aggregates since the last EMF emission
+_WINDOW: dict = {}
+_LAST_FLUSH = time.monotonic()
+_FLUSH_INTERVAL = METRICS_FLUSH_INTERVAL
+_ATEXIT_REGISTERED = False
+
+
+class _StdoutHandler(logging.Handler):
+    """
+    Write each record as one line to the current ``sys.stdout``.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+            sys.stdout.flush()
+        except Exception:
+            self.handleError(record)
+
+
+# Logger of the EMF lines, writing bare JSON lines that CloudWatch Logs can parse
+emf_log = logging.getLogger("sdc_aws_utils.emf")
+if not emf_log.handlers:
+    _emf_handler = _StdoutHandler()
+    _emf_handler.setFormatter(logging.Formatter("%(message)s"))
+    emf_log.addHandler(_emf_handler)
+emf_log.setLevel(logging.INFO)
+emf_log.propagate = False
+
+
+class _OperationStats:
+    """
+    Call, error and byte counts and a latency histogram for one (operation, bucket).
+    """
+
+    __slots__ = ("calls", "errors", "bytes", "total_ms", "max_ms", "counts")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, latency_ms: float, nbytes: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += error
+        self.bytes += nbytes
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def bucket_value(self, index: int) -> float:
+        """
+        Return the value representing a histogram bucket: its upper bound, capped at the maximum.
+        """
+        if index == len(LATENCY_BUCKETS_MS):
+            return self.max_ms
+        return min(LATENCY_BUCKETS_MS[index], self.max_ms)
+
+    def percentile(self, quantile: float) -> float:
+        """
+        Return the approximate latency percentile in milliseconds from the histogram.
+        """
+        if not self.calls:
+            return 0.0
+        rank = max(1, math.ceil(quantile * self.calls))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bucket_value(index)
+        return self.max_ms
+
+
+class _Measurement:
+    """
+    Context manager timing one call. Set ``bytes`` inside the block to record the bytes moved.
+    """
+
+    __slots__ = ("operation", "bucket", "bytes", "_start")
+
+    def __init__(self, operation: str, bucket: str) -> None:
+        self.operation = operation
+        self.bucket = bucket
+        self.bytes = 0
+
+    def __enter__(self) -> "_Measurement":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        latency_ms = (time.perf_counter() - self._start) * 1000
+        _record(self.operation, self.bucket, latency_ms, self.bytes or 0, exc_type is not None)
+        return False
+
+
+class _NullMeasurement:
+    """
+    Shared no-op context returned by ``measure`` while metrics are disabled.
+    """
+
+    __slots__ = ("bytes",)
+
+    def __enter__(self) -> "_NullMeasurement":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+
+_NULL_MEASUREMENT = _NullMeasurement()
+
+
+def measure(operation: str, bucket: str | None) -> _Measurement | _NullMeasurement:
+    """
+    Time a call to an operation on a bucket.
+
+    Used as ``with measure("download", bucket) as op: ...; op.bytes = size``. A call that
+    raises is counted as an error. While metrics are disabled this returns a shared no-op
+    context, so instrumented code pays only for this function call.
+
+    :param operation: The operation name, e.g. "download"
+    :type operation: str
+    :param bucket: The bucket (or Timestream table) the operation works on
+    :type bucket: str
+    :return: A context manager timing the block
+    :rtype: _Measurement
+    """
+    if not _ENABLED:
+        return _NULL_MEASUREMENT
+    return _Measurement(operation, bucket or "none")
+
+
+def _record(operation: str, bucket: str, latency_ms: float, nbytes: int, error: bool) -> None:
+    key = (operation, bucket)
+    with _LOCK:
+        for stats in (_TOTALS, _WINDOW):
+            if key not in stats:
+                stats[key] = _OperationStats()
+            stats[key].add(latency_ms, nbytes, error)
+        due = time.monotonic() - _LAST_FLUSH >= _FLUSH_INTERVAL
+
+    if due:
+        flush_metrics()
+
+
+def enable_metrics(enabled: bool = True, flush_interval: float | None = None) -> None:
+    """
+    Turn metrics collection on or off.
+    :param enabled: Whether to record metrics
+    :type enabled: bool
+    :param flush_interval: Seconds between EMF emissions, defaults to METRICS_FLUSH_INTERVAL
+    :type flush_interval: float
+    :return: None
+    :rtype: None
+    """
+    global _ENABLED, _FLUSH_INTERVAL, _ATEXIT_REGISTERED
+    _ENABLED = enabled
+    if flush_interval is not None:
+        _FLUSH_INTERVAL = flush_interval
+    if enabled and not _ATEXIT_REGISTERED:
+        atexit.register(flush_metrics)
+        _ATEXIT_REGISTERED = True
+
+
+def metrics_enabled() -> bool:
+    """
+    Return whether metrics are being recorded.
+    :return: True if metrics are enabled
+    :rtype: bool
+    """
+    return _ENABLED
+
+
+def _emf_document(operation: str, bucket: str, stats: _OperationStats, timestamp_ms: int) -> dict:
+    values, counts = [], []
+    for index, count in enumerate(stats.counts):
+        if count:
+            values.append(stats.bucket_value(index))
+            counts.append(count)
+
+    return {
+        "_aws": {
+            "Timestamp": timestamp_ms,
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": [["Operation", "Bucket"]],
+                    "Metrics": [
+                        {"Name": "Latency", "Unit": "Milliseconds"},
+                        {"Name": "Calls", "Unit": "Count"},
+                        {"Name": "Errors", "Unit": "Count"},
+                        {"Name": "Bytes", "Unit": "Bytes"},
+                    ],
+                }
+            ],
+        },
+        "Operation": operation,
+        "Bucket": bucket,
+        "Latency": {"Values": values, "Counts": counts},
+        "Calls": stats.calls,
+        "Errors": stats.errors,
+        "Bytes": stats.bytes,
+    }
+
+
+def flush_metrics() -> list:
+    """
+    Write the metrics aggregated since the last flush as EMF JSON lines to stdout.
+    :return: The emitted EMF documents
+    :rtype: list
+    """
+    global _WINDOW, _LAST_FLUSH
+    with _LOCK:
+        window, _WINDOW = _WINDOW, {}
+        _LAST_FLUSH = time.monotonic()
+
+    timestamp_ms = int(time.time() * 1000)
+    documents = [_emf_document(operation, bucket, stats, timestamp_ms) for (operation, bucket), stats in window.items()]
+    for document in documents:
+        emf_log.info(json.dumps(document))
+    return documents
+
+
+def metrics_summary() -> dict:
+    """
+    Return the in-process totals recorded since the last reset.
+
+    :return: Per operation and bucket, the calls, errors and bytes, and the mean, p50, p90,
+        p99 and max latencies in milliseconds (percentiles are histogram approximations)
+    :rtype: dict
+    """
+    summary = {}
+    with _LOCK:
+        for (operation, bucket), stats in _TOTALS.items():
+            summary.setdefault(operation, {})[bucket] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "bytes": stats.bytes,
+                "latency_ms": {
+                    "mean": stats.total_ms / stats.calls,
+                    "p50": stats.percentile(0.5),
+                    "p90": stats.percentile(0.9),
+                    "p99": stats.percentile(0.99),
+                    "max": stats.max_ms,
+                },
+            }
+    return summary
+
+
+def reset_metrics() -> None:
+    """
+    Discard all recorded metrics without emitting them.
+    :return: None
+    :rtype: None
+    """
+    global _TOTALS, _WINDOW, _LAST_FLUSH
+    with _LOCK:
+        _TOTALS, _WINDOW = {}, {}
+        _LAST_FLUSH = time.monotonic()
@@ -0,0 +1,75 @@
+import functools
+import os
+from collections.abc import Callable
+
+import swxsoc
+from swxsoc.util.util import parse_science_filename
+
+from sdc_aws_utils.logging import log
+
+__all__ = [
+    "clear_parse_cache",
+    "parse_cache_info",
+    "parse_science_file",
+]
+
+# Maximum number of parsed filenames kept in the shared parse cache
+PARSE_CACHE_SIZE = int(os.getenv("SDC_AWS_PARSE_CACHE_SIZE", "4096"))
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _cached_parse(science_file_parser: Callable, mission_name: str, filename: str) -> dict:
+    """
+    Parse a filename once per (parser, mission, filename). Failures are not cached.
+    """
+    return science_file_parser(filename)
+
+
+def parse_science_file(filename: str, science_file_parser: Callable | None = None) -> dict:
+    """
+    Parse a science filename through the shared, bounded LRU parse cache.
+
+    Parsing builds astropy Time objects, which is expensive, and the same filenames are
+    parsed repeatedly across the aws and slack helpers. Results are cached per parser and
+    per active mission, so switching missions never returns a stale result; the cache is
+    also cleared by ``sdc_aws_utils.config._reconfigure_globals``.
+
+    :param filename: The science filename to parse
+    :type filename: str
+    :param science_file_parser: The parser to use, defaults to swxsoc's parse_science_filename
+    :type science_file_parser: Callable
+    :return: A copy of the parsed file metadata
+    :rtype: dict
+    """
+    science_file_parser = science_file_parser or parse_science_filename
+    mission_name = swxsoc.config["mission"]["mission_name"]
+
+    try:
+        science_file = _cached_parse(science_file_parser, mission_name, filename)
+    except TypeError as e:
+        # Unhashable parsers (or filenames) can not be cached
+        if "unhashable" not in str(e):
+            raise
+        science_file = science_file_parser(filename)
+
+    # Hand out a copy so callers can not modify the cached entry
+    return dict(science_file)
+
+
+def parse_cache_info() -> dict:
+    """
+    Return statistics for the shared parse cache.
+    :return: The hits, misses, maximum size and current size of the cache
+    :rtype: dict
+    """
+    return _cached_parse.cache_info()._asdict()
+
+
+def clear_parse_cache() -> None:
+    """
+    Empty the shared parse cache.
+    :return: None
+    :rtype: None
+    """
+    _cached_parse.cache_clear()
+    log.debug("Cleared science filename parse cache")
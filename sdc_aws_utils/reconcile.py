@@ -0,0 +1,222 @@
+"""
+Reconcile the contents of two buckets with a streaming merge-join of their listings.
+
+S3 lists keys in lexicographic order, so two listings can be compared in a single pass
+over both, in O(N+M) time, holding only the current entry of each listing in memory.
+When source keys are mapped to target keys (for example from the incoming bucket's flat
+filenames to the ``level/descriptor/YYYY/MM/DD`` layout of ``create_s3_file_key``) the
+mapped keys are no longer sorted, so they are put back in order with an external merge
+sort that spills sorted runs to disk, keeping memory bounded.
+
+Example nightly audit of the incoming bucket against an instrument bucket::
+
+    from functools import partial
+
+    from sdc_aws_utils.aws import create_s3_client_session, create_s3_file_key
+    from sdc_aws_utils.config import parser
+    from sdc_aws_utils.reconcile import diff_buckets
+
+    report = diff_buckets(
+        create_s3_client_session(),
+        "hermes-incoming",
+        "hermes-eea",
+        key_mapper=partial(create_s3_file_key, parser),
+        compare=("size",),
+    )
+"""
+
+import heapq
+import json
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+
+from sdc_aws_utils.aws import iter_files_in_bucket
+from sdc_aws_utils.logging import log
+
+__all__ = [
+    "diff_buckets",
+    "iter_bucket_diff",
+]
+
+# Number of mapped entries sorted in memory before a sorted run is spilled to disk
+DEFAULT_SORT_CHUNK_SIZE = 200_000
+
+# Object fields that can be compared between matching keys
+COMPARABLE_FIELDS = {"size": "Size", "etag": "ETag"}
+
+
+def _external_sort(entries: Iterable, chunk_size: int) -> Iterator:
+    """
+    Sort (key, object) pairs by key with bounded memory.
+
+    Entries are sorted in chunks of ``chunk_size``. A single chunk is returned directly;
+    otherwise each chunk is written to a temporary file as JSON lines and the runs are
+    merged with ``heapq.merge``.
+    """
+    entries = iter(entries)
+    runs = []
+    try:
+        while True:
+            chunk = sorted(islice(entries, chunk_size), key=lambda entry: entry[0])
+            if not chunk:
+                break
+            if not runs and len(chunk) < chunk_size:
+                yield from chunk
+                return
+
+            run = tempfile.TemporaryFile(mode="w+")  # noqa: SIM115
+            for entry in chunk:
+                run.write(json.dumps(entry, default=str) + "\n")
+            run.seek(0)
+            runs.append(run)
+
+        yield from heapq.merge(*((tuple(json.loads(line)) for line in run) for run in runs), key=lambda e: e[0])
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _mapped_source_entries(source_objects: Iterable, key_mapper: Callable, unmapped: list) -> Iterator:
+    for obj in source_objects:
+        try:
+            target_key = key_mapper(obj["Key"])
+        except Exception as e:
+            unmapped.append({"status": "unmapped", "source_key": obj["Key"], "error": str(e)})
+            continue
+        if target_key is None:
+            continue
+        yield target_key, {"Key": obj["Key"], "Size": obj["Size"], "ETag": obj["ETag"]}
+
+
+def iter_bucket_diff(
+    s3_client,
+    source_bucket: str,
+    target_bucket: str,
+    source_prefix: str = "",
+    target_prefix: str = "",
+    key_mapper: Callable | None = None,
+    compare: tuple = ("size", "etag"),
+    sort_chunk_size: int = DEFAULT_SORT_CHUNK_SIZE,
+) -> Iterator:
+    """
+    Stream the differences between a source and a target bucket.
+
+    Each difference is a dict with a ``status`` of:
+
+    - ``"missing"``: the source object has no target object.
+    - ``"extra"``: the target object has no source object.
+    - ``"mismatch"``: both exist but differ in the compared fields (listed in ``fields``).
+    - ``"unmapped"``: ``key_mapper`` raised for the source key.
+
+    along with the ``key`` in the target keyspace, the ``source_key`` and the listed
+    ``source``/``target`` objects (Key, Size, ETag) where they exist.
+
+    :param s3_client: The AWS S3 client
+    :param source_bucket: The name of the source bucket
+    :type source_bucket: str
+    :param target_bucket: The name of the target bucket
+    :type target_bucket: str
+    :param source_prefix: Only compare source keys under this prefix
+    :type source_prefix: str
+    :param target_prefix: Only compare target keys under this prefix
+    :type target_prefix: str
+    :param key_mapper: Maps a source key to its expected target key, or to None to skip it
+    :type key_mapper: Callable
+    :param compare: The fields compared between matching keys, any of "size" and "etag"
+    :type compare: tuple
+    :param sort_chunk_size: Entries sorted in memory at a time when keys are mapped
+    :type sort_chunk_size: int
+    :return: An iterator of difference dicts, in target key order
+    :rtype: Iterator
+    """
+    unknown_fields = set(compare) - set(COMPARABLE_FIELDS)
+    if unknown_fields:
+        raise ValueError(f"Unknown compare fields {sorted(unknown_fields)}, expected any of {list(COMPARABLE_FIELDS)}")
+
+    source_objects = iter_files_in_bucket(s3_client, source_bucket, prefix=source_prefix, include_metadata=True)
+    unmapped = []
+    if key_mapper is None:
+        source_entries = ((obj["Key"], obj) for obj in source_objects)
+    else:
+        source_entries = _external_sort(
+            _mapped_source_entries(source_objects, key_mapper, unmapped), chunk_size=sort_chunk_size
+        )
+    target_entries = (
+        (obj["Key"], obj)
+        for obj in iter_files_in_bucket(s3_client, target_bucket, prefix=target_prefix, include_metadata=True)
+    )
+
+    source = next(source_entries, None)
+    target = next(target_entries, None)
+
+    while source is not None or target is not None:
+        if target is None or (source is not None and source[0] < target[0]):
+            yield {"status": "missing", "key": source[0], "source_key": source[1]["Key"], "source": source[1]}
+            source = next(source_entries, None)
+
+        elif source is None or target[0] < source[0]:
+            yield {"status": "extra", "key": target[0], "source_key": None, "target": target[1]}
+            target = next(target_entries, None)
+
+        else:
+            fields = [
+                field
+                for field in compare
+                if source[1].get(COMPARABLE_FIELDS[field]) != target[1].get(COMPARABLE_FIELDS[field])
+            ]
+            if fields:
+                yield {
+                    "status": "mismatch",
+                    "key": target[0],
+                    "source_key": source[1]["Key"],
+                    "fields": fields,
+                    "source": source[1],
+                    "target": target[1],
+                }
+            source = next(source_entries, None)
+            # Several source keys may map to the same target key, so only advance the
+            # target once the next source key has moved past it
+            if source is None or source[0] != target[0]:
+                target = next(target_entries, None)
+
+    yield from unmapped
+
+
+def diff_buckets(
+    s3_client,
+    source_bucket: str,
+    target_bucket: str,
+    source_prefix: str = "",
+    target_prefix: str = "",
+    key_mapper: Callable | None = None,
+    compare: tuple = ("size", "etag"),
+    sort_chunk_size: int = DEFAULT_SORT_CHUNK_SIZE,
+) -> dict:
+    """
+    Compare two buckets and group the differences by status.
+
+    Takes the same arguments as ``iter_bucket_diff``. Only the differences are kept in
+    memory, never the full listings.
+
+    :return: Lists of difference dicts keyed by "missing", "extra", "mismatch" and "unmapped"
+    :rtype: dict
+    """
+    report = {"missing": [], "extra": [], "mismatch": [], "unmapped": []}
+    for difference in iter_bucket_diff(
+        s3_client,
+        source_bucket,
+        target_bucket,
+        source_prefix=source_prefix,
+        target_prefix=target_prefix,
+        key_mapper=key_mapper,
+        compare=compare,
+        sort_chunk_size=sort_chunk_size,
+    ):
+        report[difference["status"]].append(difference)
+
+    log.info(
+        f"Diff of {source_bucket} against {target_bucket}: "
+        + ", ".join(f"{status}={len(differences)}" for status, differences in report.items())
+    )
+    return report
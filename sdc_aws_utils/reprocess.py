@@ -0,0 +1,290 @@
+"""
+Reprocess every file of an instrument, level and descriptor within a date range.
+
+Keys are found by listing only the ``level/descriptor/YYYY/MM/DD`` prefixes produced by
+``create_s3_file_key`` that fall in the date range, instead of listing the whole bucket.
+Whole months are listed with one prefix and partial months day by day. Prefixes are
+swept concurrently, the keys of each being streamed from its listing into
+``invoke_reprocessing_lambdas`` with every prefix sharing one rate limit. Completed
+prefixes, and the keys that failed in the others, are recorded in a checkpoint file, so
+an interrupted backfill picks up where it stopped without reprocessing files Lambda
+already accepted. A checkpoint only resumes the sweep (bucket, level, descriptor and
+environment) that wrote it.
+
+Command line usage::
+
+    python -m sdc_aws_utils.reprocess --instrument eea --level l1 --descriptor hk \\
+        --start 2015-01-01 --end 2024-12-31 --checkpoint /tmp/eea_l1_hk.json
+"""
+
+import argparse
+import calendar
+import json
+import os
+import sys
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from pathlib import Path
+
+from sdc_aws_utils.aws import (
+    DEFAULT_MAX_WORKERS,
+    DESCRIPTOR_MAPPING,
+    RateLimiter,
+    create_s3_client_session,
+    invoke_reprocessing_lambdas,
+    iter_files_in_bucket,
+)
+from sdc_aws_utils.config import get_instrument_bucket
+from sdc_aws_utils.logging import config, log
+
+__all__ = [
+    "build_date_prefixes",
+    "main",
+    "sweep_reprocessing",
+]
+
+
+def build_date_prefixes(level: str, descriptor: str | None, start_date: date, end_date: date) -> list:
+    """
+    Build the S3 key prefixes covering a date range in the create_s3_file_key layout.
+
+    Months fully inside the range are covered by a single month prefix, partial months by
+    one prefix per day.
+
+    :param level: The data level
+    :type level: str
+    :param descriptor: The descriptor (short names such as "hk" are mapped to long names), ignored for the first valid data level
+    :type descriptor: str
+    :param start_date: The first day of the range
+    :type start_date: date
+    :param end_date: The last day of the range (inclusive)
+    :type end_date: date
+    :return: The key prefixes in chronological order
+    :rtype: list
+    """
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+
+    first_level = config.get("mission").get("valid_data_levels", ["l0", "l1", "ql"])[0]
+    if level == first_level:
+        base = f"{level}/"
+    else:
+        descriptor = DESCRIPTOR_MAPPING.get(descriptor, descriptor) if descriptor else "unknown"
+        base = f"{level}/{descriptor}/"
+
+    prefixes = []
+    day = start_date
+    while day <= end_date:
+        month_end = day.replace(day=calendar.monthrange(day.year, day.month)[1])
+        if day.day == 1 and month_end <= end_date:
+            prefixes.append(f"{base}{day.year}/{day.month:02d}/")
+            day = month_end + timedelta(days=1)
+        else:
+            prefixes.append(f"{base}{day.year}/{day.month:02d}/{day.day:02d}/")
+            day += timedelta(days=1)
+
+    return prefixes
+
+
+def _load_checkpoint(checkpoint_path: Path | None, sweep: dict) -> dict:
+    # "failed" maps each swept but incomplete prefix to its failed keys and their errors
+    if checkpoint_path and checkpoint_path.exists():
+        checkpoint = json.loads(checkpoint_path.read_text())
+        if checkpoint.get("sweep") != sweep:
+            raise ValueError(f"Checkpoint {checkpoint_path} was written by another sweep: {checkpoint.get('sweep')}")
+        return checkpoint
+    return {"sweep": sweep, "completed_prefixes": [], "accepted": 0, "failed": {}}
+
+
+def _save_checkpoint(checkpoint_path: Path | None, checkpoint: dict) -> None:
+    if not checkpoint_path:
+        return
+    tmp_path = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(checkpoint))
+    tmp_path.replace(checkpoint_path)
+
+
+def sweep_reprocessing(
+    bucket: str,
+    level: str,
+    descriptor: str | None,
+    start_date: date,
+    end_date: date,
+    environment: str = "DEVELOPMENT",
+    checkpoint_path: str | Path | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_rate: float | None = 10.0,
+    dry_run: bool = False,
+    s3_client: type | None = None,
+) -> dict:
+    """
+    Reprocess every file under the date-range prefixes of a level and descriptor.
+
+    At most ``max_workers`` prefixes are swept at a time. The keys of each are streamed from
+    ``iter_files_in_bucket`` into ``invoke_reprocessing_lambdas`` page by page, and all
+    prefixes share one ``max_rate``. A prefix is recorded as completed in the checkpoint
+    once all of its keys have been accepted by Lambda. For a prefix with failed keys only
+    those keys are recorded, and a rerun invokes them alone instead of listing the prefix
+    again; a prefix whose listing failed is left out so a rerun sweeps it again.
+
+    The checkpoint records the bucket, level, descriptor and environment of the sweep, and
+    a checkpoint written by a different sweep raises ValueError instead of skipping
+    prefixes. The date range may change between runs, e.g. to extend a backfill.
+
+    :param bucket: The instrument bucket name
+    :type bucket: str
+    :param level: The data level
+    :type level: str
+    :param descriptor: The descriptor
+    :type descriptor: str
+    :param start_date: The first day of the range
+    :type start_date: date
+    :param end_date: The last day of the range (inclusive)
+    :type end_date: date
+    :param environment: The environment
+    :type environment: str
+    :param checkpoint_path: A JSON file recording progress, read on start to resume
+    :type checkpoint_path: str or Path
+    :param max_workers: The maximum number of prefixes swept concurrently, and of batches in flight for each
+    :type max_workers: int
+    :param max_rate: The maximum number of Lambda invocations per second, across all prefixes
+    :type max_rate: float
+    :param dry_run: List matching keys without invoking Lambda
+    :type dry_run: bool
+    :param s3_client: The AWS S3 client, defaults to the pooled client
+    :type s3_client: type
+    :return: A summary with the number of prefixes, matched and accepted keys, failed keys and failed prefixes
+    :rtype: dict
+    """
+    s3_client = s3_client or create_s3_client_session()
+    checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+    sweep = {
+        "bucket": bucket,
+        "level": level,
+        "descriptor": DESCRIPTOR_MAPPING.get(descriptor, descriptor),
+        "environment": environment,
+    }
+    checkpoint = _load_checkpoint(checkpoint_path, sweep)
+    completed = set(checkpoint["completed_prefixes"])
+
+    prefixes = [
+        prefix for prefix in build_date_prefixes(level, descriptor, start_date, end_date) if prefix not in completed
+    ]
+    log.info(f"Sweeping {len(prefixes)} prefixes in {bucket} ({len(completed)} already completed)")
+
+    summary = {"prefixes": len(prefixes), "matched": 0, "accepted": 0, "failed": {}, "failed_prefixes": {}}
+    rate_limiter = RateLimiter(max_rate)
+
+    def sweep_prefix(prefix: str, failed_keys: dict | None) -> dict:
+        # A prefix swept before is not listed again, only the keys that failed are retried
+        file_keys = list(failed_keys) if failed_keys is not None else iter_files_in_bucket(s3_client, bucket, prefix)
+        matched = 0
+
+        def objects() -> Iterator:
+            nonlocal matched
+            for file_key in file_keys:
+                matched += 1
+                yield bucket, file_key
+
+        if dry_run:
+            for _ in objects():
+                pass
+            return {"matched": matched, "accepted": [], "failed": {}}
+
+        result = invoke_reprocessing_lambdas(objects(), environment, max_workers=max_workers, max_rate=rate_limiter)
+        return {**result, "matched": matched}
+
+    def handle_prefix(prefix: str, result: dict) -> None:
+        summary["matched"] += result["matched"]
+        if dry_run:
+            log.info(f"Dry Run - {result['matched']} files under {prefix} would be reprocessed")
+            return
+
+        summary["accepted"] += len(result["accepted"])
+        checkpoint["accepted"] += len(result["accepted"])
+        if result["failed"]:
+            summary["failed"].update(result["failed"])
+            checkpoint["failed"][prefix] = result["failed"]
+        else:
+            checkpoint["failed"].pop(prefix, None)
+            checkpoint["completed_prefixes"].append(prefix)
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+    def submit(executor: ThreadPoolExecutor, prefix: str) -> Future:
+        return executor.submit(sweep_prefix, prefix, checkpoint["failed"].get(prefix))
+
+    pending_prefixes = iter(prefixes)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        for prefix in pending_prefixes:
+            in_flight[submit(executor, prefix)] = prefix
+            if len(in_flight) >= max_workers:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                prefix = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    log.error({"status": "ERROR", "message": e, "prefix": prefix})
+                    summary["failed_prefixes"][prefix] = str(e)
+                else:
+                    handle_prefix(prefix, result)
+
+                next_prefix = next(pending_prefixes, None)
+                if next_prefix is not None:
+                    in_flight[submit(executor, next_prefix)] = next_prefix
+
+    log.info(
+        f"Reprocessing sweep of {bucket} matched {summary['matched']} files, accepted {summary['accepted']},"
+        f" failed {len(summary['failed'])} files and {len(summary['failed_prefixes'])} prefixes"
+    )
+    return summary
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Command line entry point for a reprocessing sweep.
+
+    Prints the sweep summary as JSON and returns the exit status: 0 when every key was
+    reprocessed (or listed, in a dry run), 1 when any key or prefix failed.
+    """
+    arg_parser = argparse.ArgumentParser(description="Reprocess files of an instrument within a date range.")
+    arg_parser.add_argument("--instrument", required=True, help="Instrument name, used to find its bucket")
+    arg_parser.add_argument("--level", required=True, help="Data level, e.g. l0, l1, ql")
+    arg_parser.add_argument("--descriptor", help="Descriptor, e.g. hk or housekeeping")
+    arg_parser.add_argument("--start", required=True, type=date.fromisoformat, help="First day, YYYY-MM-DD")
+    arg_parser.add_argument("--end", required=True, type=date.fromisoformat, help="Last day (inclusive), YYYY-MM-DD")
+    arg_parser.add_argument(
+        "--environment", default=os.getenv("LAMBDA_ENVIRONMENT", "DEVELOPMENT"), help="DEVELOPMENT or PRODUCTION"
+    )
+    arg_parser.add_argument("--bucket", help="Bucket to sweep, overrides the instrument bucket")
+    arg_parser.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted sweep")
+    arg_parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent prefixes")
+    arg_parser.add_argument("--max-rate", type=float, default=10.0, help="Maximum Lambda invocations per second")
+    arg_parser.add_argument("--dry-run", action="store_true", help="List matching files without reprocessing")
+    args = arg_parser.parse_args(argv)
+
+    bucket = args.bucket or get_instrument_bucket(args.instrument, args.environment)
+
+    summary = sweep_reprocessing(
+        bucket,
+        args.level,
+        args.descriptor,
+        args.start,
+        args.end,
+        environment=args.environment,
+        checkpoint_path=args.checkpoint,
+        max_workers=args.max_workers,
+        max_rate=args.max_rate,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps({**summary, "failed": len(summary["failed"]), "failed_prefixes": len(summary["failed_prefixes"])}))
+    return 1 if summary["failed"] or summary["failed_prefixes"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
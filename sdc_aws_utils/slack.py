@@ -8,6 +8,7 @@ from slack_sdk.errors import SlackApiError
 
 from sdc_aws_utils.config import parser
 from sdc_aws_utils.logging import log
+from sdc_aws_utils.parsing import parse_science_file
 
 
 def get_slack_client(slack_token: str) -> WebClient:
@@ -215,6 +216,7 @@ def get_message_ts(slack_client: WebClient, slack_channel: str, science_filename
     try:
         response = slack_client.conversations_history(channel=slack_channel)
         messages = response["messages"]
+        science_file = None
 
         for message in messages:
             if "text" in message:
@@ -225,11 +227,12 @@ def get_message_ts(slack_client: WebClient, slack_channel: str, science_filename
                 try:
                     if "/" in slack_science_filename:
                         slack_science_filename = slack_science_filename.split("/")[-1]
-                    slack_science_file = parser(slack_science_filename)
+                    slack_science_file = parse_science_file(slack_science_filename, parser)
                 except ValueError:
                     continue
 
-                science_file = parser(science_filename)
+                if science_file is None:
+                    science_file = parse_science_file(science_filename, parser)
                 if have_same_keys_and_values(
                     [slack_science_file, science_file],
                     ["instrument", "time"],
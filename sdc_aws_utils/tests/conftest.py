@@ -88,3 +88,33 @@ def use_mission(request, monkeypatch):
     monkeypatch.setenv("SWXSOC_MISSION", "hermes")
     swxsoc._reconfigure()
     _reconfigure_globals()
+
+
+@pytest.fixture(autouse=True, scope="function")
+def reset_client_registry():
+    """
+    Clear the pooled boto3 client registry around each test.
+
+    Pooled clients live for the whole process, so without this a client created
+    under one ``mock_aws`` context (or a monkeypatched ``boto3.client``) would leak
+    into the next test.
+    """
+    from sdc_aws_utils.aws import clear_client_registry
+
+    clear_client_registry()
+    yield
+    clear_client_registry()
+
+
+@pytest.fixture(scope="function")
+def metrics():
+    """
+    Enable metrics collection for a test, starting from empty totals.
+    """
+    from sdc_aws_utils.metrics import enable_metrics, reset_metrics
+
+    reset_metrics()
+    enable_metrics(True)
+    yield
+    enable_metrics(False)
+    reset_metrics()
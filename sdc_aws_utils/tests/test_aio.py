@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from sdc_aws_utils.aio import AsyncPool, copy_file_in_s3_async, get_async_pool, set_async_pool
+
+SOURCE_BUCKET = "source-bucket"
+DEST_BUCKET = "destination-bucket"
+
+
+def test_async_pool_bounds_concurrency():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(value):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return value * 2
+
+    async def main(pool):
+        return await asyncio.gather(*(pool.run(work, value) for value in range(12)))
+
+    with AsyncPool(max_concurrency=3) as pool:
+        assert asyncio.run(main(pool)) == [value * 2 for value in range(12)]
+        # The pool can be reused from another event loop
+        assert asyncio.run(main(pool)) == [value * 2 for value in range(12)]
+
+    assert 1 < peak <= 3
+
+    with pytest.raises(ValueError):
+        AsyncPool(max_concurrency=0)
+
+
+def test_async_pool_cancels_waiting_calls():
+    started = []
+    release = threading.Event()
+
+    def work(value):
+        started.append(value)
+        release.wait(1)
+        return value
+
+    async def main(pool):
+        first = asyncio.ensure_future(pool.run(work, 1))
+        second = asyncio.ensure_future(pool.run(work, 2))
+        await asyncio.sleep(0.05)
+
+        # The second call is still waiting for the first, so cancelling it means it never runs
+        second.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        return await first
+
+    with AsyncPool(max_concurrency=1) as pool:
+        assert asyncio.run(main(pool)) == 1
+
+    assert started == [1]
+
+
+def test_async_pool_propagates_errors():
+    def fail():
+        raise KeyError("missing")
+
+    with AsyncPool(max_concurrency=1) as pool:
+        with pytest.raises(KeyError):
+            asyncio.run(pool.run(fail))
+
+
+def test_set_async_pool():
+    pool = AsyncPool(max_concurrency=2)
+    previous = set_async_pool(pool)
+    try:
+        assert get_async_pool() is pool
+    finally:
+        set_async_pool(previous)
+        pool.shutdown()
+
+
+@mock_aws
+def test_copy_file_in_s3_async():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    keys = [f"file_{index}.txt" for index in range(5)]
+    for key in keys:
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=key, Body=key)
+
+    async def main(pool):
+        await asyncio.gather(
+            *(
+                copy_file_in_s3_async(s3_client, SOURCE_BUCKET, DEST_BUCKET, key, f"copied/{key}", pool=pool)
+                for key in keys
+            )
+        )
+
+    with AsyncPool(max_concurrency=2) as pool:
+        asyncio.run(main(pool))
+
+    for key in keys:
+        assert s3_client.get_object(Bucket=DEST_BUCKET, Key=f"copied/{key}")["Body"].read().decode() == key
+    assert s3_client.list_objects_v2(Bucket=SOURCE_BUCKET)["KeyCount"] == 0
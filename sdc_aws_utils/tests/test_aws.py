@@ -1,5 +1,15 @@
+import base64
+import hashlib
+import io
+import json
+import mmap
 import os
+import threading
+import time
+import zlib
+from datetime import datetime
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import boto3
 import botocore
@@ -8,19 +18,55 @@ from moto import mock_aws
 from swxsoc.util import parse_science_filename
 
 from sdc_aws_utils.aws import (
+    DEFAULT_CHECKSUM_ALGORITHM,
+    DEFAULT_CLIENT_CONFIG,
+    DownloadCache,
+    RetryBudget,
+    RetryPolicy,
+    S3KeyIndex,
+    TimestreamBatchWriter,
+    TransferChecksum,
+    TransferProgress,
+    build_timestream_record,
     check_file_existence_in_target_buckets,
+    clear_client_registry,
+    clear_object_size_cache,
     copy_file_in_s3,
+    copy_object_in_s3,
     create_s3_client_session,
     create_s3_file_key,
+    create_s3_file_keys,
     create_timestream_client_session,
+    discover_key_shards,
     download_file_from_s3,
+    download_file_if_changed,
+    download_file_to_memory,
+    find_file_in_target_buckets,
+    get_client,
+    get_object_size,
     get_science_file,
+    get_timestream_target,
+    get_transfer_config,
+    invoke_reprocessing_lambda,
+    invoke_reprocessing_lambdas,
+    iter_files_in_bucket,
+    iter_files_in_bucket_parallel,
     list_files_in_bucket,
     log_to_timestream,
+    move_files_in_s3,
+    multipart_copy_in_s3,
     object_exists,
     parse_file_key,
+    prefetch_science_files,
     push_science_file,
+    read_byte_ranges,
+    reset_retry_stats,
+    retry_stats,
+    set_download_cache,
+    set_retry_policy,
+    set_timestream_batch_writer,
     upload_file_to_s3,
+    upload_fileobj_to_s3,
 )
 
 # from lambda_function.file_processor.config import parser
@@ -73,6 +119,28 @@ def test_create_timestream_client_session_failure(monkeypatch):
         create_timestream_client_session()
 
 
+@mock_aws
+def test_get_client_reuses_pooled_client():
+    # Same service, region and config share one client
+    client = get_client("s3", region="us-east-1")
+    assert get_client("s3", region="us-east-1") is client
+    assert create_s3_client_session(region="us-east-1") is client
+
+    # A different region or config gets its own client
+    assert get_client("s3", region="us-west-2") is not client
+    tuned_config = botocore.config.Config(max_pool_connections=5)
+    tuned_client = get_client("s3", region="us-east-1", client_config=tuned_config)
+    assert tuned_client is not client
+    assert get_client("s3", region="us-east-1", client_config=botocore.config.Config(max_pool_connections=5)) is (
+        tuned_client
+    )
+    assert tuned_client.meta.config.max_pool_connections == 5
+
+    # Clearing the registry forces a new client
+    clear_client_registry()
+    assert get_client("s3", region="us-east-1") is not client
+
+
 def test_parse_file_key_success():
     file_path = "/test_folder/test-file.txt"
     expected_file_key = "test-file.txt"
@@ -137,6 +205,51 @@ def test_create_s3_file_key():
         assert e is not None
 
 
+def test_create_s3_file_keys():
+    file_keys = [
+        "hermes_EEA_l0_2022335-200137_v01.bin",
+        "hermes_eea_ql_eventlist_20230205T000006_v1.0.01.cdf",
+        "not_a_science_file.txt",
+        "hermes_eea_l1_hk_20230205T000006_v1.0.01.cdf",
+    ]
+
+    new_file_keys, errors = create_s3_file_keys(parser, file_keys)
+
+    assert new_file_keys == [
+        "l0/2022/12/01/hermes_EEA_l0_2022335-200137_v01.bin",
+        "ql/eventlist/2023/02/05/hermes_eea_ql_eventlist_20230205T000006_v1.0.01.cdf",
+        None,
+        "l1/housekeeping/2023/02/05/hermes_eea_l1_hk_20230205T000006_v1.0.01.cdf",
+    ]
+    assert list(errors) == ["not_a_science_file.txt"]
+
+    # Matches create_s3_file_key one by one
+    for file_key, new_file_key in zip(file_keys, new_file_keys):
+        if new_file_key:
+            assert create_s3_file_key(parser, file_key) == new_file_key
+
+
+def test_create_s3_file_keys_bad_time_values():
+    class FakeTime:
+        def __init__(self, value):
+            self.value = value
+
+    times = {
+        "a.bin": datetime(2024, 2, 29, 12, 0, 0),
+        "b.bin": "2023-12-31T23:59:59.999",
+        "c.bin": "not-a-time",
+    }
+
+    def fake_parser(filename):
+        return {"level": "l1", "descriptor": "spec", "time": FakeTime(times[filename])}
+
+    new_file_keys, errors = create_s3_file_keys(fake_parser, list(times))
+
+    assert new_file_keys == ["l1/spectrum/2024/02/29/a.bin", "l1/spectrum/2023/12/31/b.bin", None]
+    assert list(errors) == ["c.bin"]
+    assert create_s3_file_keys(fake_parser, []) == ([], {})
+
+
 @mock_aws
 def test_object_exists():
     s3_client = boto3.client("s3")
@@ -188,6 +301,352 @@ def test_upload_file_to_s3():
         assert e is not None
 
 
+@mock_aws
+def test_upload_fileobj_to_s3():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+
+    assert upload_fileobj_to_s3(s3_client, b"test_data", SOURCE_BUCKET, "bytes_key") == 9
+    assert s3_client.get_object(Bucket=SOURCE_BUCKET, Key="bytes_key")["Body"].read() == b"test_data"
+
+    # A seekable file object is uploaded from its current position
+    fileobj = io.BytesIO(b"skip:file_data")
+    fileobj.seek(5)
+    assert upload_fileobj_to_s3(s3_client, fileobj, SOURCE_BUCKET, "fileobj_key") == 9
+    assert s3_client.get_object(Bucket=SOURCE_BUCKET, Key="fileobj_key")["Body"].read() == b"file_data"
+
+    # Generators are streamed as a multipart upload without being materialized
+    chunk = b"x" * (3 * 1024 * 1024)
+    progress = TransferProgress()
+    uploaded = upload_fileobj_to_s3(
+        s3_client,
+        (chunk for _ in range(4)),
+        SOURCE_BUCKET,
+        "generator_key",
+        transfer_config=get_transfer_config(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024),
+        progress_callback=progress,
+    )
+    assert uploaded == progress.bytes_transferred == 4 * len(chunk)
+    head = s3_client.head_object(Bucket=SOURCE_BUCKET, Key="generator_key")
+    assert head["ContentLength"] == 4 * len(chunk)
+    assert "-" in head["ETag"]
+
+    with pytest.raises(boto3.exceptions.S3UploadFailedError):
+        upload_fileobj_to_s3(s3_client, b"test_data", BAD_BUCKET, "bytes_key")
+
+
+@mock_aws
+def test_upload_fileobj_to_s3_retries(no_sleep):
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    throttles = [botocore.exceptions.ClientError({"Error": {"Code": "SlowDown"}}, "PutObject")]
+
+    def throttle_once(**kwargs):
+        if throttles:
+            raise throttles.pop()
+
+    s3_client.meta.events.register("before-call.s3.PutObject", throttle_once)
+
+    # The retry re-reads the source from its start, checksumming each byte only once
+    checksum = TransferChecksum("SHA256")
+    fileobj = io.BytesIO(b"test data")
+    assert upload_fileobj_to_s3(s3_client, fileobj, SOURCE_BUCKET, FILE_KEY, checksum=checksum) == 9
+    assert len(no_sleep) == 1
+    assert checksum.value == base64.b64encode(hashlib.sha256(b"test data").digest()).decode()
+    assert checksum.verified
+    assert s3_client.get_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY)["Body"].read() == b"test data"
+
+
+@mock_aws
+def test_upload_fileobj_to_s3_checksum_mismatch():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    head_object = s3_client.head_object
+
+    def corrupted_head_object(**kwargs):
+        return {**head_object(**kwargs), "ChecksumSHA256": base64.b64encode(hashlib.sha256(b"other").digest()).decode()}
+
+    # The checksum S3 stores for the new object must match the bytes that were sent
+    s3_client.head_object = corrupted_head_object
+    with pytest.raises(OSError):
+        upload_fileobj_to_s3(s3_client, b"test data", SOURCE_BUCKET, FILE_KEY, checksum=TransferChecksum("SHA256"))
+
+
+def test_transfer_checksum():
+    checksum = TransferChecksum("sha256")
+    checksum.update(b"test ")
+    checksum.update(memoryview(b"data"))
+    assert checksum.finish() == base64.b64encode(hashlib.sha256(b"test data").digest()).decode()
+    assert checksum.bytes == 9
+
+    assert checksum.verify(checksum.value, FILE_KEY) and checksum.verified
+    # Checksums of multipart objects cannot be compared with a whole-object checksum
+    assert not TransferChecksum("SHA256").verify("abc=-3", FILE_KEY)
+    # but can with a composite checksum of as many parts
+    composite = TransferChecksum("CRC32")
+    composite.value = "abc=-3"
+    assert not composite.verify("abc=-2", FILE_KEY)
+    assert composite.verify("abc=-3", FILE_KEY)
+    with pytest.raises(OSError):
+        composite.verify("abd=-3", FILE_KEY)
+    with pytest.raises(OSError):
+        checksum.verify(base64.b64encode(hashlib.sha256(b"other").digest()).decode(), FILE_KEY)
+
+    crc = TransferChecksum("CRC32")
+    crc.update(b"test data")
+    assert crc.finish() == base64.b64encode(zlib.crc32(b"test data").to_bytes(4, "big")).decode()
+
+    with pytest.raises(ValueError):
+        TransferChecksum("MD5")
+
+
+@mock_aws
+def test_checksummed_transfers():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    expected = base64.b64encode(hashlib.sha256(b"test data").digest()).decode()
+
+    with open("/tmp/test_checksum_upload.txt", "wb") as f:
+        f.write(b"test data")
+
+    upload_checksum = TransferChecksum("SHA256")
+    upload_file_to_s3(s3_client, "test_checksum_upload.txt", SOURCE_BUCKET, FILE_KEY, checksum=upload_checksum)
+    assert upload_checksum.value == expected and upload_checksum.verified
+    head = s3_client.head_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, ChecksumMode="ENABLED")
+    assert head["ChecksumSHA256"] == expected
+
+    download_checksum = TransferChecksum("SHA256")
+    download_file_from_s3(s3_client, SOURCE_BUCKET, FILE_KEY, "test_checksum_download.txt", checksum=download_checksum)
+    assert download_checksum.verified and download_checksum.value == expected
+    assert Path("/tmp/test_checksum_download.txt").read_bytes() == b"test data"
+
+    memory_checksum = TransferChecksum("SHA256")
+    assert bytes(download_file_to_memory(s3_client, SOURCE_BUCKET, FILE_KEY, checksum=memory_checksum)) == b"test data"
+    assert memory_checksum.verified
+
+    # The copy is verified against the source's stored checksum
+    result = copy_file_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY, checksum_algorithm="CRC32")
+    assert result["status"] == "moved" and result["verified"]
+    assert result["checksum"] == expected
+    assert not object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+
+    # Streamed uploads are checksummed in the same pass, and multipart ones too. S3 stores
+    # the checksum of a multipart SHA256 upload as a composite "...-N", which moto leaves out
+    head_object = s3_client.head_object
+
+    def composite_head_object(**kwargs):
+        response = head_object(**kwargs)
+        parts = response["ETag"].strip('"').rpartition("-")[2]
+        if "-" in response["ETag"] and "ChecksumSHA256" in response:
+            response["ChecksumSHA256"] += f"-{parts}"
+        return response
+
+    s3_client.head_object = composite_head_object
+    body = os.urandom(6 * 1024 * 1024)
+    stream_checksum = TransferChecksum("SHA256")
+    fileobj = io.BytesIO(body)
+    upload_fileobj_to_s3(
+        s3_client,
+        fileobj,
+        SOURCE_BUCKET,
+        "streamed_key",
+        transfer_config=get_transfer_config(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024),
+        checksum=stream_checksum,
+    )
+    assert stream_checksum.value == base64.b64encode(hashlib.sha256(body).digest()).decode()
+    assert stream_checksum.bytes == len(body)
+    assert stream_checksum.expected.endswith("-2") and not stream_checksum.verified
+    assert not fileobj.closed
+    assert s3_client.get_object(Bucket=SOURCE_BUCKET, Key="streamed_key")["Body"].read() == body
+
+    os.remove("/tmp/test_checksum_upload.txt")
+    os.remove("/tmp/test_checksum_download.txt")
+
+
+@mock_aws
+def test_copy_file_in_s3_uses_stored_checksum(monkeypatch):
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data", ChecksumAlgorithm="CRC32")
+    stored = s3_client.head_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, ChecksumMode="ENABLED")["ChecksumCRC32"]
+
+    # The algorithm of the source's stored checksum wins over the requested one
+    result = copy_file_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY, checksum_algorithm="SHA256")
+    assert result == {"status": "moved", "verified": True, "etag": result["etag"], "checksum": stored}
+
+    # A copy that can not be verified keeps the source
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data")
+    monkeypatch.setattr("sdc_aws_utils.aws.copy_object_in_s3", lambda *args, **kwargs: '"0000"')
+    result = copy_file_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY)
+    assert result["status"] == "unverified" and not result["verified"]
+    assert object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+
+
+def _crc32(data: bytes) -> str:
+    return base64.b64encode(zlib.crc32(data).to_bytes(4, "big")).decode()
+
+
+def _composite_crc32(part_checksums: list) -> str:
+    return f"{_crc32(b''.join(base64.b64decode(c) for c in part_checksums))}-{len(part_checksums)}"
+
+
+@mock_aws
+def test_copy_object_in_s3_composite_checksum():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+
+    # Parts of uneven sizes, so a copy in parts of the first part's size would not match
+    bodies = [os.urandom(6 * 1024 * 1024), os.urandom(5 * 1024 * 1024 + 3), os.urandom(1024)]
+    upload_id = s3_client.create_multipart_upload(Bucket=SOURCE_BUCKET, Key=FILE_KEY)["UploadId"]
+    parts = []
+    for part_number, body in enumerate(bodies, start=1):
+        response = s3_client.upload_part(
+            Bucket=SOURCE_BUCKET, Key=FILE_KEY, UploadId=upload_id, PartNumber=part_number, Body=body
+        )
+        parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+    s3_client.complete_multipart_upload(
+        Bucket=SOURCE_BUCKET, Key=FILE_KEY, UploadId=upload_id, MultipartUpload={"Parts": parts}
+    )
+    source_head = s3_client.head_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY)
+    source_head["ChecksumCRC32"] = _composite_crc32([_crc32(body) for body in bodies])
+
+    # moto computes no part checksums for copies, so compute them the way S3 does
+    upload_part_copy = s3_client.upload_part_copy
+    complete_multipart_upload = s3_client.complete_multipart_upload
+
+    def checksummed_upload_part_copy(**kwargs):
+        response = upload_part_copy(**kwargs)
+        source = s3_client.get_object(**kwargs["CopySource"], Range=kwargs["CopySourceRange"])
+        response["CopyPartResult"]["ChecksumCRC32"] = _crc32(source["Body"].read())
+        return response
+
+    def checksummed_complete_multipart_upload(**kwargs):
+        response = complete_multipart_upload(**kwargs)
+        response["ChecksumCRC32"] = _composite_crc32([p["ChecksumCRC32"] for p in kwargs["MultipartUpload"]["Parts"]])
+        return response
+
+    s3_client.upload_part_copy = checksummed_upload_part_copy
+    s3_client.complete_multipart_upload = checksummed_complete_multipart_upload
+
+    # The copy follows the source's own part boundaries, even below the threshold
+    checksum = TransferChecksum("CRC32")
+    etag = copy_object_in_s3(
+        s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY, checksum=checksum, source_head=source_head
+    )
+    assert etag == source_head["ETag"]
+    assert checksum.verified and checksum.value == source_head["ChecksumCRC32"]
+
+    # A copy whose part checksums differ from the source's is a mismatch
+    source_head["ChecksumCRC32"] = _composite_crc32([_crc32(b"other")] * 3)
+    with pytest.raises(OSError):
+        copy_object_in_s3(
+            s3_client,
+            SOURCE_BUCKET,
+            DEST_BUCKET,
+            FILE_KEY,
+            NEW_FILE_KEY,
+            checksum=TransferChecksum("CRC32"),
+            source_head=source_head,
+        )
+
+    # Without the source's part sizes the copy is made but not compared
+    source_head["ChecksumCRC32"] = _composite_crc32([_crc32(body) for body in bodies[:2]])
+    checksum = TransferChecksum("CRC32")
+    copy_object_in_s3(
+        s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY, checksum=checksum, source_head=source_head
+    )
+    assert not checksum.verified
+
+
+def test_get_transfer_config():
+    small = get_transfer_config(1024)
+    assert small.use_threads is False
+
+    medium = get_transfer_config(100 * 1024 * 1024)
+    assert medium.use_threads is True
+    assert medium.multipart_chunksize == 16 * 1024 * 1024
+
+    large = get_transfer_config(5 * 1024 * 1024 * 1024)
+    assert large.multipart_chunksize == 64 * 1024 * 1024
+    assert large.max_concurrency > medium.max_concurrency
+
+    assert get_transfer_config(None, max_concurrency=3).max_concurrency == 3
+
+
+@mock_aws
+def test_download_file_if_changed():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body=b"version 1")
+    local_path = Path("/tmp/test_conditional.txt")
+    local_path.unlink(missing_ok=True)
+
+    assert download_file_if_changed(s3_client, SOURCE_BUCKET, FILE_KEY, "test_conditional.txt") == (local_path, True)
+    metadata = json.loads(Path(f"{local_path}.s3meta.json").read_text())
+    assert metadata["etag"] == s3_client.head_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY)["ETag"]
+
+    # An unchanged object is not transferred again
+    progress = TransferProgress()
+    assert download_file_if_changed(
+        s3_client, SOURCE_BUCKET, FILE_KEY, "test_conditional.txt", progress_callback=progress
+    ) == (local_path, False)
+    assert progress.bytes_transferred == 0
+    assert download_file_from_s3(s3_client, SOURCE_BUCKET, FILE_KEY, "test_conditional.txt", conditional=True) == (
+        local_path
+    )
+
+    # A changed object is downloaded again
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body=b"version 2")
+    assert download_file_if_changed(s3_client, SOURCE_BUCKET, FILE_KEY, "test_conditional.txt")[1]
+    assert local_path.read_bytes() == b"version 2"
+
+    # So is a local copy modified since its download
+    local_path.write_bytes(b"edited")
+    assert download_file_if_changed(s3_client, SOURCE_BUCKET, FILE_KEY, "test_conditional.txt")[1]
+    assert local_path.read_bytes() == b"version 2"
+
+    with pytest.raises(botocore.exceptions.ClientError):
+        download_file_if_changed(s3_client, SOURCE_BUCKET, "missing.txt", "test_conditional_missing.txt")
+
+    local_path.unlink()
+    Path(f"{local_path}.s3meta.json").unlink()
+
+
+@mock_aws
+def test_transfer_progress():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    body = b"x" * 1024
+
+    with open("/tmp/test_progress.bin", "wb") as f:
+        f.write(body)
+
+    reports = []
+    progress = TransferProgress(total_bytes=len(body), callback=lambda *report: reports.append(report), interval=0)
+    upload_file_to_s3(s3_client, "test_progress.bin", SOURCE_BUCKET, "progress_key", progress_callback=progress)
+    assert progress.bytes_transferred == len(body)
+    assert reports[-1][:2] == (len(body), len(body))
+    assert reports[-1][2] > 0
+
+    progress = TransferProgress()
+    download_file_from_s3(
+        s3_client,
+        SOURCE_BUCKET,
+        "progress_key",
+        "test_progress_download.bin",
+        transfer_config=get_transfer_config(len(body)),
+        progress_callback=progress,
+    )
+    assert progress.bytes_transferred == len(body)
+    assert progress.bytes_per_second > 0
+
+    os.remove("/tmp/test_progress.bin")
+    os.remove("/tmp/test_progress_download.bin")
+
+
 @mock_aws
 def test_copy_file_in_s3():
     s3_client = boto3.client("s3")
@@ -221,6 +680,172 @@ def test_copy_file_in_s3():
         assert e is not None
 
 
+@mock_aws
+def test_copy_file_in_s3_multipart():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+
+    body = os.urandom(12 * 1024 * 1024)
+    s3_client.put_object(
+        Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body=body, ContentType="application/x-cdf", Metadata={"level": "l1"}
+    )
+
+    copy_file_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY, multipart_threshold=5 * 1024 * 1024)
+
+    response = s3_client.get_object(Bucket=DEST_BUCKET, Key=NEW_FILE_KEY)
+    assert response["Body"].read() == body
+    assert response["ContentType"] == "application/x-cdf"
+    assert response["Metadata"] == {"level": "l1"}
+    # Multipart ETags carry the part count
+    assert response["ETag"].strip('"').endswith("-1")
+    assert not object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+
+    # Smaller parts are copied in parallel and reassembled in order
+    etag = multipart_copy_in_s3(
+        s3_client, DEST_BUCKET, DEST_BUCKET, NEW_FILE_KEY, "parts.bin", part_size=5 * 1024 * 1024, max_workers=3
+    )
+    assert etag.strip('"').endswith("-3")
+    assert s3_client.get_object(Bucket=DEST_BUCKET, Key="parts.bin")["Body"].read() == body
+
+
+@mock_aws
+def test_multipart_copy_in_s3_aborts_on_failure():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body=b"x" * 1024)
+
+    # Fail the part copy as S3 would for a source changed mid-copy
+    error = botocore.exceptions.ClientError({"Error": {"Code": "PreconditionFailed"}}, "UploadPartCopy")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(s3_client, "upload_part_copy", MagicMock(side_effect=error))
+        with pytest.raises(botocore.exceptions.ClientError):
+            multipart_copy_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, FILE_KEY, NEW_FILE_KEY)
+
+    assert s3_client.list_multipart_uploads(Bucket=DEST_BUCKET).get("Uploads", []) == []
+    assert not object_exists(s3_client, DEST_BUCKET, NEW_FILE_KEY)
+
+
+@mock_aws
+def test_move_files_in_s3():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+
+    file_keys = {f"file_{i}.txt": f"sorted/file_{i}.txt" for i in range(7)}
+    for file_key in file_keys:
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=file_key, Body=file_key)
+    file_keys["missing.txt"] = "sorted/missing.txt"
+
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, file_keys, max_workers=3, delete_batch_size=3)
+
+    assert report["missing.txt"]["status"] == "copy_failed"
+    assert report["missing.txt"]["error"]
+    for i in range(7):
+        result = report[f"file_{i}.txt"]
+        assert result["status"] == "moved"
+        assert result["etag"]
+        assert (
+            s3_client.get_object(Bucket=DEST_BUCKET, Key=result["new_file_key"])["Body"].read()
+            == f"file_{i}.txt".encode()
+        )
+    assert list_files_in_bucket(s3_client, SOURCE_BUCKET) == []
+
+    # Copy only leaves the sources in place
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data")
+    report = move_files_in_s3(
+        s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)], delete_source_files=False
+    )
+    assert report[FILE_KEY]["status"] == "copied"
+    assert object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+
+    # Listed metadata saves the HEAD request, and a stale ETag fails the copy
+    listed = {obj["Key"]: obj for obj in iter_files_in_bucket(s3_client, SOURCE_BUCKET, include_metadata=True)}
+    s3_client.head_object = MagicMock(side_effect=AssertionError("HEAD request sent"))
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)], source_metadata=listed)
+    assert report[FILE_KEY]["status"] == "moved"
+    del s3_client.head_object
+
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="changed data")
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)], source_metadata=listed)
+    # S3 fails the copy on CopySourceIfMatch, moto copies and the ETag check catches it
+    assert report[FILE_KEY]["status"] in ("copy_failed", "unverified")
+    assert object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+
+    # A copy whose ETag does not match the source keeps the source
+    copy_object = s3_client.copy_object
+
+    def mismatched_copy_object(**kwargs):
+        response = copy_object(**kwargs)
+        copy_result = response["CopyObjectResult"]
+        for field in copy_result:
+            if field.startswith("Checksum") and field != "ChecksumType":
+                copy_result[field] = "AAAAAA=="
+        copy_result["ETag"] = '"0123456789abcdef0123456789abcdef"'
+        return response
+
+    s3_client.copy_object = mismatched_copy_object
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)])
+    assert report[FILE_KEY]["status"] == "unverified"
+    assert object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+    del s3_client.copy_object
+
+    with pytest.raises(ValueError):
+        move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [], delete_batch_size=1001)
+
+
+@mock_aws
+def test_move_files_in_s3_invalid_requests(monkeypatch):
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data")
+
+    # Moving an object onto itself is refused before anything is copied or deleted
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, SOURCE_BUCKET, [(FILE_KEY, FILE_KEY)])
+    assert report[FILE_KEY]["status"] == "copy_failed"
+    assert object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+    with pytest.raises(ValueError):
+        copy_file_in_s3(s3_client, SOURCE_BUCKET, SOURCE_BUCKET, FILE_KEY, FILE_KEY)
+
+    multipart_copy = MagicMock(return_value='"multipart-etag-2"')
+    monkeypatch.setattr("sdc_aws_utils.aws.multipart_copy_in_s3", multipart_copy)
+    s3_client.copy_object = MagicMock(
+        side_effect=botocore.exceptions.ClientError({"Error": {"Code": "InvalidRequest"}}, "CopyObject")
+    )
+
+    # An InvalidRequest for an object within the copy_object limit is not retried as multipart
+    listed = {FILE_KEY: {"Key": FILE_KEY, "Size": 9, "ETag": '"etag"'}}
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)], source_metadata=listed)
+    assert report[FILE_KEY]["status"] == "copy_failed"
+    multipart_copy.assert_not_called()
+
+    # Objects over 5 GB fall back to a multipart copy, verified by the size of the copy
+    size = 6 * 1024**3
+    listed = {FILE_KEY: {"Key": FILE_KEY, "Size": size, "ETag": '"etag"'}}
+    s3_client.head_object = MagicMock(return_value={"ContentLength": size, "ETag": '"etag"'})
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)], source_metadata=listed)
+    assert report[FILE_KEY]["status"] == "moved"
+    assert report[FILE_KEY]["etag"] == '"multipart-etag-2"'
+    multipart_copy.assert_called_once()
+    # The fallback draws from the move's retry budget and checksums the copy
+    assert isinstance(multipart_copy.call_args.kwargs["retry_budget"], RetryBudget)
+    assert multipart_copy.call_args.kwargs["checksum"].algorithm == DEFAULT_CHECKSUM_ALGORITHM
+    assert s3_client.head_object.call_args_list[0].kwargs["ChecksumMode"] == "ENABLED"
+
+    # A copy whose checksum differs from the one stored for the source keeps the source
+    def mismatched_multipart_copy(*args, checksum=None, **kwargs):
+        checksum.value = "AAAAAA=="
+        return '"multipart-etag-2"'
+
+    multipart_copy.side_effect = mismatched_multipart_copy
+    s3_client.head_object.return_value = {"ContentLength": size, "ETag": '"etag"', "ChecksumCRC32": "AQIDBA=="}
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)], source_metadata=listed)
+    assert report[FILE_KEY]["status"] == "copy_failed"
+    assert "checksum mismatch" in report[FILE_KEY]["error"]
+
+
 @mock_aws
 def test_list_files_in_bucket():
     s3_client = boto3.client("s3")
@@ -233,6 +858,177 @@ def test_list_files_in_bucket():
     assert FILE_KEY in files
 
 
+LAYOUT_KEYS = [
+    "l0/2022/12/01/hermes_EEA_l0_2022335-200137_v01.bin",
+    "l0/2023/02/11/hermes_EEA_l0_2023042-000000_v0.bin",
+    "l1/housekeeping/2023/02/05/hermes_eea_l1_hk_20230205T000006_v1.0.01.cdf",
+    "ql/eventlist/2023/02/05/hermes_eea_ql_eventlist_20230205T000006_v1.0.01.cdf",
+    "ql/eventlist/2023/03/01/hermes_eea_ql_eventlist_20230301T000006_v1.0.01.cdf",
+    FILE_KEY,
+]
+
+
+def _seed_layout_bucket(s3_client):
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    for key in LAYOUT_KEYS:
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=key, Body="test data")
+
+
+@mock_aws
+def test_iter_files_in_bucket(no_sleep):
+    s3_client = boto3.client("s3")
+    _seed_layout_bucket(s3_client)
+
+    assert list(iter_files_in_bucket(s3_client, SOURCE_BUCKET, page_size=2)) == sorted(LAYOUT_KEYS)
+    assert list(iter_files_in_bucket(s3_client, SOURCE_BUCKET, prefix="ql/")) == LAYOUT_KEYS[3:5]
+    assert list(iter_files_in_bucket(s3_client, SOURCE_BUCKET, start_after=LAYOUT_KEYS[3])) == [
+        LAYOUT_KEYS[4],
+        FILE_KEY,
+    ]
+    assert list_files_in_bucket(s3_client, SOURCE_BUCKET, prefix="l0/") == LAYOUT_KEYS[:2]
+
+    # A throttled page is retried on its own instead of failing the listing
+    list_objects_v2 = s3_client.list_objects_v2
+    throttles = [botocore.exceptions.ClientError({"Error": {"Code": "SlowDown"}}, "ListObjectsV2")]
+
+    def flaky_list_objects_v2(**kwargs):
+        if kwargs.get("ContinuationToken") and throttles:
+            raise throttles.pop()
+        return list_objects_v2(**kwargs)
+
+    s3_client.list_objects_v2 = flaky_list_objects_v2
+    assert list(iter_files_in_bucket(s3_client, SOURCE_BUCKET, page_size=2)) == sorted(LAYOUT_KEYS)
+    assert throttles == []
+
+    objects = list(iter_files_in_bucket(s3_client, SOURCE_BUCKET, prefix="l1/", include_metadata=True))
+    assert objects[0]["Key"] == LAYOUT_KEYS[2]
+    assert objects[0]["Size"] == len("test data")
+    assert objects[0]["ETag"] and objects[0]["LastModified"]
+
+
+@mock_aws
+def test_discover_key_shards():
+    s3_client = boto3.client("s3")
+    _seed_layout_bucket(s3_client)
+
+    shards, loose_objects = discover_key_shards(s3_client, SOURCE_BUCKET, shard_by="month")
+    assert shards == [
+        "l0/2022/12/",
+        "l0/2023/02/",
+        "l1/housekeeping/2023/02/",
+        "ql/eventlist/2023/02/",
+        "ql/eventlist/2023/03/",
+    ]
+    assert [obj["Key"] for obj in loose_objects] == [FILE_KEY]
+
+    shards, _ = discover_key_shards(s3_client, SOURCE_BUCKET, prefix="ql/", shard_by="year")
+    assert shards == ["ql/eventlist/2023/"]
+
+    with pytest.raises(ValueError):
+        discover_key_shards(s3_client, SOURCE_BUCKET, shard_by="week")
+
+
+@mock_aws
+def test_iter_files_in_bucket_parallel():
+    s3_client = boto3.client("s3")
+    _seed_layout_bucket(s3_client)
+
+    keys = list(iter_files_in_bucket_parallel(s3_client, SOURCE_BUCKET, max_workers=3, max_buffered_pages=1))
+    assert sorted(keys) == sorted(LAYOUT_KEYS)
+
+    objects = list(iter_files_in_bucket_parallel(s3_client, SOURCE_BUCKET, prefix="ql/", include_metadata=True))
+    assert sorted(obj["Key"] for obj in objects) == LAYOUT_KEYS[3:5]
+
+    # Abandoning the generator early does not hang
+    first_key = next(iter_files_in_bucket_parallel(s3_client, SOURCE_BUCKET, shard_by="day", max_buffered_pages=1))
+    assert first_key in LAYOUT_KEYS
+
+
+@mock_aws
+def test_s3_key_index(tmp_path):
+    s3_client = boto3.client("s3")
+    _seed_layout_bucket(s3_client)
+
+    key_index = S3KeyIndex(s3_client, SOURCE_BUCKET, path=tmp_path / "index.json")
+
+    # An index that was never built can not answer
+    assert key_index.lookup(LAYOUT_KEYS[0]) is None
+
+    key_index.build()
+    assert len(key_index) == len(LAYOUT_KEYS)
+    assert key_index.lookup(LAYOUT_KEYS[0]) is True
+    assert key_index.lookup("l0/2030/01/01/missing.bin") is False
+
+    # Answers come from the index, so no HEAD request is sent
+    head_object = MagicMock(side_effect=AssertionError("HEAD request sent"))
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(s3_client, "head_object", head_object)
+        assert object_exists(s3_client, SOURCE_BUCKET, LAYOUT_KEYS[2], key_index=key_index)
+        assert not object_exists(s3_client, SOURCE_BUCKET, "zz_missing.bin", key_index=key_index)
+
+    # Newly written files in each group are picked up incrementally
+    new_keys = [
+        "l0/2023/02/12/hermes_EEA_l0_2023043-000000_v0.bin",
+        "l1/housekeeping/2023/02/06/hermes_eea_l1_hk_20230206T000006_v1.0.01.cdf",
+    ]
+    for key in new_keys:
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=key, Body="test data")
+    assert key_index.refresh() == 2
+    assert all(key_index.lookup(key) for key in new_keys)
+
+    # Groups created after the build are discovered, and keys the index can not vouch for
+    # (in unlisted groups or sorting before the last listed key) are left to HEAD requests
+    new_group_key = "l2/spectrum/2023/02/05/hermes_eea_l2_spec_20230205T000006_v1.0.01.cdf"
+    late_key = "ql/eventlist/2023/02/20/hermes_eea_ql_eventlist_20230220T000006_v1.0.01.cdf"
+    assert key_index.lookup(new_group_key) is None
+    assert key_index.lookup(late_key) is None
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=new_group_key, Body="test data")
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=late_key, Body="test data")
+    assert key_index.refresh() == 1
+    assert key_index.lookup(new_group_key) is True
+    assert key_index.lookup(late_key) is None
+    assert object_exists(s3_client, SOURCE_BUCKET, late_key, key_index=key_index)
+    assert key_index.lookup("l2/spectrum/2030/01/01/missing.cdf") is False
+
+    # Keys recorded locally do not move the marker past keys written before them
+    key_index.add("l0/2031/01/01/local.bin")
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key="l0/2030/01/01/remote.bin", Body="test data")
+    assert key_index.refresh() == 1
+
+    # Stale indexes fall back to HEAD requests
+    key_index.max_staleness = 0
+    assert key_index.lookup(LAYOUT_KEYS[0]) is None
+    s3_client.delete_object(Bucket=SOURCE_BUCKET, Key=LAYOUT_KEYS[0])
+    assert not object_exists(s3_client, SOURCE_BUCKET, LAYOUT_KEYS[0], key_index=key_index)
+
+    # Round trip through disk
+    key_index.save()
+    loaded_index = S3KeyIndex.load(s3_client, tmp_path / "index.json")
+    assert len(loaded_index) == len(key_index)
+    assert loaded_index.lookup(new_keys[1]) is True
+
+
+@mock_aws
+def test_check_file_existence_with_key_indexes():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    s3_client.put_object(Bucket=DEST_BUCKET, Key=FILE_KEY, Body="test data")
+
+    key_indexes = {SOURCE_BUCKET: S3KeyIndex(s3_client, SOURCE_BUCKET).build()}
+
+    # SOURCE_BUCKET is answered by its index, DEST_BUCKET by a HEAD request
+    assert find_file_in_target_buckets(s3_client, FILE_KEY, [SOURCE_BUCKET, DEST_BUCKET], key_indexes=key_indexes) == (
+        DEST_BUCKET
+    )
+    assert (
+        check_file_existence_in_target_buckets(
+            s3_client, FILE_KEY, SOURCE_BUCKET, [SOURCE_BUCKET], key_indexes=key_indexes
+        )
+        is False
+    )
+
+
 @mock_aws
 def test_check_file_existence_in_target_buckets():
     s3_client = boto3.client("s3")
@@ -252,6 +1048,23 @@ def test_check_file_existence_in_target_buckets():
     assert exists_after_delete is False
 
 
+@mock_aws
+def test_find_file_in_target_buckets():
+    s3_client = boto3.client("s3")
+    target_buckets = [f"target-bucket-{i}" for i in range(6)]
+    for target_bucket in target_buckets:
+        s3_client.create_bucket(Bucket=target_bucket)
+
+    s3_client.put_object(Bucket=target_buckets[4], Key=FILE_KEY, Body="test data")
+
+    assert find_file_in_target_buckets(s3_client, FILE_KEY, target_buckets) == target_buckets[4]
+    assert find_file_in_target_buckets(s3_client, FILE_KEY, target_buckets, max_workers=1) == target_buckets[4]
+    assert find_file_in_target_buckets(s3_client, "missing.txt", target_buckets) is None
+    assert find_file_in_target_buckets(s3_client, FILE_KEY, [target_buckets[4]]) == target_buckets[4]
+    assert find_file_in_target_buckets(s3_client, FILE_KEY, []) is None
+    assert check_file_existence_in_target_buckets(s3_client, FILE_KEY, SOURCE_BUCKET, target_buckets) is True
+
+
 @mock_aws
 def test_log_to_timestream():
     timestream_client = boto3.client("timestream-write", region_name="us-east-1")
@@ -301,6 +1114,458 @@ def test_log_to_timestream():
         assert e is not None
 
 
+def test_get_timestream_target_is_cached(monkeypatch):
+    from sdc_aws_utils.config import _reconfigure_globals
+
+    monkeypatch.setenv("SWXSOC_MISSION", "hermes")
+    _reconfigure_globals()
+    assert get_timestream_target("PRODUCTION") == ("sdc_aws_logs", "sdc_aws_s3_bucket_log_table")
+    assert get_timestream_target() == ("dev-sdc_aws_logs", "dev-sdc_aws_s3_bucket_log_table")
+    assert get_timestream_target("PRODUCTION") is get_timestream_target("PRODUCTION")
+
+    monkeypatch.setenv("SWXSOC_MISSION", "padre")
+    assert get_timestream_target("PRODUCTION") == ("padre_sdc_aws_logs", "padre_sdc_aws_s3_bucket_log_table")
+
+    # Reconfiguring drops the cached targets
+    cached = get_timestream_target("PRODUCTION")
+    _reconfigure_globals()
+    resolved = get_timestream_target("PRODUCTION")
+    assert resolved == cached and resolved is not cached
+
+
+def test_build_timestream_multi_measure_record():
+    record = build_timestream_record("COPY", FILE_KEY, NEW_FILE_KEY, SOURCE_BUCKET, multi_measure=True)
+
+    assert record["MeasureValueType"] == "MULTI"
+    assert [dimension["Name"] for dimension in record["Dimensions"]] == [
+        "action_type",
+        "source_bucket",
+        "destination_bucket",
+    ]
+    values = {value["Name"]: value for value in record["MeasureValues"]}
+    assert values["file_key"]["Value"] == FILE_KEY
+    assert values["new_file_key"]["Value"] == NEW_FILE_KEY
+    assert values["timestamp"]["Type"] == "DOUBLE"
+    assert int(float(values["timestamp"]["Value"]) * 1000) == int(record["Time"])
+
+    single = build_timestream_record("COPY", FILE_KEY, NEW_FILE_KEY, SOURCE_BUCKET)
+    assert single["MeasureValueType"] == "DOUBLE"
+    assert len(single["Dimensions"]) == 5
+
+
+def test_log_to_timestream_multi_measure():
+    timestream_client = MagicMock()
+
+    log_to_timestream(
+        timestream_client, "COPY", FILE_KEY, NEW_FILE_KEY, SOURCE_BUCKET, DEST_BUCKET, "PRODUCTION", multi_measure=True
+    )
+
+    kwargs = timestream_client.write_records.call_args.kwargs
+    assert kwargs["DatabaseName"] == "sdc_aws_logs"
+    assert kwargs["Records"][0]["MeasureName"] == "file_event"
+
+
+def test_timestream_batch_writer_flushes_by_count():
+    timestream_client = MagicMock()
+
+    with TimestreamBatchWriter(timestream_client, max_records=3) as writer:
+        for i in range(7):
+            writer.add_record("db", "table", _timestream_record(f"file_{i}.txt"))
+
+        # Two full batches of three written, one record still buffered
+        assert timestream_client.write_records.call_count == 2
+        assert len(writer) == 1
+
+    # Remaining record flushed on exit
+    assert timestream_client.write_records.call_count == 3
+    assert writer.records_written == 7
+
+    # Shared dimensions are sent once as CommonAttributes
+    first_call = timestream_client.write_records.call_args_list[0].kwargs
+    common_names = {d["Name"] for d in first_call["CommonAttributes"]["Dimensions"]}
+    assert common_names == {"action_type", "source_bucket"}
+    assert [d["Name"] for d in first_call["Records"][0]["Dimensions"]] == ["file_key"]
+
+    with pytest.raises(RuntimeError):
+        writer.add_record("db", "table", _timestream_record("late.txt"))
+
+
+def test_timestream_batch_writer_flushes_by_bytes_and_age():
+    timestream_client = MagicMock()
+    record = _timestream_record("file.txt")
+
+    # Byte budget only fits one record per batch
+    writer = TimestreamBatchWriter(timestream_client, max_bytes=len(json.dumps(record)) + 10, max_age=60)
+    writer.add_record("db", "table", record)
+    writer.add_record("db", "table", record)
+    assert timestream_client.write_records.call_count == 1
+    assert len(writer) == 1
+    writer.close()
+    assert timestream_client.write_records.call_count == 2
+
+    # A zero max_age flushes on every add
+    timestream_client.reset_mock()
+    writer = TimestreamBatchWriter(timestream_client, max_age=0)
+    writer.add_record("db", "table", record)
+    assert timestream_client.write_records.call_count == 1
+    writer.close()
+
+    with pytest.raises(ValueError):
+        TimestreamBatchWriter(timestream_client, max_records=101)
+
+
+def test_timestream_batch_writer_flushes_expired_groups():
+    timestream_client = MagicMock()
+    record = _timestream_record("file.txt")
+
+    # Explicit hook, e.g. at the end of a Lambda handler
+    writer = TimestreamBatchWriter(timestream_client, max_age=0.05, background_flush=False)
+    writer.add_record("db", "table", record)
+    writer.flush_expired()
+    assert timestream_client.write_records.call_count == 0
+    time.sleep(0.06)
+    writer.flush_expired()
+    assert timestream_client.write_records.call_count == 1
+    writer.close()
+
+    # Background thread flushes without another add_record
+    timestream_client.reset_mock()
+    writer = TimestreamBatchWriter(timestream_client, max_age=0.05)
+    writer.add_record("db", "table", record)
+    deadline = time.monotonic() + 2
+    while len(writer) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(writer) == 0
+    assert timestream_client.write_records.call_count == 1
+    writer.close()
+
+
+def test_timestream_batch_writer_keeps_failed_batches(no_sleep):
+    set_retry_policy(RetryPolicy(max_attempts=1))
+    throttle = botocore.exceptions.ClientError({"Error": {"Code": "ThrottlingException"}}, "WriteRecords")
+    timestream_client = MagicMock()
+    timestream_client.write_records.side_effect = [throttle, throttle, {}, {}]
+
+    writer = TimestreamBatchWriter(timestream_client, max_records=2, background_flush=False)
+    writer.add_record("db", "table", _timestream_record("file_0.txt"))
+    with pytest.raises(botocore.exceptions.ClientError):
+        writer.add_record("db", "table", _timestream_record("file_1.txt"))
+
+    # The throttled batch is still buffered, and a record whose flush-first fails is kept too
+    assert len(writer) == 2
+    with pytest.raises(botocore.exceptions.ClientError):
+        writer.add_record("db", "table", _timestream_record("file_2.txt"))
+    assert len(writer) == 3
+
+    # The next flush writes everything in batches of max_records
+    writer.flush()
+    assert len(writer) == 0
+    assert writer.records_written == 3
+    assert [len(call.kwargs["Records"]) for call in timestream_client.write_records.call_args_list[2:]] == [2, 1]
+    assert timestream_client.write_records.call_args.kwargs["Records"][0]["Dimensions"][-1]["Value"] == "file_2.txt"
+    writer.close()
+
+
+def test_timestream_batch_writer_drops_invalid_batches():
+    timestream_client = MagicMock()
+    timestream_client.write_records.side_effect = [
+        botocore.exceptions.ClientError({"Error": {"Code": "ValidationException"}}, "WriteRecords"),
+        {},
+    ]
+
+    writer = TimestreamBatchWriter(timestream_client, max_records=2, background_flush=False)
+    writer.add_record("db", "table", _timestream_record("file_0.txt"))
+    with pytest.raises(botocore.exceptions.ClientError):
+        writer.add_record("db", "table", _timestream_record("file_1.txt"))
+
+    # A write that would fail again is not retried and does not block later records
+    assert len(writer) == 0
+    assert [rejection["ErrorCode"] for rejection in writer.rejected_records] == ["ValidationException"] * 2
+    assert writer.rejected_records[1]["Record"] == _timestream_record("file_1.txt")
+    writer.add_record("db", "table", _timestream_record("file_2.txt"))
+    writer.close()
+    assert writer.records_written == 1
+
+
+def test_timestream_batch_writer_reports_rejected_records():
+    timestream_client = MagicMock()
+    rejection = {"RecordIndex": 1, "Reason": "The record timestamp is outside the time range"}
+    timestream_client.write_records.side_effect = botocore.exceptions.ClientError(
+        {"Error": {"Code": "RejectedRecordsException"}, "RejectedRecords": [rejection]}, "WriteRecords"
+    )
+
+    writer = TimestreamBatchWriter(timestream_client, max_records=2, background_flush=False)
+    writer.add_record("db", "table", _timestream_record("file_0.txt"))
+    with pytest.raises(botocore.exceptions.ClientError):
+        writer.add_record("db", "table", _timestream_record("file_1.txt"))
+
+    # The accepted record was written and the rejected one is not retried
+    assert len(writer) == 0
+    assert writer.records_written == 1
+    assert writer.rejected_records == [{**rejection, "Record": _timestream_record("file_1.txt")}]
+    writer.close()
+
+
+@mock_aws
+def test_log_to_timestream_with_batch_writer():
+    timestream_client = boto3.client("timestream-write", region_name="us-east-1")
+    timestream_client.create_database(DatabaseName="sdc_aws_logs")
+    timestream_client.create_table(DatabaseName="sdc_aws_logs", TableName="sdc_aws_s3_bucket_log_table")
+
+    writer = TimestreamBatchWriter(timestream_client)
+    previous = set_timestream_batch_writer(writer)
+    try:
+        for i in range(5):
+            log_to_timestream(
+                timestream_client, "COPY", f"file_{i}.txt", None, SOURCE_BUCKET, DEST_BUCKET, "PRODUCTION"
+            )
+        assert len(writer) == 5
+        assert writer.write_calls == 0
+    finally:
+        set_timestream_batch_writer(previous)
+        writer.close()
+
+    assert writer.write_calls == 1
+    assert writer.records_written == 5
+
+
+def _timestream_record(file_key):
+    return {
+        "Time": "0",
+        "Dimensions": [
+            {"Name": "action_type", "Value": "COPY"},
+            {"Name": "source_bucket", "Value": SOURCE_BUCKET},
+            {"Name": "file_key", "Value": file_key},
+        ],
+        "MeasureName": "timestamp",
+        "MeasureValue": "0",
+        "MeasureValueType": "DOUBLE",
+    }
+
+
+def test_invoke_reprocessing_lambda(monkeypatch):
+    lambda_client = MagicMock()
+    monkeypatch.setattr("sdc_aws_utils.aws.get_client", lambda service_name: lambda_client)
+
+    invoke_reprocessing_lambda(SOURCE_BUCKET, FILE_KEY, "PRODUCTION")
+
+    kwargs = lambda_client.invoke.call_args.kwargs
+    assert kwargs["FunctionName"] == "aws_sdc_processing_lambda_function"
+    assert kwargs["InvocationType"] == "Event"
+    message = json.loads(json.loads(kwargs["Payload"])["Records"][0]["Sns"]["Message"])
+    assert message["Records"] == [{"s3": {"bucket": {"name": SOURCE_BUCKET}, "object": {"key": FILE_KEY}}}]
+
+
+def test_invoke_reprocessing_lambdas_packs_payloads():
+    lambda_client = MagicMock()
+    objects = [(SOURCE_BUCKET, f"l1/housekeeping/2023/02/05/file_{i:05d}.cdf") for i in range(3000)]
+
+    summary = invoke_reprocessing_lambdas(objects, "DEVELOPMENT", max_rate=None, lambda_client=lambda_client)
+
+    assert sorted(summary["accepted"]) == [key for _, key in objects]
+    assert summary["failed"] == {}
+    assert summary["invocations"] == lambda_client.invoke.call_count < len(objects)
+
+    sent_keys = []
+    for call in lambda_client.invoke.call_args_list:
+        assert call.kwargs["FunctionName"] == "dev-aws_sdc_processing_lambda_function"
+        assert len(call.kwargs["Payload"]) <= 256 * 1024
+        message = json.loads(json.loads(call.kwargs["Payload"])["Records"][0]["Sns"]["Message"])
+        sent_keys.extend(record["s3"]["object"]["key"] for record in message["Records"])
+    assert sorted(sent_keys) == [key for _, key in objects]
+
+    # A small payload limit splits the work into more invocations
+    lambda_client.reset_mock()
+    summary = invoke_reprocessing_lambdas(
+        objects[:100], "DEVELOPMENT", max_rate=None, max_payload_bytes=2048, lambda_client=lambda_client
+    )
+    assert summary["invocations"] > 1
+    assert all(len(call.kwargs["Payload"]) <= 2048 for call in lambda_client.invoke.call_args_list)
+
+
+def test_invoke_reprocessing_lambdas_streams_objects():
+    consumed = []
+    invoked = []
+    ahead = []
+
+    def objects():
+        for i in range(50):
+            consumed.append(i)
+            yield SOURCE_BUCKET, f"file_{i}.cdf"
+
+    def slow_invoke(**kwargs):
+        invoked.append(kwargs)
+        ahead.append(len(consumed) - len(invoked))
+        time.sleep(0.002)
+
+    lambda_client = MagicMock()
+    lambda_client.invoke.side_effect = slow_invoke
+
+    summary = invoke_reprocessing_lambdas(
+        objects(), "DEVELOPMENT", max_workers=2, max_rate=None, max_records_per_payload=1, lambda_client=lambda_client
+    )
+
+    # Keys are pulled as batches complete: at most twice max_workers batches are queued,
+    # plus the key the packer reads ahead
+    assert len(summary["accepted"]) == summary["invocations"] == 50
+    assert max(ahead) <= 2 * 2 + 1
+
+
+def test_invoke_reprocessing_lambdas_retries_throttles(monkeypatch):
+    monkeypatch.setattr("sdc_aws_utils.aws.time.sleep", lambda seconds: None)
+    throttle = botocore.exceptions.ClientError({"Error": {"Code": "TooManyRequestsException"}}, "Invoke")
+    denied = botocore.exceptions.ClientError({"Error": {"Code": "AccessDeniedException"}}, "Invoke")
+
+    lambda_client = MagicMock()
+    lambda_client.invoke.side_effect = [throttle, throttle, {"StatusCode": 202}]
+    summary = invoke_reprocessing_lambdas([(SOURCE_BUCKET, FILE_KEY)], "PRODUCTION", lambda_client=lambda_client)
+    assert summary["accepted"] == [FILE_KEY]
+    assert lambda_client.invoke.call_count == 3
+
+    lambda_client.invoke.side_effect = denied
+    summary = invoke_reprocessing_lambdas([(SOURCE_BUCKET, FILE_KEY)], "PRODUCTION", lambda_client=lambda_client)
+    assert summary["accepted"] == []
+    assert FILE_KEY in summary["failed"]
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("sdc_aws_utils.aws.time.sleep", sleeps.append)
+    reset_retry_stats()
+    yield sleeps
+    set_retry_policy(None)
+    reset_retry_stats()
+
+
+def test_retry_policy_backs_off_throttles(no_sleep):
+    throttle = botocore.exceptions.ClientError(
+        {"Error": {"Code": "SlowDown"}, "ResponseMetadata": {"RetryAttempts": 4}}, "CopyObject"
+    )
+    func = MagicMock(side_effect=[throttle, throttle, {"ResponseMetadata": {"RetryAttempts": 2}}])
+    policy = RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=1.5)
+
+    assert policy.call(func, Bucket="bucket") == {"ResponseMetadata": {"RetryAttempts": 2}}
+    assert func.call_count == 3
+    func.assert_called_with(Bucket="bucket")
+
+    # Full jitter: each delay lies between zero and the capped exponential delay
+    assert len(no_sleep) == 2
+    assert 0 <= no_sleep[0] <= 1.0 and 0 <= no_sleep[1] <= 1.5
+    assert retry_stats() == {"calls": 1, "retries": 2, "throttles": 2, "exhausted": 0, "sdk_retries": 10}
+
+    # Attempts run out
+    func = MagicMock(side_effect=throttle)
+    with pytest.raises(botocore.exceptions.ClientError):
+        policy.call(func)
+    assert func.call_count == 4
+    assert retry_stats()["exhausted"] == 1
+
+    # Errors that are not throttles or transient are raised straight away
+    func = MagicMock(side_effect=botocore.exceptions.ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject"))
+    with pytest.raises(botocore.exceptions.ClientError):
+        policy.call(func)
+    assert func.call_count == 1
+
+
+def test_retry_budget_is_shared(no_sleep):
+    throttle = botocore.exceptions.ClientError({"Error": {"Code": "ThrottlingException"}}, "WriteRecords")
+    policy = RetryPolicy(max_attempts=10, retry_budget=3)
+    budget = policy.new_budget()
+
+    func = MagicMock(side_effect=[throttle, throttle, "ok", throttle, throttle])
+    assert policy.call(func, budget=budget) == "ok"
+    with pytest.raises(botocore.exceptions.ClientError):
+        policy.call(func, budget=budget)
+    # Two retries for the first call, one for the second, then the budget is spent
+    assert func.call_count == 5
+    assert budget.remaining == 0
+    assert RetryBudget(None).consume()
+
+
+@mock_aws
+def test_retry_policy_applies_to_s3_helpers(no_sleep):
+    s3_client = create_s3_client_session()
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data")
+
+    # Clients use botocore's adaptive client-side rate limiting
+    assert DEFAULT_CLIENT_CONFIG.retries["mode"] == "adaptive"
+
+    copy_object = s3_client.copy_object
+    throttle = botocore.exceptions.ClientError({"Error": {"Code": "SlowDown"}}, "CopyObject")
+    calls = []
+
+    def flaky_copy_object(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise throttle
+        return copy_object(**kwargs)
+
+    s3_client.copy_object = flaky_copy_object
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)])
+    assert report[FILE_KEY]["status"] == "moved"
+    assert len(calls) == 2
+    assert retry_stats()["throttles"] == 1
+
+    # A policy without retries surfaces the throttle as a failed copy
+    set_retry_policy(RetryPolicy(max_attempts=1))
+    calls.clear()
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data")
+    report = move_files_in_s3(s3_client, SOURCE_BUCKET, DEST_BUCKET, [(FILE_KEY, NEW_FILE_KEY)])
+    assert report[FILE_KEY]["status"] == "copy_failed"
+
+
+@mock_aws
+def test_retry_budget_applies_to_single_call_helpers(no_sleep):
+    s3_client = create_s3_client_session()
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body="test data")
+
+    # botocore retries once, the retry policy covers longer throttling
+    assert s3_client.meta.config.retries["total_max_attempts"] == 2
+
+    head_object = s3_client.head_object
+    throttle = botocore.exceptions.ClientError({"Error": {"Code": "SlowDown"}}, "HeadObject")
+    responses = []
+
+    def flaky_head_object(**kwargs):
+        if responses:
+            raise responses.pop(0)
+        return head_object(**kwargs)
+
+    s3_client.head_object = flaky_head_object
+
+    # object_exists retries throttles instead of reporting the file as missing
+    responses[:] = [throttle]
+    assert object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+
+    # A spent invocation budget fails fast, and errors other than a 404 are only raised in strict mode
+    budget = RetryBudget(0)
+    responses[:] = [throttle]
+    assert not object_exists(s3_client, SOURCE_BUCKET, FILE_KEY, retry_budget=budget)
+    responses[:] = [throttle]
+    with pytest.raises(botocore.exceptions.ClientError):
+        object_exists(s3_client, SOURCE_BUCKET, FILE_KEY, retry_budget=budget, strict=True)
+    forbidden = botocore.exceptions.ClientError({"Error": {"Code": "403"}}, "HeadObject")
+    responses[:] = [forbidden]
+    assert not object_exists(s3_client, SOURCE_BUCKET, FILE_KEY)
+    responses[:] = [forbidden]
+    with pytest.raises(botocore.exceptions.ClientError):
+        object_exists(s3_client, SOURCE_BUCKET, FILE_KEY, strict=True)
+    assert not object_exists(s3_client, SOURCE_BUCKET, "missing.txt", strict=True)
+
+    budget = RetryBudget(1)
+    responses[:] = [throttle]
+    path = download_file_from_s3(
+        s3_client, SOURCE_BUCKET, FILE_KEY, "budget_download.txt", conditional=True, retry_budget=budget
+    )
+    assert path.read_text() == "test data"
+    assert budget.remaining == 0
+    path.unlink()
+
+
 def test_file_key_generation():
     # Setup
     filename = "hermes_EEA_l0_2023042-000000_v0.bin"
@@ -377,6 +1642,31 @@ def test_s3_upload(dry_run):
             s3_client.head_object(Bucket=bucket, Key=expected_key)
 
 
+@mock_aws
+def test_s3_upload_streamed_data():
+    bucket = "hermes-eea"
+    filename = "hermes_EEA_l0_2023042-000000_v0.bin"
+    expected_key = "l0/2023/02/11/hermes_EEA_l0_2023042-000000_v0.bin"
+
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=bucket)
+
+    # Nothing is read from /tmp when the content is passed in
+    file_key = push_science_file(parse_science_filename, bucket, filename, data=iter([b"te", b"st"]))
+
+    assert file_key == expected_key
+    assert s3_client.get_object(Bucket=bucket, Key=expected_key)["Body"].read() == b"test"
+
+
+def test_s3_upload_streamed_data_with_sdc_aws_file_path_set(monkeypatch):
+    filename = "hermes_EEA_l0_2023042-000000_v0.bin"
+    monkeypatch.setenv("SDC_AWS_FILE_PATH", f"../test_data/{filename}")
+
+    # Data that would not be uploaded is refused instead of silently dropped
+    with pytest.raises(ValueError):
+        push_science_file(parse_science_filename, "hermes-eea", filename, data=b"test")
+
+
 def test_with_sdc_aws_file_path_set():
     # Setup
     parser_mock = lambda filename: filename
@@ -457,6 +1747,255 @@ def test_dry_run_behavior(dry_run):
         assert file_path.parent == Path("/tmp")
 
 
+@pytest.mark.parametrize("mode", ["memory", "mmap"])
+@mock_aws
+def test_get_science_file_modes(mode):
+    # Setup
+    bucket = "hermes-eea"
+    file_key = "l0/2023/02/11/hermes_EEA_l0_2023042-000000_v0.bin"
+    parsed_file_key = "hermes_EEA_l0_2023042-000000_v0.bin"
+    body = bytes(range(256)) * 64
+
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=bucket)
+    s3_client.put_object(Bucket=bucket, Key=file_key, Body=body)
+
+    # Exercise
+    science_file = get_science_file(bucket, file_key, parsed_file_key, mode=mode)
+
+    # Verify
+    if mode == "memory":
+        assert isinstance(science_file, memoryview)
+        assert science_file.readonly
+    else:
+        assert isinstance(science_file, mmap.mmap)
+    assert bytes(science_file[:]) == body
+
+    with pytest.raises(FileNotFoundError):
+        get_science_file(bucket, "missing.bin", "missing.bin", mode=mode)
+
+    # Cleanup
+    if mode == "mmap":
+        science_file.close()
+        os.remove(f"/tmp/{parsed_file_key}")
+
+
+@mock_aws
+def test_read_byte_ranges():
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+    body = bytes(range(256)) * 1024
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key=FILE_KEY, Body=body)
+    clear_object_size_cache()
+
+    calls = []
+    get_object = s3_client.get_object
+
+    def counting_get_object(**kwargs):
+        calls.append(kwargs["Range"])
+        return get_object(**kwargs)
+
+    s3_client.get_object = counting_get_object
+
+    ranges = [(0, 100), (150, 50), (100000, 10), (len(body) - 5, 100)]
+    results = read_byte_ranges(s3_client, SOURCE_BUCKET, FILE_KEY, ranges, max_gap=1024)
+
+    # Nearby ranges share a GET and ranges past the end are truncated
+    assert [bytes(result) for result in results] == [
+        body[0:100],
+        body[150:200],
+        body[100000:100010],
+        body[-5:],
+    ]
+    assert all(result.readonly for result in results)
+    assert sorted(calls) == ["bytes=0-199", "bytes=100000-100009", f"bytes={len(body) - 5}-{len(body) + 94}"]
+
+    # The size learned from the first read resolves offsets from the end without a HEAD
+    calls.clear()
+    assert get_object_size(s3_client, SOURCE_BUCKET, FILE_KEY) == len(body)
+    (tail,) = read_byte_ranges(s3_client, SOURCE_BUCKET, FILE_KEY, [(-16, 16)])
+    assert bytes(tail) == body[-16:]
+    assert calls == [f"bytes={len(body) - 16}-{len(body) - 1}"]
+
+    (past_end,) = read_byte_ranges(s3_client, SOURCE_BUCKET, FILE_KEY, [(len(body), 10)])
+    assert bytes(past_end) == b""
+    with pytest.raises(ValueError):
+        read_byte_ranges(s3_client, SOURCE_BUCKET, FILE_KEY, [(0, -1)])
+
+    clear_object_size_cache()
+
+
+@mock_aws
+def test_prefetch_science_files():
+    bucket = "hermes-eea"
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=bucket)
+    keys = [f"l0/2023/02/11/prefetch_{index}.bin" for index in range(5)]
+    for key in keys:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=key.encode())
+
+    paths = []
+    for path in prefetch_science_files([(bucket, key) for key in keys], prefetch=2, cleanup=True):
+        assert path.read_bytes() == keys[len(paths)].encode()
+        paths.append(path)
+
+    assert [path.name for path in paths] == [Path(key).name for key in keys]
+    # Each file was deleted once the next one was requested
+    assert not any(path.exists() for path in paths)
+
+
+def test_prefetch_science_files_byte_budget(monkeypatch):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_get_science_file(bucket, file_key, parsed_file_key, mode="file", cache=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return file_key
+
+    monkeypatch.setattr("sdc_aws_utils.aws.get_science_file", fake_get_science_file)
+    objects = [("bucket", f"file_{index}", 40) for index in range(6)]
+
+    # Only two 40 byte files fit in the budget, including the one being processed
+    results = []
+    for result in prefetch_science_files(objects, prefetch=4, max_bytes=100):
+        time.sleep(0.03)
+        results.append(result)
+    assert results == [f"file_{index}" for index in range(6)]
+    assert peak <= 2
+
+    peak = 0
+    assert list(prefetch_science_files(objects, prefetch=4)) == results
+    assert peak > 2
+
+    # Files larger than the budget are still fetched, one at a time
+    assert list(prefetch_science_files([("bucket", "big", 500)], max_bytes=100)) == ["big"]
+
+    with pytest.raises(ValueError):
+        next(prefetch_science_files(objects, prefetch=0))
+
+
+def test_get_science_file_modes_with_env_var_set(tmp_path):
+    local_file = tmp_path / "local.bin"
+    local_file.write_bytes(b"local data")
+    os.environ["SDC_AWS_FILE_PATH"] = str(local_file)
+
+    try:
+        assert bytes(get_science_file("bucket", "file_key", "parsed_file_key", mode="memory")) == b"local data"
+        with get_science_file("bucket", "file_key", "parsed_file_key", mode="mmap") as mapped:
+            assert mapped[:] == b"local data"
+        with pytest.raises(ValueError):
+            get_science_file("bucket", "file_key", "parsed_file_key", mode="stream")
+    finally:
+        del os.environ["SDC_AWS_FILE_PATH"]
+
+
+def test_download_cache_lru_eviction(tmp_path):
+    cache = DownloadCache(tmp_path / "cache", max_bytes=25)
+
+    for i in range(3):
+        source = tmp_path / f"file_{i}.bin"
+        source.write_bytes(b"x" * 10)
+        cache.put("bucket", f"key_{i}", "etag", source)
+
+    # Budget only holds two entries, so the oldest was evicted
+    assert cache.stats["evictions"] == 1
+    assert cache.current_bytes == 20
+    assert cache.get("bucket", "key_0", "etag") is None
+    assert cache.get("bucket", "key_1", "etag") is not None
+
+    # key_1 is now most recently used, so key_2 is evicted next
+    source = tmp_path / "file_3.bin"
+    source.write_bytes(b"x" * 10)
+    cache.put("bucket", "key_3", "etag", source)
+    assert cache.get("bucket", "key_2", "etag") is None
+    assert cache.get("bucket", "key_1", "etag") is not None
+
+    # A different ETag is a different entry
+    assert cache.get("bucket", "key_1", "other-etag") is None
+
+    # Entries survive into a new cache over the same directory
+    reopened = DownloadCache(tmp_path / "cache", max_bytes=25)
+    assert reopened.current_bytes == 20
+    assert reopened.get("bucket", "key_3", "etag").read_bytes() == b"x" * 10
+    assert cache.stats == {"hits": 2, "misses": 3, "evictions": 2}
+
+
+@mock_aws
+def test_get_science_file_with_download_cache(tmp_path):
+    bucket = "hermes-eea"
+    file_key = "l0/2023/02/11/hermes_EEA_l0_2023042-000000_v0.bin"
+    parsed_file_key = "hermes_EEA_l0_2023042-000000_v0.bin"
+
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=bucket)
+    s3_client.put_object(Bucket=bucket, Key=file_key, Body="test content")
+
+    cache = DownloadCache(tmp_path / "cache")
+    previous = set_download_cache(cache)
+    try:
+        file_path = get_science_file(bucket, file_key, parsed_file_key)
+        assert cache.stats["misses"] == 1
+        os.remove(file_path)
+
+        file_path = get_science_file(bucket, file_key, parsed_file_key)
+        assert cache.stats["hits"] == 1
+        assert file_path == Path(f"/tmp/{parsed_file_key}")
+        assert file_path.read_text() == "test content"
+
+        # Changing the object changes its ETag, so the cached copy is not used
+        s3_client.put_object(Bucket=bucket, Key=file_key, Body="new content")
+        assert get_science_file(bucket, file_key, parsed_file_key).read_text() == "new content"
+        assert cache.stats["misses"] == 2
+
+        with pytest.raises(FileNotFoundError):
+            get_science_file(bucket, "missing.bin", "missing.bin")
+    finally:
+        set_download_cache(previous)
+        os.remove(f"/tmp/{parsed_file_key}")
+
+
+@mock_aws
+def test_get_science_file_with_download_cache_retries(tmp_path, monkeypatch, no_sleep):
+    bucket = "hermes-eea"
+    file_key = "l0/2023/02/11/hermes_EEA_l0_2023042-000000_v0.bin"
+    parsed_file_key = "hermes_EEA_l0_2023042-000000_v0.bin"
+
+    s3_client = create_s3_client_session()
+    s3_client.create_bucket(Bucket=bucket)
+    s3_client.put_object(Bucket=bucket, Key=file_key, Body="test content")
+
+    head_object = s3_client.head_object
+    errors = []
+
+    def flaky_head_object(**kwargs):
+        if errors:
+            raise errors.pop(0)
+        return head_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "head_object", flaky_head_object)
+    cache = DownloadCache(tmp_path / "cache")
+
+    # The cache's HEAD retries throttles from the caller's budget
+    budget = RetryBudget(1)
+    errors[:] = [botocore.exceptions.ClientError({"Error": {"Code": "SlowDown"}}, "HeadObject")]
+    file_path = get_science_file(bucket, file_key, parsed_file_key, cache=cache, retry_budget=budget)
+    assert file_path.read_text() == "test content"
+    assert budget.remaining == 0
+    os.remove(file_path)
+
+    # Only a 404 means the file is missing
+    errors[:] = [botocore.exceptions.ClientError({"Error": {"Code": "403"}}, "HeadObject")]
+    with pytest.raises(botocore.exceptions.ClientError):
+        get_science_file(bucket, file_key, parsed_file_key, cache=cache)
+
+
 @mock_aws
 def test_file_not_found_in_s3_bucket():
     # Setup
@@ -0,0 +1,101 @@
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from sdc_aws_utils.aws import copy_file_in_s3, download_file_from_s3, object_exists, upload_file_to_s3
+from sdc_aws_utils.metrics import (
+    _NULL_MEASUREMENT,
+    enable_metrics,
+    flush_metrics,
+    measure,
+    metrics_enabled,
+    metrics_summary,
+)
+
+BUCKET = "test-bucket"
+DEST_BUCKET = "dest-bucket"
+
+
+def test_measure_disabled_is_noop():
+    assert not metrics_enabled()
+    with measure("download", BUCKET) as op:
+        op.bytes = 10
+    assert op is _NULL_MEASUREMENT
+    assert metrics_summary() == {}
+
+
+def test_measure_records_latency_bytes_and_errors(metrics):
+    with measure("download", BUCKET) as op:
+        op.bytes = 100
+    with measure("download", BUCKET) as op:
+        op.bytes = 50
+    with pytest.raises(ValueError):
+        with measure("download", BUCKET):
+            raise ValueError("failed")
+
+    summary = metrics_summary()["download"][BUCKET]
+    assert summary["calls"] == 3
+    assert summary["errors"] == 1
+    assert summary["bytes"] == 150
+    latency = summary["latency_ms"]
+    assert 0 <= latency["p50"] <= latency["p99"] <= latency["max"]
+
+
+def test_flush_metrics_emits_emf(metrics, capsys):
+    for _ in range(3):
+        with measure("upload", BUCKET) as op:
+            op.bytes = 10
+
+    documents = flush_metrics()
+
+    assert len(documents) == 1
+    document = documents[0]
+    directive = document["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Dimensions"] == [["Operation", "Bucket"]]
+    assert {metric["Name"] for metric in directive["Metrics"]} == {"Latency", "Calls", "Errors", "Bytes"}
+    assert document["Operation"] == "upload" and document["Bucket"] == BUCKET
+    assert sum(document["Latency"]["Counts"]) == document["Calls"] == 3
+    assert document["Bytes"] == 30
+
+    # Each document is written as a bare JSON line that CloudWatch can parse
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [document]
+
+    # Emission starts a new window but keeps the in-process totals
+    assert flush_metrics() == []
+    assert metrics_summary()["upload"][BUCKET]["calls"] == 3
+
+
+def test_flush_interval(metrics):
+    enable_metrics(True, flush_interval=0)
+    try:
+        with measure("copy", BUCKET):
+            pass
+        # The record was emitted straight away, leaving nothing to flush
+        assert flush_metrics() == []
+    finally:
+        enable_metrics(True, flush_interval=60)
+
+
+@mock_aws
+def test_hot_paths_are_instrumented(metrics):
+    s3_client = boto3.client("s3")
+    s3_client.create_bucket(Bucket=BUCKET)
+    s3_client.create_bucket(Bucket=DEST_BUCKET)
+
+    with open("/tmp/metrics_test_file.txt", "wb") as f:
+        f.write(b"x" * 1000)
+    upload_file_to_s3(s3_client, "metrics_test_file.txt", BUCKET, "metrics_test_file.txt")
+    download_file_from_s3(s3_client, BUCKET, "metrics_test_file.txt", "metrics_test_file.txt")
+    copy_file_in_s3(s3_client, BUCKET, DEST_BUCKET, "metrics_test_file.txt", "copied.txt", delete_source_file=False)
+    assert not object_exists(s3_client, BUCKET, "missing.txt")
+
+    summary = metrics_summary()
+    assert summary["upload"][BUCKET]["bytes"] == 1000
+    assert summary["download"][BUCKET]["bytes"] == 1000
+    assert summary["copy"][DEST_BUCKET]["bytes"] == 1000
+    # The copy is verified by checksum, so only the missing object was checked
+    assert DEST_BUCKET not in summary["object_exists"]
+    assert summary["object_exists"][BUCKET] == {**summary["object_exists"][BUCKET], "calls": 1, "errors": 0}
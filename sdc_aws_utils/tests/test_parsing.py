@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+import pytest
+import swxsoc
+
+from sdc_aws_utils.parsing import clear_parse_cache, parse_cache_info, parse_science_file
+
+SCIENCE_FILENAME = "hermes_eea_l1_hk_20230205T000006_v1.0.01.cdf"
+
+
+@pytest.fixture(autouse=True)
+def empty_parse_cache():
+    clear_parse_cache()
+    yield
+    clear_parse_cache()
+
+
+def test_parse_science_file_caches_results():
+    science_parser = MagicMock(return_value={"level": "l1", "instrument": "eea"})
+
+    first = parse_science_file(SCIENCE_FILENAME, science_parser)
+    second = parse_science_file(SCIENCE_FILENAME, science_parser)
+
+    assert first == second == {"level": "l1", "instrument": "eea"}
+    science_parser.assert_called_once_with(SCIENCE_FILENAME)
+
+    info = parse_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+    assert info["currsize"] == 1
+
+
+def test_parse_science_file_returns_copies():
+    science_parser = MagicMock(return_value={"level": "l1"})
+
+    parse_science_file(SCIENCE_FILENAME, science_parser)["level"] = "changed"
+
+    assert parse_science_file(SCIENCE_FILENAME, science_parser) == {"level": "l1"}
+
+
+def test_parse_science_file_does_not_cache_failures():
+    science_parser = MagicMock(side_effect=ValueError("bad filename"))
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            parse_science_file("bad_filename.txt", science_parser)
+
+    assert science_parser.call_count == 2
+    assert parse_cache_info()["currsize"] == 0
+
+
+def test_parse_science_file_is_mission_aware(monkeypatch):
+    science_parser = MagicMock(return_value={"level": "l1"})
+    parse_science_file(SCIENCE_FILENAME, science_parser)
+
+    monkeypatch.setitem(swxsoc.config["mission"], "mission_name", "other_mission")
+    parse_science_file(SCIENCE_FILENAME, science_parser)
+
+    assert science_parser.call_count == 2
+
+
+def test_clear_parse_cache():
+    science_parser = MagicMock(return_value={"level": "l1"})
+    parse_science_file(SCIENCE_FILENAME, science_parser)
+
+    clear_parse_cache()
+    parse_science_file(SCIENCE_FILENAME, science_parser)
+
+    assert science_parser.call_count == 2
+
+
+def test_parse_science_file_default_parser():
+    science_file = parse_science_file(SCIENCE_FILENAME)
+
+    assert science_file["level"] == "l1"
+    assert science_file["instrument"] == "eea"
@@ -0,0 +1,79 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from sdc_aws_utils.reconcile import _external_sort, diff_buckets, iter_bucket_diff
+
+SOURCE_BUCKET = "dev-hermes-incoming"
+TARGET_BUCKET = "dev-hermes-eea"
+
+
+@pytest.fixture
+def buckets():
+    with mock_aws():
+        s3_client = boto3.client("s3")
+        s3_client.create_bucket(Bucket=SOURCE_BUCKET)
+        s3_client.create_bucket(Bucket=TARGET_BUCKET)
+        yield s3_client
+
+
+def _put(s3_client, bucket, keys, body="test data"):
+    for key in keys:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+
+
+def test_diff_buckets_same_keyspace(buckets):
+    _put(buckets, SOURCE_BUCKET, ["a.bin", "b.bin", "c.bin", "e.bin"])
+    _put(buckets, TARGET_BUCKET, ["b.bin", "d.bin", "e.bin"])
+    _put(buckets, TARGET_BUCKET, ["c.bin"], body="other data!")
+
+    report = diff_buckets(buckets, SOURCE_BUCKET, TARGET_BUCKET)
+
+    assert [d["key"] for d in report["missing"]] == ["a.bin"]
+    assert [d["key"] for d in report["extra"]] == ["d.bin"]
+    assert [(d["key"], d["fields"]) for d in report["mismatch"]] == [("c.bin", ["size", "etag"])]
+    assert report["unmapped"] == []
+
+    # The differences are streamed in key order
+    assert [d["key"] for d in iter_bucket_diff(buckets, SOURCE_BUCKET, TARGET_BUCKET)] == ["a.bin", "c.bin", "d.bin"]
+
+    # Only the requested fields are compared
+    report = diff_buckets(buckets, SOURCE_BUCKET, TARGET_BUCKET, compare=())
+    assert report["mismatch"] == []
+
+    with pytest.raises(ValueError):
+        diff_buckets(buckets, SOURCE_BUCKET, TARGET_BUCKET, compare=("checksum",))
+
+
+def test_diff_buckets_with_key_mapper(buckets):
+    # Source keys are flat, target keys are laid out by date, which sorts differently
+    _put(buckets, SOURCE_BUCKET, ["z_20230201.bin", "a_20230301.bin", "m_20230101.bin", "bad.bin", "skip.txt"])
+    _put(buckets, TARGET_BUCKET, ["2023/01/m_20230101.bin", "2023/03/a_20230301.bin", "2023/04/q_20230401.bin"])
+
+    def key_mapper(key):
+        if key.endswith(".txt"):
+            return None
+        stem = key.split(".")[0]
+        if "_" not in stem:
+            raise ValueError(f"Can not date {key}")
+        date = stem.split("_")[1]
+        return f"{date[:4]}/{date[4:6]}/{key}"
+
+    # A small sort chunk forces sorted runs to be spilled and merged
+    report = diff_buckets(buckets, SOURCE_BUCKET, TARGET_BUCKET, key_mapper=key_mapper, sort_chunk_size=2)
+
+    assert [(d["key"], d["source_key"]) for d in report["missing"]] == [("2023/02/z_20230201.bin", "z_20230201.bin")]
+    assert [d["key"] for d in report["extra"]] == ["2023/04/q_20230401.bin"]
+    assert report["mismatch"] == []
+    assert [d["source_key"] for d in report["unmapped"]] == ["bad.bin"]
+
+
+def test_external_sort():
+    entries = [(f"key{i:03d}", {"Key": f"source{i}", "Size": i}) for i in (5, 3, 9, 1, 7, 2, 8)]
+    expected = sorted(entries, key=lambda entry: entry[0])
+
+    # In memory, spilled across runs, and with a final full chunk
+    for chunk_size in (100, 3, 7, 1):
+        assert [tuple(entry) for entry in _external_sort(entries, chunk_size)] == expected
+
+    assert list(_external_sort([], 3)) == []
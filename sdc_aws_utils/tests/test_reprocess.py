@@ -0,0 +1,239 @@
+import json
+import runpy
+from datetime import date
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from sdc_aws_utils.reprocess import build_date_prefixes, main, sweep_reprocessing
+
+BUCKET = "dev-hermes-eea"
+
+KEYS = [
+    "l1/housekeeping/2023/01/30/hermes_eea_l1_hk_20230130T000006_v1.0.01.cdf",
+    "l1/housekeeping/2023/01/31/hermes_eea_l1_hk_20230131T000006_v1.0.01.cdf",
+    "l1/housekeeping/2023/02/05/hermes_eea_l1_hk_20230205T000006_v1.0.01.cdf",
+    "l1/housekeeping/2023/03/01/hermes_eea_l1_hk_20230301T000006_v1.0.01.cdf",
+    "l1/housekeeping/2023/03/02/hermes_eea_l1_hk_20230302T000006_v1.0.01.cdf",
+    "l1/spectrum/2023/02/05/hermes_eea_l1_spec_20230205T000006_v1.0.01.cdf",
+    "l0/2023/02/11/hermes_EEA_l0_2023042-000000_v0.bin",
+]
+
+
+@pytest.fixture
+def seeded_bucket():
+    with mock_aws():
+        s3_client = boto3.client("s3")
+        s3_client.create_bucket(Bucket=BUCKET)
+        for key in KEYS:
+            s3_client.put_object(Bucket=BUCKET, Key=key, Body="test data")
+        yield s3_client
+
+
+@pytest.fixture
+def invoked(monkeypatch):
+    calls = []
+
+    def fake_invoke(objects, environment, **kwargs):
+        calls.append(list(objects))
+        return {"accepted": [key for _, key in calls[-1]], "failed": {}, "invocations": 1}
+
+    monkeypatch.setattr("sdc_aws_utils.reprocess.invoke_reprocessing_lambdas", fake_invoke)
+    return calls
+
+
+def test_build_date_prefixes():
+    prefixes = build_date_prefixes("l1", "hk", date(2023, 1, 30), date(2023, 3, 1))
+
+    assert prefixes == [
+        "l1/housekeeping/2023/01/30/",
+        "l1/housekeeping/2023/01/31/",
+        "l1/housekeeping/2023/02/",
+        "l1/housekeeping/2023/03/01/",
+    ]
+
+    # The first valid data level has no descriptor segment
+    assert build_date_prefixes("l0", "hk", date(2024, 2, 1), date(2024, 2, 29)) == ["l0/2024/02/"]
+
+    # A 10 year range needs far fewer prefixes than days
+    assert len(build_date_prefixes("l1", "hk", date(2015, 1, 1), date(2024, 12, 31))) == 120
+
+    with pytest.raises(ValueError):
+        build_date_prefixes("l1", "hk", date(2023, 2, 1), date(2023, 1, 1))
+
+
+def test_sweep_reprocessing(seeded_bucket, invoked, tmp_path):
+    summary = sweep_reprocessing(
+        BUCKET,
+        "l1",
+        "housekeeping",
+        date(2023, 1, 31),
+        date(2023, 3, 1),
+        checkpoint_path=tmp_path / "checkpoint.json",
+        max_workers=2,
+        s3_client=seeded_bucket,
+    )
+
+    swept_keys = sorted(key for call in invoked for _, key in call)
+    assert swept_keys == KEYS[1:4]
+    assert summary["matched"] == summary["accepted"] == 3
+    assert summary["failed"] == {}
+
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert len(checkpoint["completed_prefixes"]) == summary["prefixes"]
+
+    # Resuming from the checkpoint skips every completed prefix
+    invoked.clear()
+    summary = sweep_reprocessing(
+        BUCKET,
+        "l1",
+        "housekeeping",
+        date(2023, 1, 31),
+        date(2023, 3, 2),
+        checkpoint_path=tmp_path / "checkpoint.json",
+        s3_client=seeded_bucket,
+    )
+    assert summary["prefixes"] == 1
+    assert [key for call in invoked for _, key in call] == [KEYS[4]]
+
+
+def test_sweep_reprocessing_retries_failed_prefixes(seeded_bucket, monkeypatch, tmp_path):
+    def failing_invoke(objects, environment, **kwargs):
+        return {"accepted": [], "failed": {key: "throttled" for _, key in objects}, "invocations": 0}
+
+    monkeypatch.setattr("sdc_aws_utils.reprocess.invoke_reprocessing_lambdas", failing_invoke)
+
+    summary = sweep_reprocessing(
+        BUCKET,
+        "l1",
+        "hk",
+        date(2023, 2, 1),
+        date(2023, 2, 28),
+        checkpoint_path=tmp_path / "checkpoint.json",
+        s3_client=seeded_bucket,
+    )
+
+    assert list(summary["failed"]) == [KEYS[2]]
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["completed_prefixes"] == []
+    assert checkpoint["failed"] == {"l1/housekeeping/2023/02/": {KEYS[2]: "throttled"}}
+
+    # Resuming invokes only the failed keys, even once more files land under the prefix
+    seeded_bucket.put_object(Bucket=BUCKET, Key=KEYS[2].replace("0205T", "0206T"), Body="test data")
+    calls = []
+
+    def fake_invoke(objects, environment, **kwargs):
+        calls.append(list(objects))
+        return {"accepted": [key for _, key in calls[-1]], "failed": {}, "invocations": 1}
+
+    monkeypatch.setattr("sdc_aws_utils.reprocess.invoke_reprocessing_lambdas", fake_invoke)
+    summary = sweep_reprocessing(
+        BUCKET,
+        "l1",
+        "hk",
+        date(2023, 2, 1),
+        date(2023, 2, 28),
+        checkpoint_path=tmp_path / "checkpoint.json",
+        s3_client=seeded_bucket,
+    )
+
+    assert calls == [[(BUCKET, KEYS[2])]]
+    assert summary["accepted"] == 1 and summary["failed"] == {}
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["completed_prefixes"] == ["l1/housekeeping/2023/02/"]
+    assert checkpoint["failed"] == {}
+
+
+def test_sweep_reprocessing_checkpoint_mismatch(seeded_bucket, invoked, tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    sweep_reprocessing(
+        BUCKET,
+        "l1",
+        "hk",
+        date(2023, 2, 1),
+        date(2023, 2, 28),
+        checkpoint_path=checkpoint_path,
+        s3_client=seeded_bucket,
+    )
+
+    # The descriptor is normalized, so its short and long names resume the same sweep
+    summary = sweep_reprocessing(
+        BUCKET,
+        "l1",
+        "housekeeping",
+        date(2023, 2, 1),
+        date(2023, 2, 28),
+        checkpoint_path=checkpoint_path,
+        s3_client=seeded_bucket,
+    )
+    assert summary["prefixes"] == 0
+
+    invoked.clear()
+    for level, descriptor, environment in [("l1", "spec", "DEVELOPMENT"), ("l1", "hk", "PRODUCTION")]:
+        with pytest.raises(ValueError):
+            sweep_reprocessing(
+                BUCKET,
+                level,
+                descriptor,
+                date(2023, 2, 1),
+                date(2023, 2, 28),
+                environment=environment,
+                checkpoint_path=checkpoint_path,
+                s3_client=seeded_bucket,
+            )
+    assert invoked == []
+
+
+MAIN_ARGS = [
+    "--instrument",
+    "eea",
+    "--level",
+    "l1",
+    "--descriptor",
+    "spec",
+    "--start",
+    "2023-02-01",
+    "--end",
+    "2023-02-28",
+    "--environment",
+    "DEVELOPMENT",
+]
+
+
+def test_main_dry_run(seeded_bucket, invoked, capsys):
+    assert main([*MAIN_ARGS, "--dry-run"]) == 0
+
+    assert invoked == []
+    assert json.loads(capsys.readouterr().out.strip().splitlines()[-1])["matched"] == 1
+
+
+@pytest.mark.filterwarnings("ignore:.*found in sys.modules:RuntimeWarning")
+def test_main_exit_status(seeded_bucket, monkeypatch, capsys):
+    def failing_invoke(objects, environment, **kwargs):
+        return {"accepted": [], "failed": {key: "throttled" for _, key in objects}, "invocations": 0}
+
+    # Run the module the way the console script does, so its exit status is checked
+    monkeypatch.setattr("sdc_aws_utils.aws.invoke_reprocessing_lambdas", failing_invoke)
+    monkeypatch.setattr("sys.argv", ["sdc-aws-reprocess", *MAIN_ARGS])
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("sdc_aws_utils.reprocess", run_name="__main__")
+    assert exit_info.value.code == 1
+    assert json.loads(capsys.readouterr().out.strip().splitlines()[-1])["failed"] == 1
+
+    monkeypatch.setattr("sys.argv", ["sdc-aws-reprocess", *MAIN_ARGS, "--dry-run"])
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("sdc_aws_utils.reprocess", run_name="__main__")
+    assert exit_info.value.code == 0
+
+
+def test_sweep_reprocessing_reports_failed_listings(seeded_bucket, invoked, monkeypatch):
+    def failing_list(s3_client, bucket, prefix, **kwargs):
+        raise RuntimeError("listing failed")
+        yield
+
+    monkeypatch.setattr("sdc_aws_utils.reprocess.iter_files_in_bucket", failing_list)
+    summary = sweep_reprocessing(BUCKET, "l1", "hk", date(2023, 2, 1), date(2023, 2, 28), s3_client=seeded_bucket)
+
+    assert summary["failed_prefixes"] == {"l1/housekeeping/2023/02/": "listing failed"}
+    assert invoked == []